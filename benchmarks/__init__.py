@@ -0,0 +1,7 @@
+"""
+Headless benchmark suite.
+
+Benchmarks in this package run without a camera, a browser or network access
+so they can be executed on CI machines. Results are written as JSON and can be
+compared against a stored baseline to flag regressions.
+"""
@@ -0,0 +1,243 @@
+"""
+Gaze pipeline benchmarks.
+
+Measures the eyeGestures pipeline without a webcam:
+
+- ``EyeGestures_v3.step`` latency/throughput driven by recorded landmarks
+  (``--landmarks`` .npy of shape (N, 478, 2|3) in normalised coordinates),
+  recorded frames (``--frames`` .pkl in the ``VideoCapture`` format) or the
+  synthetic landmark backend when no recording is given
+- ``Calibrator_v2`` fit/predict scaling from 1k to 100k samples
+- ``Buffor``, ``Heatmap``, ``Clusters`` and ``low_pass_filter_fourier``
+- end-to-end ``EyeTracker.get_gaze`` with a fake capture
+
+Usage:
+    python -m benchmarks.gaze_pipeline --out bench.json
+    python -m benchmarks.gaze_pipeline --out bench.json --baseline baseline.json
+"""
+
+import argparse
+import os
+import pickle
+import sys
+
+import numpy as np
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src', 'eye_tracking'))
+
+from benchmarks.harness import measure, save_results, load_results, compare, print_results, print_comparison
+
+from eyeGestures import EyeGestures_v3
+from eyeGestures.calibration_v2 import Calibrator as Calibrator_v2
+from eyeGestures.synthetic import SyntheticFaceFinder, gaze_path
+from eyeGestures.smoothing import SMOOTHERS, create_smoother
+from eyeGestures.utils import Buffor, low_pass_filter_fourier
+from eyeGestures.screenTracker.heatmap import Heatmap
+from eyeGestures.screenTracker.clusters import Clusters
+
+SCREEN = (1920, 1080)
+FRAME_SHAPE = (480, 640, 3)
+
+
+# ---------------------------------------------------------------------------
+# Inputs
+# ---------------------------------------------------------------------------
+
+class ReplayFinder:
+    """FaceFinder stand-in replaying recorded normalised landmarks in a loop."""
+
+    def __init__(self, landmarks):
+        self.landmarks = landmarks
+        self.index = 0
+
+    def find(self, image):
+        landmarks = self.landmarks[self.index % len(self.landmarks)]
+        self.index += 1
+        return landmarks
+
+
+class FakeCapture:
+    """VideoCapture stand-in cycling over in-memory frames."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.index = 0
+
+    def read(self):
+        frame = self.frames[self.index % len(self.frames)]
+        self.index += 1
+        return True, frame
+
+    def close(self):
+        pass
+
+
+def load_inputs(args):
+    """Return (frames, finder) from recordings or generated data."""
+    if args.frames:
+        with open(args.frames, 'rb') as f:
+            frames = pickle.load(f)[::2]  # VideoCapture stores (frame, ret) pairs
+        return frames[:args.n_frames], None
+
+    if args.landmarks:
+        landmarks = np.load(args.landmarks)[:args.n_frames]
+    else:
+        targets = [(x, y) for x in (0.1, 0.5, 0.9) for y in (0.1, 0.5, 0.9)]
+        finder = SyntheticFaceFinder(rate=30.0, gaze=gaze_path(targets, dwell=0.5), blinks=[(2.0, 0.2)],
+                                     noise=0.0005, start_time=0.0)
+        landmarks = finder.generate(args.n_frames)[1]
+
+    frames = [np.zeros(FRAME_SHAPE, dtype=np.uint8)]
+    return frames, ReplayFinder(landmarks)
+
+
+def make_gestures(finder):
+    gestures = EyeGestures_v3()
+    if finder is not None:
+        gestures.finder = finder
+    return gestures
+
+
+def calibrated_gestures(frames, finder, context="main"):
+    """Fit the calibrator once on key points extracted from the inputs."""
+    gestures = make_gestures(finder)
+    gestures.addContext(context)
+    n = len(finder.landmarks) if finder is not None else len(frames)
+    key_points = np.array([gestures.getLandmarks(frames[i % len(frames)])[0] for i in range(n)])
+    targets = np.column_stack((np.linspace(0, SCREEN[0], n), np.linspace(0, SCREEN[1], n)))
+    gestures.clb[context].fit(key_points, targets)
+    return gestures, key_points
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+def bench_step(frames, finder, repeat):
+    gestures, _ = calibrated_gestures(frames, finder)
+    cursor = {'i': 0}
+
+    def step():
+        frame = frames[cursor['i'] % len(frames)]
+        cursor['i'] += 1
+        gestures.step(frame, False, SCREEN[0], SCREEN[1])
+
+    batch, key_points = calibrated_gestures(frames, finder)
+    timestamps = np.arange(len(key_points)) / 30.0
+
+    def step_batch():
+        batch.step_batch(key_points, timestamps)
+
+    return {
+        'eyegestures_v3.step': measure(step, repeat=repeat),
+        f'eyegestures_v3.step_batch[{len(key_points)}]': measure(step_batch, repeat=max(repeat // 10, 3),
+                                                                 items=len(key_points)),
+    }
+
+
+def bench_calibrator(sizes, n_features):
+    results = {}
+    rng = np.random.default_rng(1)
+    for size in sizes:
+        X = rng.normal(size=(size, n_features))
+        Y = rng.uniform(0, 1000, size=(size, 2))
+        clb = Calibrator_v2()
+        repeat = 3 if size >= 50000 else 10
+        results[f'calibrator_v2.fit[{size}]'] = measure(lambda: clb.fit(X, Y), repeat=repeat, warmup=1, items=size)
+        results[f'calibrator_v2.predict[{size}]'] = measure(lambda: clb.predict(X[0]), repeat=50, number=10)
+        results[f'calibrator_v2.predict_batch[{size}]'] = measure(lambda: clb.predict_batch(X), repeat=repeat,
+                                                                  warmup=1, items=size)
+    return results
+
+
+def bench_micro(key_points, repeat):
+    results = {}
+    rng = np.random.default_rng(2)
+
+    for length in (20, 200):
+        buffor = Buffor(length)
+        points = rng.uniform(0, 500, size=(length, 2))
+        for p in points:
+            buffor.add(p)
+        results[f'buffor.add[{length}]'] = measure(lambda: buffor.add(points[0]), repeat=repeat, number=100)
+        results[f'buffor.getAvg[{length}]'] = measure(buffor.getAvg, repeat=repeat, number=10)
+
+    for name in sorted(SMOOTHERS):
+        for window in (20, 200):
+            smoother = create_smoother(name, window=window)
+            point = rng.uniform(0, 500, size=2)
+            results[f'smoother.{name}[{window}]'] = measure(lambda: smoother.update(point, None),
+                                                           repeat=repeat, number=100)
+
+    gaze_buffer = rng.normal(250, 20, size=(200, 2))
+    results['heatmap[200]'] = measure(lambda: Heatmap(500, 500, gaze_buffer), repeat=repeat)
+    results['clusters[200]'] = measure(lambda: Clusters(gaze_buffer), repeat=repeat)
+    results['low_pass_filter_fourier'] = measure(lambda: low_pass_filter_fourier(key_points, 200),
+                                                 repeat=repeat, number=10)
+    return results
+
+
+def bench_eyetracker(frames, finder, repeat):
+    from EyeTracker import EyeTracker
+
+    tracker = EyeTracker(capture=FakeCapture(frames), screen_size=SCREEN)
+    tracker.gestures, _ = calibrated_gestures(frames, finder, context="tracker")
+    tracker.is_calibrated = True
+    return {'eyetracker.get_gaze': measure(tracker.get_gaze, repeat=repeat)}
+
+
+def run(args):
+    frames, finder = load_inputs(args)
+    results = {}
+
+    results.update(bench_step(frames, finder, args.repeat))
+    _, key_points = calibrated_gestures(frames, finder)
+    results.update(bench_micro(key_points[0], args.repeat))
+    results.update(bench_calibrator(args.sizes, key_points[0].size))
+    results.update(bench_eyetracker(frames, finder, args.repeat))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless gaze pipeline benchmarks")
+    parser.add_argument('--out', default='bench_output.json', help="where to write JSON results")
+    parser.add_argument('--baseline', help="results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument('--metric', default='median', choices=['median', 'mean', 'p95', 'min'],
+                        help="statistic compared against the baseline")
+    parser.add_argument('--frames', help="recorded frames (.pkl, VideoCapture format)")
+    parser.add_argument('--landmarks', help="recorded normalised landmarks (.npy, N x 478 x 2)")
+    parser.add_argument('--n-frames', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--quick', action='store_true', help="small sizes for smoke runs")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.n_frames = min(args.n_frames, 60)
+        args.repeat = min(args.repeat, 20)
+        args.sizes = [1000, 5000]
+
+    results = run(args)
+    save_results(args.out, results, meta={'suite': 'gaze_pipeline', 'quick': args.quick})
+    print_results(results)
+    print(f"\n💾 Results written to {args.out}")
+
+    if args.baseline:
+        rows, regressions = compare(results, load_results(args.baseline), tolerance=args.tolerance,
+                                      metric=args.metric)
+        print()
+        print_comparison(rows)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+        print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
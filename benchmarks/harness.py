@@ -0,0 +1,132 @@
+"""
+Timing, persistence and comparison helpers shared by all benchmarks.
+"""
+
+import json
+import platform
+import time
+from datetime import datetime
+
+import numpy as np
+
+
+def measure(func, repeat=100, warmup=5, items=1, number=1):
+    """
+    Time repeated calls of ``func`` and return summary statistics.
+
+    Args:
+        func: Zero-argument callable to benchmark
+        repeat (int): Number of timed samples
+        warmup (int): Number of untimed calls made first
+        items (int): Items processed per call, used for the throughput figure
+        number (int): Calls per sample; use >1 for sub-microsecond functions
+            so timer overhead does not dominate
+
+    Returns:
+        dict: Latency statistics in seconds plus items per second
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples[i] = (time.perf_counter() - start) / number
+
+    median = float(np.median(samples))
+    return {
+        'unit': 's',
+        'repeat': repeat,
+        'items': items,
+        'mean': float(np.mean(samples)),
+        'median': median,
+        'p95': float(np.percentile(samples, 95)),
+        'min': float(np.min(samples)),
+        'max': float(np.max(samples)),
+        'items_per_s': (items / median) if median > 0 else float('inf'),
+    }
+
+
+def environment():
+    """Describe the machine the benchmarks were run on."""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'created_at': datetime.now().isoformat(),
+    }
+
+
+def save_results(path, results, meta=None):
+    """Write benchmark results to ``path`` as JSON."""
+    payload = {
+        'meta': dict(environment(), **(meta or {})),
+        'benchmarks': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    return payload
+
+
+def load_results(path):
+    """Load the ``benchmarks`` section of a results file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['benchmarks']
+
+
+def compare(current, baseline, tolerance=0.25, metric='median', min_delta=5e-6):
+    """
+    Compare two result sets and report regressions.
+
+    A benchmark regresses when its ``metric`` grew by more than ``tolerance``
+    (relative) and by more than ``min_delta`` seconds (absolute noise floor)
+    compared to the baseline. Benchmarks missing from either side are
+    reported but never counted as regressions.
+
+    Returns:
+        tuple: (rows, regressions) where rows is a list of dicts describing
+        every benchmark and regressions is the list of regressed names
+    """
+    rows = []
+    regressions = []
+    for name in sorted(set(current) | set(baseline)):
+        if name not in baseline or name not in current:
+            rows.append({'name': name, 'status': 'new' if name in current else 'missing'})
+            continue
+
+        old = baseline[name][metric]
+        new = current[name][metric]
+        ratio = (new / old) if old > 0 else float('inf')
+        status = 'ok'
+        if ratio > 1.0 + tolerance and new - old > min_delta:
+            status = 'REGRESSION'
+            regressions.append(name)
+        elif ratio < 1.0 - tolerance and old - new > min_delta:
+            status = 'improved'
+
+        rows.append({'name': name, 'status': status, 'baseline': old, 'current': new, 'ratio': ratio})
+    return rows, regressions
+
+
+def print_results(results):
+    """Print a compact table of results."""
+    print(f"{'benchmark':<44} {'median':>12} {'p95':>12} {'items/s':>14}")
+    print("-" * 86)
+    for name in sorted(results):
+        r = results[name]
+        print(f"{name:<44} {r['median'] * 1e3:>10.3f}ms {r['p95'] * 1e3:>10.3f}ms {r['items_per_s']:>14.1f}")
+
+
+def print_comparison(rows):
+    """Print the output of :func:`compare`."""
+    print(f"{'benchmark':<44} {'baseline':>12} {'current':>12} {'ratio':>8}  status")
+    print("-" * 92)
+    for row in rows:
+        if 'ratio' not in row:
+            print(f"{row['name']:<44} {'':>12} {'':>12} {'':>8}  {row['status']}")
+            continue
+        print(f"{row['name']:<44} {row['baseline'] * 1e3:>10.3f}ms {row['current'] * 1e3:>10.3f}ms "
+              f"{row['ratio']:>8.2f}  {row['status']}")
@@ -0,0 +1,107 @@
+"""
+HTML pruning benchmarks.
+
+Builds components shaped like captures from real pages (tracking
+attributes, inline scripts, SVG icons, data URI images, indentation) and
+reports the estimated tokens sent to the model with and without
+``prune_html``, plus the pruning latency:
+
+- ``html_prune.<size>``: prune_html on a component with <size> cards
+- ``html_prune.<size>.budget``: the same with a token budget
+
+Usage:
+    python -m benchmarks.html_pruning --out prune_bench.json
+"""
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from benchmarks.harness import measure, save_results, load_results, compare, print_results, print_comparison
+
+from llm.html_prune import prune_html, expand_html, estimate_tokens
+
+ICON = ('<svg class="icon" viewBox="0 0 24 24" aria-hidden="true"><path d="M12 21.35l-1.45-1.32C5.4 15.36 '
+        '2 12.28 2 8.5 2 5.42 4.42 3 7.5 3c1.74 0 3.41.81 4.5 2.09C13.09 3.81 14.76 3 16.5 3 19.58 3 22 '
+        '5.42 22 8.5c0 3.78-3.4 6.86-8.55 11.54L12 21.35z"/></svg>')
+
+
+def make_component(cards):
+    parts = ['<section class="product-grid" data-component="grid" data-experiment="b-17" '
+             'jscontroller="Kx7hPc" jsaction="rcuQ6b:npT2md">']
+    for i in range(cards):
+        parts.append(f"""
+        <article class="card" data-product-id="{100000 + i}" data-gtm-category="shoes" data-position="{i}"
+                 onclick="dataLayer.push({{'event':'select_item','index':{i}}})" onmouseover="prefetch({i})">
+            <!-- card {i} -->
+            <img src="data:image/jpeg;base64,{'/9j/4AAQSkZJRgABAQ' * 20}" alt="Product {i}" loading="lazy"
+                 srcset="/img/p{i}-320.jpg 320w, /img/p{i}-640.jpg 640w, /img/p{i}-1280.jpg 1280w">
+            {ICON}
+            <h3>Product {i}</h3>
+            <p>Comfortable everyday shoe with a breathable upper.</p>
+            <a href="/p/{i}?utm_source=grid&amp;utm_medium=card&amp;utm_campaign=autumn" class="cta">Buy</a>
+            <script type="application/ld+json">{{"@type": "Product", "name": "Product {i}", "sku": "{100000 + i}"}}</script>
+        </article>""")
+    parts.append('\n<script>window.gridLoaded = performance.now();</script></section>')
+    return ''.join(parts)
+
+
+def bench_pruning(sizes, budget, repeat):
+    results = {}
+    for size in sizes:
+        component = make_component(size)
+        pruned, mapping = prune_html(component)
+        assert prune_html(expand_html(pruned, mapping))[0] == pruned   # reversible
+        name = f'html_prune.{size}'
+        results[name] = measure(lambda: prune_html(component), repeat=repeat, warmup=1, items=1)
+        results[name].update(tokens_before=estimate_tokens(component), tokens_after=estimate_tokens(pruned))
+
+        budgeted, _ = prune_html(component, token_budget=budget)
+        results[f'{name}.budget'] = measure(lambda: prune_html(component, token_budget=budget),
+                                            repeat=repeat, warmup=1, items=1)
+        results[f'{name}.budget'].update(tokens_before=estimate_tokens(component),
+                                         tokens_after=estimate_tokens(budgeted))
+    return results
+
+
+def print_tokens(results):
+    print(f"\n{'benchmark':<44} {'tokens before':>14} {'tokens after':>14} {'saved':>8}")
+    print("-" * 84)
+    for name in sorted(results):
+        r = results[name]
+        saved = 1 - r['tokens_after'] / r['tokens_before']
+        print(f"{name:<44} {r['tokens_before']:>14} {r['tokens_after']:>14} {saved:>7.0%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTML pruning token and latency benchmarks")
+    parser.add_argument('--out', default='prune_bench.json', help="where to write JSON results")
+    parser.add_argument('--baseline', help="results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 50], help="cards per component")
+    parser.add_argument('--budget', type=int, default=1000, help="token budget of the budgeted runs")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    results = bench_pruning(args.sizes, args.budget, args.repeat)
+    save_results(args.out, results, meta={'suite': 'html_pruning', 'budget': args.budget})
+    print_results(results)
+    print_tokens(results)
+    print(f"\n💾 Results written to {args.out}")
+
+    if args.baseline:
+        rows, regressions = compare(results, load_results(args.baseline), tolerance=args.tolerance)
+        print()
+        print_comparison(rows)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+        print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
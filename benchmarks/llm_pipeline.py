@@ -0,0 +1,74 @@
+"""
+LLM pipeline benchmarks.
+
+Runs the gemSuggest optimisation prompts against the offline stub client,
+so the numbers reflect the pipeline (concurrency, rate limiting) and not
+the network:
+
+- ``llm.serial``: one call at a time, as gemSuggest used to run
+- ``llm.concurrent.<n>``: the LLMPipeline with n calls in flight
+
+Usage:
+    python -m benchmarks.llm_pipeline --out llm_bench.json
+    python -m benchmarks.llm_pipeline --components 200 --latency 0.2
+"""
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from benchmarks.harness import measure, save_results, load_results, compare, print_results, print_comparison
+
+from llm import LLMPipeline, StubClient
+
+
+def make_requests(n):
+    return [{'system': "Optimise the component.",
+             'prompt': f"Ranking Score:\n{i % 7 - 3}\n\nHTML Component:\n<section id='c{i}'><p>Item {i}</p></section>"}
+            for i in range(n)]
+
+
+def bench_pipeline(n, latency, jitter, concurrency_levels, repeat):
+    requests = make_requests(n)
+    results = {}
+    for concurrency in [1] + list(concurrency_levels):
+        pipeline = LLMPipeline(StubClient(latency=latency, jitter=jitter), concurrency=concurrency)
+        name = 'llm.serial' if concurrency == 1 else f'llm.concurrent.{concurrency}'
+        results[name] = measure(lambda: pipeline.run_sync(requests), repeat=repeat, warmup=0, items=n)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline LLM pipeline benchmarks")
+    parser.add_argument('--out', default='llm_bench.json', help="where to write JSON results")
+    parser.add_argument('--baseline', help="results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument('--components', type=int, default=40, help="components per page")
+    parser.add_argument('--latency', type=float, default=0.05, help="stub seconds per call")
+    parser.add_argument('--jitter', type=float, default=0.5, help="relative spread of the stub latency")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[4, 8, 16])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    results = bench_pipeline(args.components, args.latency, args.jitter, args.concurrency, args.repeat)
+    save_results(args.out, results, meta={'suite': 'llm_pipeline', 'components': args.components,
+                                          'latency': args.latency})
+    print_results(results)
+    print(f"\n💾 Results written to {args.out}")
+
+    if args.baseline:
+        rows, regressions = compare(results, load_results(args.baseline), tolerance=args.tolerance)
+        print()
+        print_comparison(rows)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+        print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,28 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from analysis import DwellAggregator
+from analysis.metrics import rank_deltas, score_session
+
+# Recorded session to optimise from (a .gazelog written by the integrated
+# test runner); the sample dataset below is used when none is given
+SESSION_LOG = os.getenv("GAZE_SESSION_LOG")
+SESSION_PROFILE = os.getenv("GAZE_SESSION_PROFILE")   # defaults to the profile stored in the log
+
 # -------------------------------
 # Function to compute ranking difference
 # -------------------------------
 def calculate_ranking_score(expected_priorities, actual_times):
     """
     Compare actual times ranking vs expected priorities ranking.
-    Returns a dictionary with ranking difference for each element.
+    Returns a dictionary with ranking difference for each element,
+    positive when an element got less attention than expected.
+    Tied times share their average rank; elements missing from either
+    side are skipped (see analysis.metrics for the full metrics).
     """
-    # Sort actual times descending (highest attention first)
-    sorted_actual = sorted(actual_times.items(), key=lambda x: x[1], reverse=True)
-    sorted_selectors = [sel for sel, _ in sorted_actual]
-
-    # Sort expected priorities ascending (1 = highest priority)
-    expected_sorted = sorted(expected_priorities.items(), key=lambda x: x[1])
-    expected_selectors = [sel for sel, _ in expected_sorted]
-
-    ranking_scores = {}
-    for selector in sorted_selectors:
-        actual_rank = sorted_selectors.index(selector) + 1
-        expected_rank = expected_selectors.index(selector) + 1
-        ranking_scores[selector] = actual_rank - expected_rank  # positive = actual lower than expected
-    return ranking_scores
+    return rank_deltas(actual_times, expected_priorities)
 
 # -------------------------------
 # Dataset
@@ -44,15 +47,23 @@ actual_times = {
 # Build clean dataset for GemSuggest
 # -------------------------------
 attention_data = []
-ranking_scores = calculate_ranking_score(expected_priorities, actual_times)
-
-for selector, desired_priority in expected_priorities.items():
-    attention_data.append({
-        "desiredAttention": desired_priority,
-        "actualAttention": actual_times.get(selector, 0),
-        "rankingScore": ranking_scores.get(selector, 0),
-        "html_component": f"<div class='{selector}'>{selector}</div>"  # placeholder HTML
-    })
+if SESSION_LOG and os.path.exists(SESSION_LOG):
+    aggregator = DwellAggregator.from_session(SESSION_LOG, SESSION_PROFILE)
+    expected_priorities = {selector: c.rank for selector, c in aggregator.components.items()}
+    actual_times = aggregator.dwell_times()
+    attention_data = aggregator.attention_data()
+else:
+    session_scores = score_session(expected_priorities, actual_times)
+    ranking_scores = calculate_ranking_score(expected_priorities, actual_times)
+
+    for selector, desired_priority in expected_priorities.items():
+        attention_data.append({
+            "desiredAttention": desired_priority,
+            "actualAttention": actual_times.get(selector, 0),
+            "rankingScore": ranking_scores.get(selector, 0),
+            "alignmentScore": session_scores['components'].get(selector, {}).get('score', 100),
+            "html_component": f"<div class='{selector}'>{selector}</div>"  # placeholder HTML
+        })
 
 # Optional: test printing
 if __name__ == "__main__":
@@ -1,9 +1,13 @@
 import os
-import google.generativeai as genai
+import sys
 from dotenv import load_dotenv
-from supabase import create_client
 import uuid
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from results import open_store, WriteBehindQueue
+from llm import LLMPipeline, MapReduceSummarizer, make_client, cached_client
+
 
 RUN_ID = str(uuid.uuid4())
 print("Using run_id:", RUN_ID)
@@ -13,43 +17,14 @@ print("Using run_id from GemSuggest.py:", RUN_ID)
 
 load_dotenv()
 api_key = os.getenv("GEMINI_API_KEY_SECOND")
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
 print("API Key Loaded:", api_key is not None)
-print("Supabase Config Loaded:", supabase_url is not None and supabase_key is not None)
-
-genai.configure(api_key=api_key)
-
-supabase = create_client(supabase_url, supabase_key)
-
-def store_summary_in_supabase(summary_text):
-    """Insert summary into Supabase."""
-    data_row = {"summary": summary_text,"run_id": RUN_ID}
-    response = supabase.table("gemini_summary").insert(data_row).execute()
-    if response.data:
-        print("✅ Stored summary of weaknesses in Supabase.")
-    else:
-        print("❌ Error storing summary:", response)
-
-def generate_summary():
-    """Fetch explanations and generate overall weaknesses summary."""
-    # Fetch all explanations
-    response = supabase.table("gemini_explanations") \
-            .select("explanation") \
-            .eq("run_id", RUN_ID) \
-            .execute()
 
+MODEL_NAME = "gemini-2.0-flash"
+CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))
+CHUNK_TOKENS = int(os.getenv("LLM_SUMMARY_CHUNK_TOKENS", "8000"))   # explanation tokens per prompt
 
-    if not explanations:
-        print("⚠️ No explanations found, skipping summary.")
-        return
-
-    # Generate summary using Gemini
-    joined_explanations = "\n\n".join(explanations)
-    model = genai.GenerativeModel("gemini-2.0-flash")
-
-    user_prompt = f"""
+SUMMARY_PROMPT = """
         You are an AI UX optimization assistant specializing in ADHD-friendly and accessible webpage design. 
         You are provided with detailed explanations of optimizations made to individual webpage components.
 
@@ -69,17 +44,80 @@ def generate_summary():
 
         Input:
         Explanations of changes to components:
-        {joined_explanations}
+        {texts}
      """
 
-    response = model.generate_content(
-        [user_prompt],
-        generation_config={"temperature": 0.3}
-    )
-    summary_text = response.text.strip()
+MAP_PROMPT = """
+        You are an AI UX optimization assistant specializing in ADHD-friendly and accessible webpage design.
+        You are provided with explanations of optimizations made to some components of one webpage.
+
+        Condense them into short bullet notes for a later site-wide summary:
+        - The strengths and weaknesses of the design they reveal.
+        - The changes made and their expected impact.
+        - Any accessibility issues related to Google Lighthouse guidelines.
+        Keep every distinct finding, drop repetition, and do not write an introduction.
 
-    # Save summary to Supabase
-    store_summary_in_supabase(summary_text)
+        Explanations of changes to components:
+        {texts}
+     """
+
+REDUCE_PROMPT = """
+        You are an AI UX optimization assistant specializing in ADHD-friendly and accessible webpage design.
+        You are provided with bullet notes condensed from explanations of optimizations to one webpage.
+
+        Merge them into one list of short bullet notes in the same style. Combine findings that recur
+        across notes and mention how widespread they are, keep every distinct finding, and do not
+        write an introduction.
+
+        Notes:
+        {texts}
+     """
+
+def get_client():
+    """Model client sharing gemSuggest's response cache (LLM_BACKEND / LLM_CACHE apply)."""
+    return cached_client(make_client(model=MODEL_NAME, api_key=api_key))
+
+def store_summary(store, summary_text):
+    """Insert summary into the results store, retried and spooled like explanations."""
+    writer = WriteBehindQueue(store, flush_on_exit=False)
+    writer.put_summary(RUN_ID, summary_text)
+    writer.close()
+    if writer.rows_written:
+        print(f"✅ Stored summary of weaknesses ({store.name}).")
+    else:
+        print(f"❌ Error storing summary, spooled to {writer.spool_path}")
+
+def generate_summary():
+    """Fetch explanations and generate overall weaknesses summary."""
+    store = open_store()
+
+    # Fetch all explanations of this run
+    explanations = [row["explanation"] for row in store.explanations(RUN_ID) if row.get("explanation")]
+
+    if not explanations:
+        print("⚠️ No explanations found, skipping summary.")
+        store.close()
+        return
+
+    # Map-reduce over chunks of explanations, so large runs fit the model's context
+    client = get_client()
+    summarizer = MapReduceSummarizer(LLMPipeline(client, concurrency=CONCURRENCY, temperature=0.3),
+                                     SUMMARY_PROMPT, MAP_PROMPT, REDUCE_PROMPT, chunk_tokens=CHUNK_TOKENS)
+    try:
+        summary_text = summarizer.summarize_sync(explanations)
+    except RuntimeError as e:
+        print("❌ Error generating summary:", e)
+        store.close()
+        return
+    finally:
+        client.close()
+    if summarizer.levels:
+        print(f"🧩 Summarised {len(explanations)} explanations in {summarizer.levels} map/reduce level(s), "
+              f"{summarizer.calls} model calls")
+
+    # Save summary to the results store
+    store_summary(store, summary_text)
+    store.close()
 
     # Print summary
     print("\n=== WEBSITE WEAKNESSES SUMMARY ===\n")
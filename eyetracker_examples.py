@@ -93,14 +93,48 @@ def example_use_in_another_script():
         time.sleep(0.1)
 
 
+def example_async_stream():
+    """Example: Several coroutines sharing one tracker through tracker.stream()"""
+    import asyncio
+    
+    tracker = EyeTracker()
+    
+    async def printer():
+        # Overlay-style consumer: only the newest sample matters
+        async for gaze in tracker.stream(maxsize=1):
+            x, y = gaze['position']
+            print(f"Gaze at ({x:.0f}, {y:.0f})")
+    
+    async def recorder(samples):
+        # Recorder-style consumer: keep everything, in batches
+        async for batch in tracker.stream(policy="lossless", batched=True):
+            samples.extend(batch)
+    
+    async def main(seconds=10):
+        samples = []
+        tasks = [asyncio.create_task(printer()), asyncio.create_task(recorder(samples))]
+        await asyncio.sleep(seconds)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        print(f"Recorded {len(samples)} samples")
+    
+    try:
+        if tracker.recalibrate(20):
+            asyncio.run(main())
+    finally:
+        tracker.cleanup()
+
+
 if __name__ == "__main__":
     print("🎯 EyeTracker Class Examples")
     print("=" * 40)
     print("1. Basic Usage (calibrate + continuous tracking)")
     print("2. Single Readings (calibrate + individual readings)")
     print("3. Integration Example (how to use in your app)")
+    print("4. Async Stream (several consumers, one camera)")
     
-    choice = input("\nChoose example (1-3): ").strip()
+    choice = input("\nChoose example (1-4): ").strip()
     
     if choice == "1":
         example_basic_usage()
@@ -108,6 +142,8 @@ if __name__ == "__main__":
         example_single_readings()
     elif choice == "3":
         example_use_in_another_script()
+    elif choice == "4":
+        example_async_stream()
     else:
         print("Invalid choice, running basic usage...")
         example_basic_usage()
\ No newline at end of file
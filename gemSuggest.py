@@ -1,12 +1,17 @@
 import os
+import sys
 import time
-import google.generativeai as genai
 from dotenv import load_dotenv
 from gui import SimpleBrowserLauncher
-from supabase import create_client
 import data 
 import uuid
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from results import open_store, WriteBehindQueue
+from llm import LLMPipeline, make_client, cached_client, EXPLANATION_SEPARATOR
+from llm.html_prune import prune_html, expand_html, estimate_tokens
+
 # Load environment variables
 
 RUN_ID = str(uuid.uuid4())
@@ -16,12 +21,15 @@ with open("current_run_id.txt", "w") as f:
 
 load_dotenv()
 api_key = os.getenv("GEMINI_API_KEY")
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
 print("API Key Loaded:", api_key is not None)
-print("Supabase Config Loaded:", supabase_url is not None and supabase_key is not None)
-genai.configure(api_key=api_key)
+
+# Model calls run concurrently; LLM_BACKEND=stub runs the pipeline offline.
+# Responses are cached on disk (LLM_CACHE=off disables, =refresh re-asks the model)
+MODEL_NAME = "gemini-2.0-flash"
+CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))
+RATE_LIMIT = float(os.getenv("LLM_RATE_LIMIT", "0")) or None   # requests per second
+HTML_TOKEN_BUDGET = int(os.getenv("LLM_HTML_TOKEN_BUDGET", "2000"))   # per component, estimated
 
 SYSTEM_PROMPT = """
 You are an AI UX optimization assistant specializing in ADHD-friendly webpage design.
@@ -39,6 +47,7 @@ Guidelines for changes:
 - Under-performing elements → increase prominence (hierarchy, spacing, contrast, placement).
 - Maintain a linear, focused attention flow suitable for ADHD-friendly design.
 - Keep HTML changes minimal and efficient unless a stronger redesign is necessary.
+- Keep placeholders such as {{gz:3}} and data-gz="3" exactly as they are; they stand for scripts, SVG paths, tracking attributes and long values removed to save space.
 - Look into Google's Lighthouse Accessibility guidelines and rules. Always try to make changes that would increase the accessibility score.
 
 Output Instructions:
@@ -54,78 +63,133 @@ Output Instructions:
 
  """ 
 
-# Supabase client
+# Results store (SQLite by default, Supabase when configured), opened on first use.
+# Rows go through a write-behind queue so the optimisation loop never waits on
+# the database; it is flushed when the loop ends and again at exit.
+
+_writer = None
 
-supabase = create_client(supabase_url, supabase_key)
+def get_writer():
+    global _writer
+    if _writer is None:
+        _writer = WriteBehindQueue(open_store())
+    return _writer
 
-def store_explanation_in_supabase(component, desired_attention, actual_attention, ranking_score, explanation):
-    """Insert Gemini explanation into Supabase table."""
-    data_row = {
+def store_explanation(component, desired_attention, actual_attention, ranking_score, explanation, run_id=RUN_ID):
+    """Queue Gemini explanation for the results store."""
+    get_writer().put_explanation({
+        "run_id": run_id,
         "component": component,
         "desired_attention": desired_attention,
         "actual_attention": actual_attention,
         "ranking_score": ranking_score,
-        "explanation": explanation
-    }
-    response = supabase.table("gemini_explanations").insert(data_row).execute()
-    if response.data:
-        print(f"Stored explanation for component: {component}")
-    else:
-        print("Error storing explanation:", response)
+        "explanation": explanation,
+    })
 
 
 # Gemini optimization
 
-def optimize_webpage(expected_attention, actual_attention, ranking_score, html_component):
-    model = genai.GenerativeModel("gemini-2.0-flash")
+_client = None
 
-    user_prompt = f"""
+def get_client():
+    global _client
+    if _client is None:
+        _client = cached_client(make_client(model=MODEL_NAME, api_key=api_key))
+    return _client
+
+def build_prompt(expected_attention, actual_attention, alignment_score, html_component):
+    """Prompt for one component; alignment_score is the 1-100 score SYSTEM_PROMPT describes."""
+    return f"""
 Expected Attention:
 {expected_attention}
 
 Actual Attention:
 {actual_attention}
 
-Ranking Score:
-{ranking_score}
+Score (1-100):
+{alignment_score}
 
 HTML Component:
 {html_component}
 """
 
-    response = model.generate_content(
-        [SYSTEM_PROMPT, user_prompt],
-        generation_config={"temperature": 0.3}
-    )
-
-    raw = response.text.strip()
-
-    if "===EXPLANATION===" in raw:
-        modified_html, explanation = raw.split("===EXPLANATION===", 1)
+def parse_response(raw):
+    """Split a model response into (modified HTML, explanation)."""
+    raw = raw.strip()
+    if EXPLANATION_SEPARATOR in raw:
+        modified_html, explanation = raw.split(EXPLANATION_SEPARATOR, 1)
     else:
         modified_html = raw
         explanation = "No explanation provided"
         print("Warning: Gemini response did not include an explanation.")
-
-    # Save to Supabase
-    store_explanation_in_supabase(
-        component=html_component,
-        desired_attention=expected_attention,
-        actual_attention=actual_attention,
-        # ranking_score=ranking_score,
-        explanation=explanation.strip()
-        "run_id": RUN_ID
+    return modified_html.strip(), explanation.strip()
+
+def save_optimization(item, raw, html_file_path="output.html"):
+    """Store the explanation of one component and write its modified HTML."""
+    modified_html, explanation = parse_response(raw)
+
+    # Save to the results store
+    store_explanation(
+        component=item["html_component"],
+        desired_attention=item["desiredAttention"],
+        actual_attention=item["actualAttention"],
+        ranking_score=item["rankingScore"],
+        explanation=explanation,
+        run_id=RUN_ID
     )
 
     # Save HTML locally
-    html_file_path = "output.html"
     with open(html_file_path, "w") as html_file:
-        html_file.write(modified_html.strip())
+        html_file.write(modified_html)
 
-    print("Gemini Explanation:", explanation.strip())
+    print("Gemini Explanation:", explanation)
 
     return html_file_path
 
+def optimize_components(attention_dataset, client=None, concurrency=CONCURRENCY, rate=RATE_LIMIT):
+    """
+    Ask the model for every component concurrently.
+
+    Returns:
+        one raw response per item in dataset order, None where the call failed
+    """
+    # components go out pruned and the returned HTML is expanded again
+    pruned = [prune_html(item["html_component"], HTML_TOKEN_BUDGET) for item in attention_dataset]
+    before = sum(estimate_tokens(item["html_component"]) for item in attention_dataset)
+    after = sum(estimate_tokens(html) for html, _ in pruned)
+    print(f"✂️ HTML pruned from ~{before} to ~{after} tokens")
+
+    pipeline = LLMPipeline(client or get_client(), concurrency=concurrency, rate=rate)
+    results = pipeline.run_sync([{
+        "system": SYSTEM_PROMPT,
+        "prompt": build_prompt(item["desiredAttention"], item["actualAttention"],
+                               item["alignmentScore"], html),
+    } for item, (html, _) in zip(attention_dataset, pruned)])
+
+    responses = []
+    for item, (_, mapping), result in zip(attention_dataset, pruned, results):
+        if result["error"] is not None:
+            print(f"❌ Optimization failed for component {item['desiredAttention']}: {result['error']}")
+            responses.append(None)
+            continue
+        modified_html, explanation = parse_response(result["text"])
+        responses.append(f"{expand_html(modified_html, mapping)}\n{EXPLANATION_SEPARATOR}\n{explanation}")
+    return responses
+
+def optimize_webpage(expected_attention, actual_attention, ranking_score, html_component, alignment_score):
+    """ranking_score (the rank delta) is stored, alignment_score (1-100) goes to the model."""
+    item = {
+        "desiredAttention": expected_attention,
+        "actualAttention": actual_attention,
+        "rankingScore": ranking_score,
+        "alignmentScore": alignment_score,
+        "html_component": html_component,
+    }
+    raw = optimize_components([item])[0]
+    if raw is None:
+        return None
+    return save_optimization(item, raw)
+
 
 # Viewer
 
@@ -133,14 +197,17 @@ def launch_web_viewer(attention_dataset):
     viewer = SimpleBrowserLauncher()
     viewer.run()
 
-    for item in attention_dataset:
-        html_file = optimize_webpage(
-            expected_attention=item["desiredAttention"],
-            actual_attention=item["actualAttention"],
-            ranking_score=item["rankingScore"],
-            html_component=item["html_component"]
-        )
-        viewer.load_file(html_file)
+    for item, raw in zip(attention_dataset, optimize_components(attention_dataset)):
+        if raw is not None:
+            viewer.load_file(save_optimization(item, raw))
+
+    # explanations must be stored before endSummary reads them
+    get_writer().flush()
+    print("Results stored:", get_writer().stats())
+
+    if not os.path.exists("output.html"):
+        print("❌ No component was optimized.")
+        return
 
     # Monitor last file for changes
     last_modified_time = os.path.getmtime("output.html")
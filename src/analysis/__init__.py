@@ -0,0 +1,25 @@
+"""
+Attention analysis module.
+
+This module turns attributed gaze samples into per-component attention
+statistics and the attention_data records used for optimization, and
+aggregates them across participants.
+"""
+
+from .dwell import DwellAggregator, ComponentStats, load_ranks
+from .metrics import average_ranks, rank_metrics, score_session, rank_deltas, spearman, kendall
+from .cohort import CohortTable, group_median
+
+__all__ = [
+    'DwellAggregator',
+    'ComponentStats',
+    'load_ranks',
+    'average_ranks',
+    'rank_metrics',
+    'score_session',
+    'rank_deltas',
+    'spearman',
+    'kendall',
+    'CohortTable',
+    'group_median',
+]
@@ -0,0 +1,279 @@
+"""
+Cross-participant attention aggregation.
+
+Per-session dwell tables of one test profile are appended to a columnar
+store (one structured-array row per session and component). Per-component
+statistics come from vectorised group-bys over the component column, with
+running sums so adding a participant only touches that participant's rows.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+
+from .dwell import DwellAggregator, load_ranks
+from .metrics import rank_metrics
+
+try:
+    from scipy import stats as scipy_stats
+except ImportError:
+    scipy_stats = None
+
+ROW_DTYPE = np.dtype([
+    ('session', 'i4'),
+    ('component', 'i4'),
+    ('dwell', 'f8'),
+    ('fixations', 'i4'),
+    ('ttff', 'f8'),         # NaN when never fixated
+    ('visits', 'i4'),
+    ('actual_rank', 'f8'),  # rank of the component's dwell within its session
+    ('valid', '?'),         # False once the session was replaced or removed
+])
+
+SESSION_DTYPE = np.dtype([
+    ('score', 'f8'),
+    ('spearman', 'f8'),
+    ('kendall', 'f8'),
+    ('weighted_error', 'f8'),
+    ('valid', '?'),
+])
+
+
+def _grow(array, needed):
+    if needed <= len(array):
+        return array
+    grown = np.zeros(max(needed, 2 * len(array)), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def group_median(groups, values, n_groups):
+    """Median of values per group id in [0, n_groups), NaN values ignored, NaN for empty groups"""
+    keep = np.isfinite(values)
+    groups, values = groups[keep], values[keep]
+    order = np.lexsort((values, groups))
+    values = values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    lo = np.minimum(starts + (counts - 1) // 2, max(len(values) - 1, 0))
+    hi = np.minimum(starts + counts // 2, max(len(values) - 1, 0))
+    if not len(values):
+        return np.full(n_groups, np.nan)
+    return np.where(counts > 0, (values[lo] + values[hi]) / 2.0, np.nan)
+
+
+class CohortTable:
+    """
+    Attention of many participants on the same test profile
+
+    Args:
+        ranks: {selector: rank} or a profile accepted by load_ranks
+        confidence: level of the confidence intervals of the means
+    """
+
+    def __init__(self, ranks, confidence=0.95, capacity=1024):
+        self.ranks = load_ranks(ranks)
+        self.selectors = list(self.ranks)
+        self.index = {selector: i for i, selector in enumerate(self.selectors)}
+        self.confidence = confidence
+
+        self.rows = np.zeros(capacity, dtype=ROW_DTYPE)
+        self.size = 0
+        self.sessions = np.zeros(64, dtype=SESSION_DTYPE)
+        self.session_ids = []
+        self.session_rows = {}   # session id -> (session index, first row, last row)
+
+        # running group-by state per component, updated per added/removed session
+        self.count = np.zeros(0)
+        self.dwell_sum = np.zeros(0)
+        self.dwell_sumsq = np.zeros(0)
+        self.rank_count = np.zeros(0)
+        self.rank_sum = np.zeros(0)
+        self.fixation_sum = np.zeros(0)
+        self._resize_components()
+
+    def _resize_components(self):
+        n = len(self.selectors)
+        for name in ('count', 'dwell_sum', 'dwell_sumsq', 'rank_count', 'rank_sum', 'fixation_sum'):
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate((column, np.zeros(n - len(column)))))
+
+    def _component(self, selector):
+        if selector not in self.index:
+            # seen on the page but not ranked in the profile
+            self.index[selector] = len(self.selectors)
+            self.selectors.append(selector)
+            self._resize_components()
+        return self.index[selector]
+
+    def __len__(self):
+        return len(self.session_rows)
+
+    @property
+    def data(self):
+        """Valid rows of the columnar store"""
+        rows = self.rows[:self.size]
+        return rows[rows['valid']]
+
+    def add_session(self, session_id, stats):
+        """
+        Add (or replace) one participant's session
+
+        Args:
+            stats: a DwellAggregator, its stats() or {selector: dwell seconds}
+
+        Returns:
+            the session's cached metrics (score, spearman, kendall, weighted_error)
+        """
+        if isinstance(stats, DwellAggregator):
+            stats = stats.stats()
+        if session_id in self.session_rows:
+            self.remove_session(session_id)
+
+        records = [(self._component(selector), value if isinstance(value, dict) else {'dwell': value})
+                   for selector, value in stats.items()]
+        n = len(records)
+        components = np.array([c for c, _ in records], dtype=np.int32)
+        dwell = np.array([float(r['dwell']) for _, r in records])
+
+        # per-session rank metrics over the components this session measured
+        expected = np.array([self.ranks.get(self.selectors[c], np.nan) for c in components], dtype=float)
+        metrics = rank_metrics(expected, dwell)
+
+        session = len(self.session_ids)
+        self.session_ids.append(session_id)
+        self.sessions = _grow(self.sessions, session + 1)
+        self.sessions[session] = (metrics['score'], metrics['spearman'], metrics['kendall'],
+                                  metrics['weighted_error'], True)
+
+        self.rows = _grow(self.rows, self.size + n)
+        rows = self.rows[self.size:self.size + n]
+        rows['session'] = session
+        rows['component'] = components
+        rows['dwell'] = dwell
+        rows['fixations'] = [r.get('fixations', 0) for _, r in records]
+        rows['ttff'] = [np.nan if r.get('time_to_first_fixation') is None else r['time_to_first_fixation']
+                        for _, r in records]
+        rows['visits'] = [r.get('visits', 0) for _, r in records]
+        rows['actual_rank'] = metrics['actual_rank']
+        rows['valid'] = True
+        self.session_rows[session_id] = (session, self.size, self.size + n)
+        self.size += n
+
+        self._accumulate(rows, 1.0)
+        return self.session_summary(session_id)
+
+    def add_sessions(self, sessions):
+        """Add {session id: stats} for many sessions"""
+        for session_id, stats in sessions.items():
+            self.add_session(session_id, stats)
+
+    def remove_session(self, session_id):
+        session, start, stop = self.session_rows.pop(session_id)
+        rows = self.rows[start:stop]
+        self._accumulate(rows, -1.0)
+        rows['valid'] = False
+        self.sessions[session]['valid'] = False
+
+    def _accumulate(self, rows, sign):
+        components = rows['component']
+        np.add.at(self.count, components, sign)
+        np.add.at(self.dwell_sum, components, sign * rows['dwell'])
+        np.add.at(self.dwell_sumsq, components, sign * rows['dwell'] ** 2)
+        ranked = np.isfinite(rows['actual_rank'])
+        np.add.at(self.rank_count, components[ranked], sign)
+        np.add.at(self.rank_sum, components[ranked], sign * rows['actual_rank'][ranked])
+        np.add.at(self.fixation_sum, components, sign * rows['fixations'])
+
+    def session_summary(self, session_id):
+        session = self.sessions[self.session_rows[session_id][0]]
+        return {name: float(session[name]) for name in ('score', 'spearman', 'kendall', 'weighted_error')}
+
+    def _critical_value(self, n):
+        if scipy_stats is not None:
+            with np.errstate(invalid='ignore'):
+                return scipy_stats.t.ppf(0.5 + self.confidence / 2, np.maximum(n - 1, 1))
+        return np.full(np.shape(n), NormalDist().inv_cdf(0.5 + self.confidence / 2))
+
+    def summary(self):
+        """
+        Per-component statistics across participants
+
+        Returns:
+            {selector: {'rank', 'participants', 'mean', 'median', 'std', 'ci_low',
+            'ci_high', 'mean_rank', 'consensus_rank', 'mean_fixations', 'median_ttff'}}
+        """
+        k = len(self.selectors)
+        n = self.count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.dwell_sum / n
+            variance = np.maximum(self.dwell_sumsq - n * mean ** 2, 0.0) / (n - 1)
+            std = np.where(n > 1, np.sqrt(variance), np.nan)
+            half = self._critical_value(n) * std / np.sqrt(n)
+            mean_rank = self.rank_sum / self.rank_count
+            mean_fixations = self.fixation_sum / n
+
+        data = self.data
+        median = group_median(data['component'], data['dwell'], k)
+        median_ttff = group_median(data['component'], data['ttff'], k)
+        consensus = np.empty(k)
+        consensus[np.argsort(np.where(np.isfinite(mean_rank), mean_rank, np.inf), kind='stable')] = np.arange(1, k + 1)
+
+        return {selector: {
+            'rank': self.ranks.get(selector),
+            'participants': int(n[i]),
+            'mean': float(mean[i]),
+            'median': float(median[i]),
+            'std': float(std[i]),
+            'ci_low': float(mean[i] - half[i]),
+            'ci_high': float(mean[i] + half[i]),
+            'mean_rank': float(mean_rank[i]),
+            'consensus_rank': int(consensus[i]),
+            'mean_fixations': float(mean_fixations[i]),
+            'median_ttff': float(median_ttff[i]),
+        } for i, selector in enumerate(self.selectors)}
+
+    def rank_matrix(self):
+        """(participants, components) actual ranks, NaN where a session lacks a component"""
+        sessions = np.array([rows[0] for rows in self.session_rows.values()], dtype=int)
+        lookup = np.full(len(self.session_ids), -1)
+        lookup[sessions] = np.arange(len(sessions))
+        matrix = np.full((len(sessions), len(self.selectors)), np.nan)
+        data = self.data
+        matrix[lookup[data['session']], data['component']] = data['actual_rank']
+        return matrix
+
+    def consensus(self):
+        """
+        Attention ranking the participants agree on
+
+        Returns:
+            dict: 'ranking' (selectors by mean attention rank), 'kendall_w'
+            (concordance 0-1 over sessions that measured every ranked component),
+            'mean_score' and 'median_score' of the per-session alignment scores
+        """
+        summary = self.summary()
+        ranking = sorted((s for s in self.selectors if summary[s]['participants']),
+                         key=lambda s: summary[s]['consensus_rank'])
+
+        # profile components only: unranked extras differ from page to page
+        matrix = self.rank_matrix()[:, :len(self.ranks)]
+        complete = matrix[np.isfinite(matrix).all(axis=1)]
+        m, k = complete.shape
+        kendall_w = np.nan
+        if m >= 2 and k >= 2:
+            rank_sums = complete.sum(axis=0)
+            # tie correction: sum of t^3 - t over groups of t tied ranks, per participant
+            tied = (complete[:, :, None] == complete[:, None, :]).sum(axis=2)
+            ties = (tied ** 2 - 1).sum()
+            with np.errstate(invalid='ignore', divide='ignore'):
+                kendall_w = 12 * ((rank_sums - rank_sums.mean()) ** 2).sum() / (m ** 2 * (k ** 3 - k) - m * ties)
+
+        scores = self.sessions[:len(self.session_ids)]
+        scores = scores['score'][scores['valid']]
+        return {
+            'ranking': ranking,
+            'kendall_w': float(kendall_w),
+            'mean_score': float(np.nanmean(scores)) if len(scores) else float('nan'),
+            'median_score': float(np.nanmedian(scores)) if len(scores) else float('nan'),
+        }
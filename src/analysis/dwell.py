@@ -0,0 +1,249 @@
+"""
+Streaming dwell-time aggregation.
+
+Turns timestamped gaze samples (or fixation events) attributed to page
+components into per-component attention statistics, updated in O(1) per
+sample, and emits the attention_data records gemSuggest consumes. Recorded
+sessions (recording.SessionRecorder logs) are replayed with from_session.
+"""
+
+import json
+
+from .metrics import score_session
+
+try:
+    from ..recording import read_session
+except ImportError:
+    from recording import read_session
+
+
+class ComponentStats:
+    """Attention statistics of one ranked component."""
+
+    __slots__ = ('selector', 'rank', 'dwell', 'fixations', 'first_fixation',
+                 'visits', 'last_seen')
+
+    def __init__(self, selector, rank):
+        self.selector = selector
+        self.rank = rank
+        self.dwell = 0.0             # seconds
+        self.fixations = 0
+        self.first_fixation = None   # seconds from session start (TTFF)
+        self.visits = 0
+        self.last_seen = None        # timestamp of the last sample on the component
+
+    @property
+    def revisits(self):
+        return max(self.visits - 1, 0)
+
+    def as_dict(self):
+        return {
+            'selector': self.selector,
+            'rank': self.rank,
+            'dwell': self.dwell,
+            'fixations': self.fixations,
+            'time_to_first_fixation': self.first_fixation,
+            'visits': self.visits,
+            'revisits': self.revisits,
+        }
+
+
+def load_ranks(profile):
+    """
+    {selector: rank} of a profile written by TestUIManager.save_test_config
+
+    Args:
+        profile: path of the profile JSON, the loaded dict, its 'ranks' or
+            an already flat {selector: rank}
+    """
+    if isinstance(profile, str):
+        with open(profile, encoding='utf-8') as f:
+            profile = json.load(f)
+    ranks = profile.get('ranks', profile)
+    if all(isinstance(rank, int) for rank in ranks.values()):
+        return dict(ranks)
+
+    selectors = {}
+    for rank in sorted(ranks, key=int):
+        for component in ranks[rank]:
+            # a component listed twice keeps its most important rank
+            selectors.setdefault(component['selector'], int(rank))
+    return selectors
+
+
+class DwellAggregator:
+    """
+    Incremental per-component attention statistics for one session
+
+    Feed either samples (add_sample) or fixation events (add_fixation).
+    A sample's time runs until the next sample, capped at max_gap so tracking
+    dropouts do not count as dwell. A visit starts when the gaze lands on a
+    component after another component, or after being away longer than
+    revisit_gap.
+
+    Args:
+        ranks: {selector: rank} or a profile accepted by load_ranks
+        html_components: {selector: outer HTML} sent to the LLM per component
+        max_gap: longest time in seconds one sample may account for
+        revisit_gap: seconds away from a component before returning counts as a revisit
+        fixation_threshold: sample fixation values above this count as fixating
+        start_time: session start for time to first fixation, defaults to the first sample
+    """
+
+    def __init__(self, ranks, html_components=None, max_gap=0.1, revisit_gap=0.25,
+                 fixation_threshold=0.0, start_time=None):
+        self.components = {selector: ComponentStats(selector, rank)
+                           for selector, rank in load_ranks(ranks).items()}
+        self.html_components = html_components or {}
+        self.max_gap = max_gap
+        self.revisit_gap = revisit_gap
+        self.fixation_threshold = fixation_threshold
+        self.start_time = start_time
+
+        self.samples = 0
+        self.duration = 0.0
+        self.off_target = 0.0        # seconds on no ranked component
+        self._last_time = None
+        self._last_component = None  # ComponentStats or None
+        self._last_fixating = False
+        self._last_target = None     # last component seen, ignoring off-target samples
+
+    @classmethod
+    def from_session(cls, log_path, profile=None, **kwargs):
+        """
+        Aggregator fed with every sample of a recorded session log
+
+        Args:
+            log_path: SessionRecorder log
+            profile: ranks as accepted by load_ranks, defaults to the profile
+                stored in the log
+            kwargs: passed to DwellAggregator
+        """
+        metadata, records = read_session(log_path)
+        if profile is None:
+            profile = metadata.get('profile')
+            if not isinstance(profile, dict) or 'ranks' not in profile:
+                raise ValueError(f"{log_path} stores no ranked profile, pass one")
+        aggregator = cls(profile, **kwargs)
+
+        # element ids index the log's element table, -1 (no element) maps to None
+        selectors = list(metadata.get('elements') or ()) + [None]
+        for timestamp, element, fixation in zip(records['timestamp'].tolist(),
+                                                records['element'].tolist(),
+                                                records['fixation'].tolist()):
+            aggregator.add_sample(timestamp, selectors[element], fixation)
+        return aggregator
+
+    def add_sample(self, timestamp, selector, fixation=False):
+        """
+        One gaze sample attributed to a selector (None when on no component)
+        """
+        if self.start_time is None:
+            self.start_time = timestamp
+        component = self.components.get(selector)
+        fixating = fixation is not None and fixation > self.fixation_threshold
+
+        # the previous sample holds until this one
+        if self._last_time is not None:
+            dt = min(max(timestamp - self._last_time, 0.0), self.max_gap)
+            self.duration += dt
+            if self._last_component is not None:
+                self._last_component.dwell += dt
+            else:
+                self.off_target += dt
+
+        if component is not None:
+            self._visit(component, timestamp)
+            if fixating and not (self._last_fixating and component is self._last_component):
+                self._fixation_started(component, timestamp)
+            component.last_seen = timestamp
+            self._last_target = component
+
+        self.samples += 1
+        self._last_time = timestamp
+        self._last_component = component
+        self._last_fixating = fixating
+
+    def add_samples(self, samples):
+        """Iterable of (timestamp, selector, fixation) tuples or dicts with those keys"""
+        for sample in samples:
+            if isinstance(sample, dict):
+                self.add_sample(sample['timestamp'], sample.get('selector'), sample.get('fixation', False))
+            else:
+                self.add_sample(*sample)
+
+    def add_fixation(self, start, end, selector):
+        """One fixation event from an external fixation detector"""
+        if self.start_time is None:
+            self.start_time = start
+        duration = max(end - start, 0.0)
+        self.duration += duration
+        component = self.components.get(selector)
+        self._last_time = end
+        if component is None:
+            self.off_target += duration
+            self._last_component = None
+            return
+        self._visit(component, start)
+        component.dwell += duration
+        self._fixation_started(component, start)
+        component.last_seen = end
+        self._last_target = self._last_component = component
+
+    def _visit(self, component, timestamp):
+        # a new visit unless the gaze is still on the component, or only left it briefly
+        if component is self._last_component:
+            return
+        if component is not self._last_target or timestamp - component.last_seen > self.revisit_gap:
+            component.visits += 1
+
+    def _fixation_started(self, component, timestamp):
+        component.fixations += 1
+        if component.first_fixation is None:
+            component.first_fixation = timestamp - self.start_time
+
+    def stats(self):
+        """{selector: statistics dict} of every ranked component"""
+        return {selector: component.as_dict() for selector, component in self.components.items()}
+
+    def dwell_times(self):
+        """{selector: seconds}, the actual_times data.py used to hard-code"""
+        return {selector: component.dwell for selector, component in self.components.items()}
+
+    def attention_data(self, precision=2):
+        """
+        Records for gemSuggest.launch_web_viewer, ordered by desired attention
+
+        Returns:
+            list of {'desiredAttention', 'actualAttention', 'rankingScore',
+            'alignmentScore', 'html_component'}; rankingScore is the rank delta,
+            alignmentScore the component's 1-100 score
+        """
+        scores = self.scores()['components']
+        records = []
+        for component in sorted(self.components.values(), key=lambda c: c.rank):
+            selector = component.selector
+            records.append({
+                "desiredAttention": component.rank,
+                "actualAttention": round(component.dwell, precision),
+                "rankingScore": scores[selector]['delta'],
+                "alignmentScore": scores[selector]['score'],
+                "html_component": self.html_components.get(
+                    selector, f"<div class='{selector}'>{selector}</div>"),
+            })
+        return records
+
+    def scores(self):
+        """Rank agreement of the session so far, see analysis.metrics.score_session"""
+        return score_session({s: c.rank for s, c in self.components.items()}, self.dwell_times())
+
+    def report_rows(self):
+        """Rows for ReportManager, higher importance is more important"""
+        scores = self.scores()['components']
+        lowest = max((c.rank for c in self.components.values()), default=0)
+        return [{
+            'name': selector,
+            'importance': lowest + 1 - component.rank,
+            'time_spent': round(component.dwell, 1),
+            'score': scores[selector]['score'],
+        } for selector, component in self.components.items()]
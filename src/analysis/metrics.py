@@ -0,0 +1,178 @@
+"""
+Rank agreement between intended and measured attention.
+
+Every function works on a single session (N,) or a stack of sessions (S, N)
+at once. Missing components are NaN: a component absent from either side is
+left out of that session's ranking. Tied values share their average rank.
+Rank 1 is the most important component, or the one with the most attention.
+"""
+
+import numpy as np
+
+
+def average_ranks(values, descending=False):
+    """
+    1-based ranks along the last axis, ties get the average of their ranks, NaN stays NaN
+
+    Args:
+        values: (..., N) array
+        descending: rank the largest value first (attention) instead of the smallest (priority)
+    """
+    values = np.asarray(values, dtype=float)
+    keys = -values if descending else values
+    n = keys.shape[-1]
+    if n == 0:
+        return keys.copy()
+
+    order = np.argsort(keys, axis=-1, kind='stable')   # NaNs sort last
+    ordered = np.take_along_axis(keys, order, axis=-1)
+    positions = np.broadcast_to(np.arange(n), ordered.shape)
+
+    # runs of equal values: every element gets the first and last position of its run
+    changes = ordered[..., 1:] != ordered[..., :-1]
+    starts = np.concatenate((np.ones(ordered.shape[:-1] + (1,), bool), changes), axis=-1)
+    ends = np.concatenate((changes, np.ones(ordered.shape[:-1] + (1,), bool)), axis=-1)
+    first = np.maximum.accumulate(np.where(starts, positions, 0), axis=-1)
+    last = np.flip(np.minimum.accumulate(np.flip(np.where(ends, positions, n), -1), axis=-1), -1)
+
+    ranks = np.empty_like(keys)
+    np.put_along_axis(ranks, order, (first + last) / 2.0 + 1.0, axis=-1)
+    ranks[np.isnan(keys)] = np.nan
+    return ranks
+
+
+def _masked(expected, actual):
+    expected = np.asarray(expected, dtype=float)
+    actual = np.asarray(actual, dtype=float)
+    expected, actual = np.broadcast_arrays(expected, actual)
+    valid = np.isfinite(expected) & np.isfinite(actual)
+    return np.where(valid, expected, np.nan), np.where(valid, actual, np.nan), valid
+
+
+def spearman(expected_rank, actual_rank):
+    """Spearman rho as the Pearson correlation of the ranks, NaN with fewer than 2 components"""
+    valid = np.isfinite(expected_rank) & np.isfinite(actual_rank)
+    count = valid.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        e = expected_rank - np.nanmean(np.where(valid, expected_rank, np.nan), axis=-1, keepdims=True)
+        a = actual_rank - np.nanmean(np.where(valid, actual_rank, np.nan), axis=-1, keepdims=True)
+        e = np.where(valid, e, 0.0)
+        a = np.where(valid, a, 0.0)
+        rho = (e * a).sum(-1) / np.sqrt((e * e).sum(-1) * (a * a).sum(-1))
+    return np.where(count >= 2, rho, np.nan)
+
+
+def kendall(expected_rank, actual_rank):
+    """
+    Kendall tau-b, corrected for ties on either side
+
+    Compares all pairs with broadcasting, O(N^2) memory per session, fine for
+    the tens of components a page profile ranks.
+    """
+    valid = np.isfinite(expected_rank) & np.isfinite(actual_rank)
+    pairs = valid[..., :, None] & valid[..., None, :]
+    pairs &= np.triu(np.ones(pairs.shape[-2:], bool), 1)
+    de = np.sign(expected_rank[..., :, None] - expected_rank[..., None, :])
+    da = np.sign(actual_rank[..., :, None] - actual_rank[..., None, :])
+    de = np.where(pairs, de, 0.0)
+    da = np.where(pairs, da, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        tau = (de * da).sum((-2, -1)) / np.sqrt((de != 0).sum((-2, -1)) * (da != 0).sum((-2, -1)))
+    return tau
+
+
+def rank_metrics(expected, actual, weights=None):
+    """
+    Per-component rank deltas and per-session agreement in one call
+
+    Args:
+        expected: (N,) or (S, N) intended priority, 1 = most important
+        actual: same shape, measured attention (e.g. dwell seconds), larger = more
+        weights: per-component weights of the rank error, default 1 / expected rank
+            so misplacing important components costs more
+
+    Returns:
+        dict of arrays:
+            expected_rank, actual_rank, delta (actual - expected rank, positive
+            when a component got less attention than intended),
+            component_score (1-100 per component), spearman, kendall,
+            weighted_error (0 = same order, 1 = reversed order), score (1-100
+            alignment), count (components ranked)
+    """
+    expected, actual, valid = _masked(expected, actual)
+    expected_rank = average_ranks(expected)
+    actual_rank = average_ranks(actual, descending=True)
+    delta = actual_rank - expected_rank
+
+    count = valid.sum(axis=-1)
+    worst = np.maximum(count - 1, 1)[..., None]
+    if weights is None:
+        weights = 1.0 / expected_rank
+    weights = np.where(valid, np.broadcast_to(np.asarray(weights, dtype=float), delta.shape), 0.0)
+    # normalised by the error of the fully reversed order, so 1 means reversed
+    reversed_delta = np.abs(count[..., None] + 1 - 2 * expected_rank)
+    error = np.where(valid, weights * np.abs(delta), 0.0).sum(-1)
+    reversed_error = np.where(valid, weights * reversed_delta, 0.0).sum(-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weighted_error = np.clip(np.where(reversed_error > 0, error / reversed_error, 0.0), 0.0, 1.0)
+
+    return {
+        'expected_rank': expected_rank,
+        'actual_rank': actual_rank,
+        'delta': delta,
+        'component_score': np.round(100 - 99 * np.abs(delta) / worst),
+        'spearman': spearman(expected_rank, actual_rank),
+        'kendall': kendall(expected_rank, actual_rank),
+        'weighted_error': weighted_error,
+        'score': np.where(count > 0, np.round(100 - 99 * weighted_error), np.nan),
+        'count': count,
+    }
+
+
+def score_session(expected_priorities, actual_times, weights=None):
+    """
+    rank_metrics for one session given as dicts
+
+    Args:
+        expected_priorities: {selector: priority}, 1 = most important
+        actual_times: {selector: attention}; selectors missing on either side are skipped
+
+    Returns:
+        dict with the session metrics as floats and 'components':
+        {selector: {'expected_rank', 'actual_rank', 'delta', 'score'}}
+    """
+    selectors = list(expected_priorities) + [s for s in actual_times if s not in expected_priorities]
+    expected = np.array([expected_priorities.get(s, np.nan) for s in selectors], dtype=float)
+    actual = np.array([actual_times.get(s, np.nan) for s in selectors], dtype=float)
+    if weights is not None:
+        weights = np.array([weights.get(s, 1.0) for s in selectors], dtype=float)
+    metrics = rank_metrics(expected, actual, weights)
+
+    components = {}
+    for i, selector in enumerate(selectors):
+        if np.isfinite(metrics['delta'][i]):
+            components[selector] = {
+                'expected_rank': _number(metrics['expected_rank'][i]),
+                'actual_rank': _number(metrics['actual_rank'][i]),
+                'delta': _number(metrics['delta'][i]),
+                'score': _number(metrics['component_score'][i]),
+            }
+    result = {key: _number(metrics[key]) for key in ('spearman', 'kendall', 'weighted_error', 'score', 'count')}
+    result['components'] = components
+    return result
+
+
+def rank_deltas(actual_times, expected_priorities):
+    """
+    {selector: actual rank - expected rank}, positive when a component got
+    less attention than intended; selectors missing on either side are skipped
+    """
+    components = score_session(expected_priorities, actual_times)['components']
+    return {selector: values['delta'] for selector, values in components.items()}
+
+
+def _number(value):
+    value = float(value)
+    if np.isfinite(value) and value.is_integer():
+        return int(value)
+    return value
@@ -15,20 +15,42 @@ from selenium.common.exceptions import WebDriverException, TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 from tkinter import messagebox
 import threading
+import base64
 import time
 import tempfile
 import os
 
+from . import gaze_scripts
+from . import gaze_socket
+
 
 class BrowserManager:
     """Manages Selenium WebDriver browser with JavaScript injection capabilities."""
     
-    def __init__(self):
-        """Initialize the Selenium browser manager."""
+    def __init__(self, gaze_batch_interval=0.15, index_refresh=0.5):
+        """
+        Initialize the Selenium browser manager.
+        
+        Args:
+            gaze_batch_interval: Seconds between gaze batches pushed through
+                WebDriver when the gaze socket is unavailable (0.1-0.25 works well)
+            index_refresh: Seconds between copies of the page's component
+                index fetched for attribute()
+        """
+        if gaze_batch_interval <= 0:
+            raise ValueError("gaze_batch_interval must be positive")
         self.driver = None
         self.eye_tracker = None
         self.tracking_thread = None
         self.tracking_active = False
+        self.gaze_subscription = None
+        self.gaze_socket = None
+        self.attention_targets = []
+        self.gaze_batch_interval = gaze_batch_interval
+        self.gaze_batches_sent = 0
+        self.index_refresh = index_refresh
+        self.index_snapshot = None
+        self.index_fetched = None
         
     def validate_url(self, url):
         """Validate and normalize the URL."""
@@ -171,11 +193,11 @@ class BrowserManager:
             if main_window:
                 main_window.deiconify()
     
-    def inject_javascript(self, script):
-        """Inject custom JavaScript into the current page."""
+    def inject_javascript(self, script, *args):
+        """Inject custom JavaScript into the current page, args are available as arguments[i]."""
         if self.driver:
             try:
-                return self.driver.execute_script(script)
+                return self.driver.execute_script(script, *args)
             except Exception as e:
                 print(f"⚠️ JavaScript injection failed: {e}")
                 return None
@@ -195,6 +217,10 @@ class BrowserManager:
                 WebDriverWait(self.driver, 10).until(
                     EC.presence_of_element_located((By.TAG_NAME, "body"))
                 )
+                
+                # A new document lost the gaze overlay and socket client
+                if self.eye_tracker is not None:
+                    self._inject_gaze_scripts()
                 return True
                 
             except Exception as e:
@@ -202,74 +228,143 @@ class BrowserManager:
                 return False
         return False
     
-    def integrate_eye_tracker(self, eye_tracker):
-        """Integrate eye tracking with real-time gaze overlay."""
+    def integrate_eye_tracker(self, eye_tracker, targets=None, use_socket=True):
+        """
+        Integrate eye tracking with real-time gaze overlay and attention collection.
+        
+        Samples go straight from a local WebSocket to the page, which draws the
+        overlay and accumulates dwell time per element. When the socket is
+        unavailable (websockets missing, or the page cannot reach localhost)
+        samples are pushed through WebDriver in batches every
+        gaze_batch_interval seconds and replayed smoothly by the page.
+        
+        Args:
+            eye_tracker: EyeTracker providing the gaze samples
+            targets: A profile's ranks dict or CSS selectors in order of
+                importance attention is collected for; elements under the
+                gaze (id or tag) when omitted
+            use_socket: Try the WebSocket transport first
+        """
         self.eye_tracker = eye_tracker
+        self.attention_targets = targets or []
+        self._inject_gaze_scripts()
         
-        # Inject eye tracking overlay
-        overlay_script = """
-        // Create gaze overlay
-        if (!window.gazeOverlay) {
-            const overlay = document.createElement('div');
-            overlay.id = 'gaze-overlay';
-            overlay.style.cssText = `
-                position: fixed; top: 0; left: 0; width: 100vw; height: 100vh;
-                pointer-events: none; z-index: 999998; background: transparent;
-            `;
-            
-            const gazeCircle = document.createElement('div');
-            gazeCircle.id = 'gaze-circle';
-            gazeCircle.style.cssText = `
-                position: absolute; width: 40px; height: 40px;
-                border: 3px solid #FFD700; border-radius: 50%;
-                transform: translate(-50%, -50%); display: none;
-                background: rgba(255, 215, 0, 0.2);
-                box-shadow: 0 0 15px rgba(255, 215, 0, 0.5);
-            `;
-            
-            overlay.appendChild(gazeCircle);
-            document.body.appendChild(overlay);
-            
-            window.gazeOverlay = {
-                update: (x, y, fixating) => {
-                    gazeCircle.style.left = x + 'px';
-                    gazeCircle.style.top = y + 'px';
-                    gazeCircle.style.display = 'block';
-                    gazeCircle.style.borderColor = fixating ? '#00FF00' : '#FFD700';
-                    gazeCircle.style.background = fixating ? 'rgba(0, 255, 0, 0.3)' : 'rgba(255, 215, 0, 0.2)';
-                },
-                hide: () => gazeCircle.style.display = 'none'
-            };
-        }
+        if use_socket and self._start_gaze_socket(eye_tracker):
+            print("✅ Eye tracker integrated! (WebSocket)")
+            return
+        
+        self._start_webdriver_gaze_loop(eye_tracker)
+        print("✅ Eye tracker integrated!")
+    
+    def _inject_gaze_scripts(self):
+        """Inject the overlay, attention collector and the client of the running transport."""
+        self.inject_javascript(gaze_scripts.overlay_script())
+        self.inject_javascript(gaze_scripts.attention_script(self.attention_targets))
+        if self.gaze_socket is not None:
+            self.inject_javascript(gaze_scripts.socket_client_script(self.gaze_socket.url))
+        elif self.gaze_subscription is not None:
+            self.inject_javascript(gaze_scripts.player_script(delay=1.5 * self.gaze_batch_interval))
+    
+    def _start_gaze_socket(self, eye_tracker):
+        """Start the WebSocket broadcaster and wait for the page to connect."""
+        if not gaze_socket.available():
+            print("⚠️ websockets not installed, using WebDriver gaze updates")
+            return False
+        
+        broadcaster = gaze_socket.GazeBroadcaster(eye_tracker)
+        if not broadcaster.start():
+            print(f"⚠️ Gaze socket failed to start: {broadcaster.error}")
+            return False
+        
+        self.gaze_socket = broadcaster
+        self.inject_javascript(gaze_scripts.socket_client_script(broadcaster.url))
+        if not broadcaster.wait_for_client(timeout=3.0):
+            print("⚠️ Page could not connect to the gaze socket, using WebDriver gaze updates")
+            broadcaster.stop()
+            self.gaze_socket = None
+            return False
+        return True
+    
+    def _start_webdriver_gaze_loop(self, eye_tracker):
+        """
+        Fallback: collect samples in Python and push them in batches, one
+        execute_script per batch interval instead of one per sample.
         """
+        self.inject_javascript(gaze_scripts.player_script(delay=1.5 * self.gaze_batch_interval))
         
-        self.inject_javascript(overlay_script)
+        # Buffer enough samples for a whole interval; the tracker's producer loop
+        # paces samples, so other subscribers (e.g. a recorder) share the same frames
+        subscription = eye_tracker.subscribe(maxsize=256, policy="latest")
+        self.gaze_subscription = subscription
+        push_script = gaze_scripts.player_push_script()
         
         # Start gaze tracking thread
         def gaze_loop():
             self.tracking_active = True
+            next_push = time.monotonic()
             while self.tracking_active and self.driver:
                 try:
-                    gaze = self.eye_tracker.get_gaze()
-                    if gaze and gaze['position']:
-                        x, y = gaze['position']
-                        fixating = gaze.get('fixation', False)
-                        
-                        script = f"if(window.gazeOverlay) window.gazeOverlay.update({x}, {y}, {str(fixating).lower()});"
-                        self.inject_javascript(script)
-                        
-                    time.sleep(0.033)  # ~30 FPS
+                    next_push += self.gaze_batch_interval
+                    delay = next_push - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        next_push = time.monotonic()
+                    
+                    samples = subscription.drain()
+                    if not samples:
+                        if subscription.closed:
+                            break
+                        continue
+                    
+                    payload = base64.b64encode(gaze_socket.pack_samples(samples)).decode('ascii')
+                    self.inject_javascript(push_script, payload)
+                    self.gaze_batches_sent += 1
                 except Exception as e:
                     print(f"⚠️ Gaze tracking error: {e}")
                     time.sleep(0.1)
         
         self.tracking_thread = threading.Thread(target=gaze_loop, daemon=True)
         self.tracking_thread.start()
-        print("✅ Eye tracker integrated!")
+    
+    def get_attention(self):
+        """
+        Dwell time in seconds per attention target collected by the page.
+        
+        Returns:
+            dict: {selector: seconds}
+        """
+        if self.gaze_socket is not None and self.gaze_socket.attention:
+            return dict(self.gaze_socket.attention)
+        attention = self.inject_javascript(
+            "return window.gazeAttention ? window.gazeAttention.snapshot() : {};")
+        return attention or {}
+    
+    def attribute(self, x, y):
+        """
+        Ranked component under a gaze point, for labelling recorded samples.
+        
+        Uses a copy of the page's window.gazeIndex refreshed at most every
+        index_refresh seconds, so attributing a sample costs no WebDriver call.
+        
+        Returns:
+            str: selector of the component, or None
+        """
+        now = time.monotonic()
+        if self.index_fetched is None or now - self.index_fetched >= self.index_refresh:
+            self.index_fetched = now
+            self.index_snapshot = self.inject_javascript(gaze_scripts.index_snapshot_script())
+        return gaze_scripts.index_lookup(self.index_snapshot, x, y)
     
     def close_browser(self):
         """Close the browser and cleanup."""
         self.tracking_active = False
+        if self.gaze_socket is not None:
+            self.gaze_socket.stop()
+            self.gaze_socket = None
+        if self.gaze_subscription is not None:
+            self.gaze_subscription.close()
+            self.gaze_subscription = None
         
         if self.driver:
             try:
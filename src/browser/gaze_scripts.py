@@ -0,0 +1,481 @@
+"""
+JavaScript injected into pages for gaze display and attention collection.
+
+The overlay draws the gaze circle; the socket client subscribes to the
+GazeBroadcaster directly, feeds the overlay and accumulates per-element dwell
+time, so no WebDriver call is needed per sample. Where the socket is blocked,
+the player receives the same binary frames in WebDriver batches and replays
+them smoothly.
+"""
+
+import json
+
+OVERLAY_SCRIPT = """
+// Create gaze overlay
+if (!window.gazeOverlay) {
+    const overlay = document.createElement('div');
+    overlay.id = 'gaze-overlay';
+    overlay.style.cssText = `
+        position: fixed; top: 0; left: 0; width: 100vw; height: 100vh;
+        pointer-events: none; z-index: 999998; background: transparent;
+    `;
+
+    const gazeCircle = document.createElement('div');
+    gazeCircle.id = 'gaze-circle';
+    gazeCircle.style.cssText = `
+        position: absolute; width: 40px; height: 40px;
+        border: 3px solid #FFD700; border-radius: 50%;
+        transform: translate(-50%, -50%); display: none;
+        background: rgba(255, 215, 0, 0.2);
+        box-shadow: 0 0 15px rgba(255, 215, 0, 0.5);
+    `;
+
+    overlay.appendChild(gazeCircle);
+    document.body.appendChild(overlay);
+
+    window.gazeOverlay = {
+        update: (x, y, fixating) => {
+            gazeCircle.style.left = x + 'px';
+            gazeCircle.style.top = y + 'px';
+            gazeCircle.style.display = 'block';
+            gazeCircle.style.borderColor = fixating ? '#00FF00' : '#FFD700';
+            gazeCircle.style.background = fixating ? 'rgba(0, 255, 0, 0.3)' : 'rgba(255, 215, 0, 0.2)';
+        },
+        hide: () => gazeCircle.style.display = 'none'
+    };
+}
+"""
+
+# Spatial index of the ranked components: selectors are resolved once into
+# page-coordinate rects bucketed in a uniform grid, rebuilt only when the layout
+# may have changed (resize, DOM mutation, an inner scroll container scrolled)
+INDEX_SCRIPT = """
+if (!window.gazeIndex) {
+    const CELL = 128;             // grid cell size in px
+    const MIN_REBUILD_MS = 200;   // layout churn rebuilds at most this often
+
+    const index = {
+        targets: [],              // [{selector, rank}], rank 1 = most important
+        entries: [],              // {selector, rank, left, top, right, bottom, area, fixed}
+        grid: new Map(),          // page coordinates, "cx,cy" -> entry indices
+        fixedGrid: new Map(),     // viewport coordinates, for position: fixed elements
+        observed: new WeakSet(),  // elements the ResizeObserver watches, each observed once
+        fresh: new Set(),         // observed elements whose initial notification is pending
+        dirty: true,
+        builtAt: 0,
+        builds: 0,
+        lookups: 0,
+        setTargets(targets) {
+            this.targets = targets;
+            this.observe();
+            this.dirty = true;
+        },
+        isFixed(el) {
+            for (; el && el !== document.body; el = el.parentElement) {
+                if (getComputedStyle(el).position === 'fixed') return true;
+            }
+            return false;
+        },
+        insert(grid, i, e) {
+            for (let cx = Math.floor(e.left / CELL); cx <= Math.floor(e.right / CELL); cx++) {
+                for (let cy = Math.floor(e.top / CELL); cy <= Math.floor(e.bottom / CELL); cy++) {
+                    const key = cx + ',' + cy;
+                    if (!grid.has(key)) grid.set(key, []);
+                    grid.get(key).push(i);
+                }
+            }
+        },
+        watchSize(el) {
+            if (this.observed.has(el)) return;
+            this.observed.add(el);
+            this.fresh.add(el);
+            this.resizeObserver.observe(el);
+        },
+        build() {
+            this.entries = [];
+            this.grid = new Map();
+            this.fixedGrid = new Map();
+            const elements = [];
+            for (const target of this.targets) {
+                let found;
+                try {
+                    found = document.querySelectorAll(target.selector);
+                } catch (e) {
+                    continue;  // invalid selector
+                }
+                for (const el of found) {
+                    const r = el.getBoundingClientRect();
+                    if (r.width === 0 || r.height === 0) continue;
+                    const fixed = this.isFixed(el);
+                    const dx = fixed ? 0 : window.scrollX;
+                    const dy = fixed ? 0 : window.scrollY;
+                    const entry = {
+                        selector: target.selector, rank: target.rank, fixed: fixed,
+                        left: r.left + dx, top: r.top + dy, right: r.right + dx, bottom: r.bottom + dy,
+                        area: r.width * r.height
+                    };
+                    this.entries.push(entry);
+                    this.insert(fixed ? this.fixedGrid : this.grid, this.entries.length - 1, entry);
+                    elements.push(el);
+                }
+            }
+            if (this.resizeObserver) {
+                for (const el of elements) this.watchSize(el);
+            }
+            this.dirty = false;
+            this.builtAt = performance.now();
+            this.builds++;
+        },
+        search(grid, x, y, best) {
+            const cell = grid.get(Math.floor(x / CELL) + ',' + Math.floor(y / CELL));
+            if (!cell) return best;
+            for (const i of cell) {
+                const e = this.entries[i];
+                if (x < e.left || x > e.right || y < e.top || y > e.bottom) continue;
+                // the innermost ranked component wins, then the more important rank
+                if (!best || e.area < best.area || (e.area === best.area && e.rank < best.rank)) best = e;
+            }
+            return best;
+        },
+        lookup(x, y) {
+            // x, y are viewport coordinates, as drawn by the overlay
+            if (this.dirty && (!this.builds || performance.now() - this.builtAt > MIN_REBUILD_MS)) this.build();
+            this.lookups++;
+            // fixed components (headers, sidebars) are drawn over the scrolling page
+            const best = this.search(this.fixedGrid, x, y, null) ||
+                         this.search(this.grid, x + window.scrollX, y + window.scrollY, null);
+            return best ? best.selector : null;
+        },
+        observe() {
+            if (this.mutationObserver) return;
+            const invalidate = () => { this.dirty = true; };
+            this.mutationObserver = new MutationObserver((records) => {
+                const overlay = document.getElementById('gaze-overlay');
+                // the gaze overlay restyles itself every frame, it never moves components
+                if (records.some(r => !overlay || !overlay.contains(r.target))) invalidate();
+            });
+            this.mutationObserver.observe(document.body, {
+                childList: true, subtree: true, attributes: true,
+                attributeFilter: ['class', 'style', 'hidden', 'open']
+            });
+            if (window.ResizeObserver) {
+                this.resizeObserver = new ResizeObserver((entries) => {
+                    // the first report of a newly observed element is not a resize
+                    const resized = entries.filter(entry => !this.fresh.delete(entry.target));
+                    if (resized.length) invalidate();
+                });
+                this.watchSize(document.documentElement);
+            }
+            window.addEventListener('resize', invalidate);
+            // window scrolling is covered by page coordinates, inner scroll containers move their content
+            document.addEventListener('scroll', (event) => {
+                if (event.target !== document) invalidate();
+            }, true);
+        }
+    };
+    window.gazeIndex = index;
+}
+"""
+
+# Copy of the index for Python-side attribution (see index_lookup), one WebDriver call per refresh
+INDEX_SNAPSHOT_SCRIPT = """
+const index = window.gazeIndex;
+if (!index) return null;
+if (index.dirty) index.build();
+return {
+    scrollX: window.scrollX,
+    scrollY: window.scrollY,
+    entries: index.entries.map(e => [e.selector, e.rank, e.left, e.top, e.right, e.bottom, e.area, e.fixed])
+};
+"""
+
+# Shared by every transport: turns samples into dwell time per target selector
+ATTENTION_SCRIPT = """
+if (!window.gazeAttention) {
+    const MAX_GAP = 0.1;  // seconds a single sample may account for
+    const attention = {
+        targets: [],
+        dwell: {},
+        lastTime: null,
+        changed: false,
+        setTargets(targets) {
+            this.targets = targets || [];
+            window.gazeIndex.setTargets(this.targets);
+        },
+        hit(x, y) {
+            if (this.targets.length) return window.gazeIndex.lookup(x, y);
+            const el = document.elementFromPoint(x, y);
+            if (!el) return null;
+            return el.id ? '#' + el.id : el.tagName.toLowerCase();
+        },
+        add(t, x, y) {
+            const dt = this.lastTime === null ? 0 : Math.min(Math.max(t - this.lastTime, 0), MAX_GAP);
+            this.lastTime = t;
+            const key = this.hit(x, y);
+            if (key === null || dt === 0) return;
+            this.dwell[key] = (this.dwell[key] || 0) + dt;
+            this.changed = true;
+        },
+        snapshot() {
+            const out = {};
+            for (const key in this.dwell) out[key] = Math.round(this.dwell[key] * 1000) / 1000;
+            return out;
+        },
+        reset() {
+            this.dwell = {};
+            this.lastTime = null;
+        }
+    };
+    window.gazeAttention = attention;
+}
+"""
+
+# Decoder for gaze_socket.pack_samples frames, used by every transport
+FRAME_SCRIPT = """
+if (!window.gazeFrames) {
+    window.gazeFrames = {
+        HEADER_SIZE: 4,
+        SAMPLE_SIZE: 21,
+        each(buffer, fn) {
+            const view = new DataView(buffer);
+            const count = view.getUint16(2, true);
+            for (let i = 0; i < count; i++) {
+                const o = this.HEADER_SIZE + i * this.SAMPLE_SIZE;
+                fn(view.getFloat64(o, true),      // timestamp
+                   view.getFloat32(o + 8, true),  // x
+                   view.getFloat32(o + 12, true), // y
+                   view.getFloat32(o + 16, true), // fixation
+                   view.getUint8(o + 20));        // flags
+            }
+            return count;
+        },
+        fromBase64(payload) {
+            return Uint8Array.from(atob(payload), c => c.charCodeAt(0)).buffer;
+        }
+    };
+}
+"""
+
+SOCKET_CLIENT_SCRIPT = """
+(function (url) {
+    if (window.gazeClient && window.gazeClient.url === url) return;
+    if (window.gazeClient) window.gazeClient.close();
+
+    const REPORT_INTERVAL = 1000;
+
+    const client = {
+        url: url,
+        socket: null,
+        connected: false,
+        closed: false,
+        samples: 0,
+        latest: null,
+        drawPending: false,
+        connect() {
+            const socket = new WebSocket(url);
+            socket.binaryType = 'arraybuffer';
+            socket.onopen = () => { this.connected = true; };
+            socket.onmessage = (event) => this.receive(event.data);
+            socket.onclose = () => {
+                this.connected = false;
+                if (!this.closed) setTimeout(() => this.connect(), 1000);
+            };
+            this.socket = socket;
+        },
+        receive(data) {
+            if (!(data instanceof ArrayBuffer)) return;
+            this.samples += window.gazeFrames.each(data, (t, x, y, fixation) => {
+                window.gazeAttention.add(t, x, y);
+                this.latest = [x, y, fixation > 0];
+            });
+            // draw the newest sample once per frame however many arrived
+            if (!this.drawPending && this.latest) {
+                this.drawPending = true;
+                requestAnimationFrame(() => {
+                    this.drawPending = false;
+                    if (window.gazeOverlay) window.gazeOverlay.update(...this.latest);
+                });
+            }
+        },
+        report() {
+            if (!this.connected || !window.gazeAttention.changed) return;
+            window.gazeAttention.changed = false;
+            this.socket.send(JSON.stringify({type: 'attention', attention: window.gazeAttention.snapshot()}));
+        },
+        attention() {
+            return window.gazeAttention.snapshot();
+        },
+        close() {
+            this.closed = true;
+            clearInterval(this.reporter);
+            if (this.socket) this.socket.close();
+        }
+    };
+    client.reporter = setInterval(() => client.report(), REPORT_INTERVAL);
+    window.gazeClient = client;
+    client.connect();
+})(__GAZE_URL__);
+"""
+
+# WebDriver fallback: batches arrive every few hundred ms, so samples are kept
+# in a ring buffer and replayed `delay` seconds behind real time, interpolating
+# between neighbours on every animation frame
+PLAYER_SCRIPT = """
+if (!window.gazePlayer) {
+    const CAPACITY = 512;
+    const IDLE = 1.0;  // seconds past the newest sample before playback stops
+
+    const player = {
+        t: new Float64Array(CAPACITY),
+        x: new Float32Array(CAPACITY),
+        y: new Float32Array(CAPACITY),
+        fix: new Uint8Array(CAPACITY),
+        head: 0,
+        size: 0,
+        delay: 0.2,
+        running: false,
+        samples: 0,
+        push(payload) {
+            this.samples += window.gazeFrames.each(window.gazeFrames.fromBase64(payload), (t, x, y, fixation) => {
+                window.gazeAttention.add(t, x, y);
+                if (this.size === CAPACITY) {
+                    this.head = (this.head + 1) % CAPACITY;
+                    this.size--;
+                }
+                const i = (this.head + this.size) % CAPACITY;
+                this.t[i] = t;
+                this.x[i] = x;
+                this.y[i] = y;
+                this.fix[i] = fixation > 0 ? 1 : 0;
+                this.size++;
+            });
+            if (!this.running && this.size) {
+                this.running = true;
+                requestAnimationFrame(() => this.frame());
+            }
+        },
+        frame() {
+            const now = Date.now() / 1000 - this.delay;
+            // drop samples once the playback time has passed their successor
+            while (this.size > 1 && this.t[(this.head + 1) % CAPACITY] <= now) {
+                this.head = (this.head + 1) % CAPACITY;
+                this.size--;
+            }
+            const a = this.head;
+            let x = this.x[a], y = this.y[a];
+            if (this.size > 1 && now > this.t[a]) {
+                const b = (a + 1) % CAPACITY;
+                const span = this.t[b] - this.t[a];
+                // samples sharing a timestamp have nothing to interpolate, show sample a
+                if (span > 0) {
+                    const u = Math.min((now - this.t[a]) / span, 1);
+                    x += (this.x[b] - x) * u;
+                    y += (this.y[b] - y) * u;
+                }
+            }
+            if (window.gazeOverlay) window.gazeOverlay.update(x, y, this.fix[a] === 1);
+
+            if (this.size === 1 && now > this.t[a] + IDLE) {
+                this.running = false;
+                return;
+            }
+            requestAnimationFrame(() => this.frame());
+        }
+    };
+    window.gazePlayer = player;
+}
+"""
+
+
+def overlay_script():
+    """Script creating window.gazeOverlay"""
+    return OVERLAY_SCRIPT
+
+
+def rank_targets(targets):
+    """
+    Attention targets as [{'selector', 'rank'}], most important first
+
+    Args:
+        targets: a profile's ranks ({"1": [{"selector": ..., "tag": ...}], ...})
+            or a list of selectors in order of importance
+    """
+    if isinstance(targets, dict):
+        ranked = []
+        for rank in sorted(targets, key=int):
+            for component in targets[rank]:
+                ranked.append({'selector': component['selector'], 'rank': int(rank)})
+    else:
+        ranked = [{'selector': selector, 'rank': i} for i, selector in enumerate(targets, 1)]
+
+    seen = set()
+    unique = []
+    for target in ranked:
+        if target['selector'] not in seen:
+            seen.add(target['selector'])
+            unique.append(target)
+    return unique
+
+
+def attention_script(targets=None):
+    """Script creating window.gazeAttention, optionally restricted to ranked targets (see rank_targets)"""
+    script = INDEX_SCRIPT + ATTENTION_SCRIPT
+    if targets:
+        script += f"window.gazeAttention.setTargets({_js(rank_targets(targets))});"
+    return script
+
+
+def index_snapshot_script():
+    """Script returning the rects of window.gazeIndex and the scroll offset, or null without an index"""
+    return INDEX_SNAPSHOT_SCRIPT
+
+
+def index_lookup(snapshot, x, y):
+    """
+    Selector of the ranked component under viewport point (x, y), as
+    window.gazeIndex.lookup would return it, from an index_snapshot_script() result
+
+    Returns:
+        the selector, or None outside every component
+    """
+    if not snapshot:
+        return None
+    entries = snapshot['entries']
+    best = _innermost(entries, True, x, y) or \
+        _innermost(entries, False, x + snapshot['scrollX'], y + snapshot['scrollY'])
+    return best[0] if best else None
+
+
+def _innermost(entries, fixed, x, y):
+    best = None
+    for entry in entries:
+        selector, rank, left, top, right, bottom, area, is_fixed = entry
+        if is_fixed != fixed or x < left or x > right or y < top or y > bottom:
+            continue
+        if best is None or area < best[6] or (area == best[6] and rank < best[1]):
+            best = entry
+    return best
+
+
+def frame_script():
+    """Script creating window.gazeFrames, the binary sample frame decoder"""
+    return FRAME_SCRIPT
+
+
+def socket_client_script(url):
+    """Script connecting window.gazeClient to a GazeBroadcaster url"""
+    return FRAME_SCRIPT + SOCKET_CLIENT_SCRIPT.replace("__GAZE_URL__", _js(url))
+
+
+def player_script(delay=0.2):
+    """Script creating window.gazePlayer, replaying batches `delay` seconds behind real time"""
+    return FRAME_SCRIPT + PLAYER_SCRIPT + f"window.gazePlayer.delay = {float(delay)};"
+
+
+def player_push_script():
+    """Script pushing one base64 encoded frame (first argument) into window.gazePlayer"""
+    return "if (window.gazePlayer) window.gazePlayer.push(arguments[0]);"
+
+
+def _js(value):
+    return json.dumps(value)
@@ -0,0 +1,218 @@
+"""
+Local WebSocket gaze broadcaster.
+
+Runs a WebSocket server on 127.0.0.1 fed by an EyeTracker's async gaze stream.
+Every batch of samples buffered since the previous send is packed once into a
+little-endian binary frame and broadcast to all connected pages, so WebDriver
+is not involved per sample. Pages send attention summaries back as JSON text
+messages (see gaze_scripts.socket_client_script).
+
+Frame layout:
+    header  <BBH   version, kind (1 = samples), sample count
+    sample  <dfffB timestamp, x, y, fixation, flags (bit 0 saccades, bit 1 estimated)
+"""
+
+import asyncio
+import json
+import secrets
+import struct
+import threading
+
+try:
+    from websockets.asyncio.server import serve, broadcast
+    from websockets.exceptions import ConnectionClosed
+    from websockets.protocol import State
+except ImportError:
+    serve = broadcast = State = None
+    ConnectionClosed = Exception
+
+FRAME_VERSION = 1
+KIND_SAMPLES = 1
+HEADER = struct.Struct('<BBH')
+SAMPLE = struct.Struct('<dfffB')
+FLAG_SACCADES = 1
+FLAG_ESTIMATED = 2
+MAX_BATCH = 0xFFFF
+
+
+def available():
+    """True when the websockets package is installed"""
+    return serve is not None
+
+
+def pack_samples(samples):
+    """
+    Pack gaze sample dicts (EyeTracker.get_gaze output) into one binary frame.
+    Samples without a position are skipped.
+    """
+    records = []
+    for sample in samples[-MAX_BATCH:]:
+        position = sample.get('position')
+        if position is None:
+            continue
+        flags = (FLAG_SACCADES if sample.get('saccades') else 0) | \
+                (FLAG_ESTIMATED if sample.get('estimated') else 0)
+        records.append(SAMPLE.pack(float(sample.get('timestamp') or 0.0),
+                                   float(position[0]), float(position[1]),
+                                   float(sample.get('fixation') or 0.0), flags))
+    return HEADER.pack(FRAME_VERSION, KIND_SAMPLES, len(records)) + b''.join(records)
+
+
+def unpack_samples(frame):
+    """Inverse of pack_samples, returns a list of sample dicts"""
+    version, kind, count = HEADER.unpack_from(frame)
+    if version != FRAME_VERSION or kind != KIND_SAMPLES:
+        raise ValueError(f"Unsupported gaze frame (version {version}, kind {kind})")
+    samples = []
+    for timestamp, x, y, fixation, flags in SAMPLE.iter_unpack(frame[HEADER.size:HEADER.size + count * SAMPLE.size]):
+        samples.append({
+            'position': (x, y),
+            'fixation': fixation,
+            'saccades': bool(flags & FLAG_SACCADES),
+            'estimated': bool(flags & FLAG_ESTIMATED),
+            'timestamp': timestamp,
+        })
+    return samples
+
+
+class GazeBroadcaster:
+    """
+    Broadcasts an EyeTracker's gaze samples to in-page WebSocket clients
+
+    Args:
+        tracker: object with an async ``stream(maxsize, policy, batched)``
+            generator, normally an EyeTracker
+        host: interface to listen on, keep it on loopback
+        port: port to listen on, 0 picks a free one
+        maxsize: samples buffered between sends; the oldest are dropped when
+            the event loop falls behind
+    """
+
+    def __init__(self, tracker, host="127.0.0.1", port=0, maxsize=256):
+        self.tracker = tracker
+        self.host = host
+        self.port = port
+        self.maxsize = maxsize
+        # pages must know the token, other sites on the machine cannot listen in
+        self.token = secrets.token_urlsafe(12)
+
+        self.clients = set()
+        self.attention = {}
+        self.frames_sent = 0
+        self.samples_sent = 0
+
+        self.loop = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.client_connected = threading.Event()
+        self.error = None
+        self._stop = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/gaze/{self.token}"
+
+    def start(self, timeout=5.0):
+        """
+        Start the server thread
+
+        Returns:
+            bool: True once the server is listening
+        """
+        if not available():
+            self.error = "websockets package not installed"
+            return False
+        if self.thread is not None:
+            return self.error is None
+        self.thread = threading.Thread(target=self._run, name="gaze-socket", daemon=True)
+        self.thread.start()
+        self.ready.wait(timeout)
+        return self.ready.is_set() and self.error is None
+
+    def wait_for_client(self, timeout=2.0):
+        """True when at least one page connected within timeout"""
+        return self.client_connected.wait(timeout)
+
+    def stop(self):
+        if self.loop is not None and self._stop is not None:
+            self.loop.call_soon_threadsafe(self._stop.set)
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2.0)
+        self.thread = None
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self._serve())
+        except Exception as e:
+            self.error = str(e)
+            print(f"⚠️ Gaze socket error: {e}")
+        finally:
+            self.ready.set()
+            self.loop.close()
+
+    async def _serve(self):
+        self._stop = asyncio.Event()
+        async with serve(self._handle, self.host, self.port, compression=None) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self.ready.set()
+            pump = asyncio.create_task(self._pump())
+            try:
+                await self._stop.wait()
+            finally:
+                pump.cancel()
+                await asyncio.gather(pump, return_exceptions=True)
+
+    async def _handle(self, connection):
+        if connection.request.path != f"/gaze/{self.token}":
+            await connection.close(1008, "bad token")
+            return
+        self.clients.add(connection)
+        self.client_connected.set()
+        try:
+            async for message in connection:
+                self._receive(message)
+        except ConnectionClosed:
+            # page navigated away or the tab was closed
+            pass
+        finally:
+            self.clients.discard(connection)
+
+    def _receive(self, message):
+        if not isinstance(message, str):
+            return
+        try:
+            data = json.loads(message)
+        except ValueError:
+            return
+        if not isinstance(data, dict):
+            print(f"⚠️ Ignoring gaze socket message that is not an object: {message[:80]!r}")
+            return
+        if data.get('type') == 'attention' and isinstance(data.get('attention'), dict):
+            self.attention = data['attention']
+
+    async def _pump(self):
+        stream = self.tracker.stream(maxsize=self.maxsize, policy="latest", batched=True)
+        try:
+            async for samples in stream:
+                # broadcast() skips connections that are closing
+                clients = [c for c in self.clients if c.state is State.OPEN]
+                if not clients:
+                    continue
+                frame = pack_samples(samples)
+                count = HEADER.unpack_from(frame)[2]
+                if not count:
+                    continue
+                broadcast(clients, frame)
+                self.frames_sent += 1
+                self.samples_sent += count
+        finally:
+            await stream.aclose()
+
+    def stats(self):
+        return {
+            'clients': len(self.clients),
+            'frames_sent': self.frames_sent,
+            'samples_sent': self.samples_sent,
+            'samples_per_frame': self.samples_sent / self.frames_sent if self.frames_sent else 0.0,
+        }
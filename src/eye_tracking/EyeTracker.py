@@ -8,6 +8,8 @@ import cv2
 import pygame
 import numpy as np
 import time
+import queue
+import uuid
 import warnings
 
 # Suppress warnings
@@ -22,6 +24,11 @@ sys.path.append(f'{dir_path}/..')
 try:
     from eyeGestures.utils import VideoCapture
     from eyeGestures import EyeGestures_v3
+    from eyeGestures.gevent import DEBUG_EYES
+    from eyeGestures.landmarks import create_provider, select_provider
+    from eyeGestures.rate_control import RateController
+    from eyeGestures.motion_gate import MotionGatedFinder
+    from gaze_stream import GazeHub, LATEST_ONLY
 except ImportError as e:
     print(f"❌ Error importing eyeGestures: {e}")
     print("Make sure the eyeGestures library is properly installed")
@@ -38,40 +45,79 @@ class EyeTracker:
         tracker.track()          # Print X,Y coordinates continuously
     """
     
-    def __init__(self):
-        """Initialize the eye tracker"""
+    def __init__(self, capture=None, screen_size=None, landmark_backend=None, target_latency=None,
+                 target_rate=20.0, motion_gate=True, motion_audit_every=30,
+                 smoother="moving_average", smoothing_window=20):
+        """
+        Initialize the eye tracker
+
+        Args:
+            capture: Object with a ``read() -> (ret, frame)`` method used instead
+                of the webcam (e.g. a recorded session or a fake for benchmarks)
+            screen_size (tuple): (width, height) used instead of querying pygame
+            landmark_backend (str): Name of a registered landmark provider
+                (``mediapipe_iris``, ``mediapipe_mesh``, ``opencv``)
+            target_latency (float): Per-frame landmark budget in seconds; when set
+                and no backend is named, the best backend meeting it is picked
+                by probing on a camera frame at startup
+            target_rate (float): Gaze samples per second delivered by track();
+                frames are skipped and gaze estimated (held or extrapolated) when inference is slower
+            motion_gate (bool): Reuse the previous face landmarks while the eye
+                regions have not changed, updating only the pupils
+            motion_audit_every (int): Also run the full landmark finder on every
+                Nth reused frame and report the landmark error of reuse in
+                get_metrics(); 0 disables auditing
+            smoother (str): Gaze smoother name (``moving_average``, ``ema``,
+                ``one_euro``, ``kalman``)
+            smoothing_window (int): Window length of the smoother
+        """
         print("🔧 Initializing EyeTracker...")
-        
+
         try:
             # Initialize pygame for calibration window
             pygame.init()
             pygame.font.init()
-            
+
             # Get screen dimensions
-            screen_info = pygame.display.Info()
-            self.screen_width = screen_info.current_w
-            self.screen_height = screen_info.current_h
-            
+            if screen_size is None:
+                screen_info = pygame.display.Info()
+                screen_size = (screen_info.current_w, screen_info.current_h)
+            self.screen_width, self.screen_height = screen_size
+
             # Initialize EyeGestures and camera with error handling
             print("📷 Initializing camera and eye tracking...")
             self.gestures = EyeGestures_v3()
-            self.cap = VideoCapture(0)
-            
+            self.cap = capture if capture is not None else VideoCapture(0)
+
         except Exception as e:
             print(f"❌ Error during initialization: {e}")
             print("🔧 Trying alternative initialization...")
             try:
                 # Alternative initialization without some features
                 self.gestures = EyeGestures_v3()
-                self.cap = VideoCapture(0)
+                self.cap = capture if capture is not None else VideoCapture(0)
             except Exception as e2:
                 print(f"❌ Critical error: {e2}")
                 raise
         
+        if landmark_backend is not None:
+            self.gestures.finder = create_provider(landmark_backend)
+        elif target_latency is not None:
+            self._select_landmark_backend(target_latency)
+        if motion_gate:
+            self.gestures.finder = MotionGatedFinder(self.gestures.finder, audit_every=motion_audit_every)
+        self.gestures.setSmoother(smoother, context="tracker", window=smoothing_window)
+
+        self.rate_controller = RateController(target_rate, bounds=(self.screen_width, self.screen_height))
+        
+        # Single producer loop shared by all gaze subscribers
+        self.gaze_hub = GazeHub(self.get_gaze, pace=self.rate_controller.pace)
+
         # Calibration state
         self.calibration_map = None
         self.n_points = 0
         self.is_calibrated = False
+        self.calibration_id = None  # identifies the calibration model recorded samples come from
         
         # Colors for pygame
         self.RED = (255, 0, 100)
@@ -90,6 +136,18 @@ class EyeTracker:
         print("✅ EyeTracker initialized")
     
     
+    def _select_landmark_backend(self, target_latency):
+        """Probe registered landmark backends on a live frame and keep the best that fits the budget"""
+        ret, frame = self.cap.read()
+        if not ret:
+            print("⚠️  No frame available for landmark backend selection, keeping default")
+            return
+
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        frame = np.flip(frame, axis=1)
+        self.gestures.finder = select_provider(np.ascontiguousarray(frame), target_latency)
+    
+    
     def recalibrate(self, num_points=25):
         """
         Calibrate the eye tracker with specified number of points
@@ -105,11 +163,17 @@ class EyeTracker:
         # Generate calibration points
         self._generate_calibration_points(num_points)
         
-        # Run calibration window
-        success = self._run_calibration_window()
+        # Run calibration window, its camera preview needs face crops on the events
+        debug = self.gestures.debug
+        self.gestures.debug = max(debug, DEBUG_EYES)
+        try:
+            success = self._run_calibration_window()
+        finally:
+            self.gestures.debug = debug
         
         if success:
             self.is_calibrated = True
+            self.calibration_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{self.n_points}pt-{uuid.uuid4().hex[:8]}"
             print("✅ Calibration completed successfully!")
         else:
             print("❌ Calibration cancelled or failed")
@@ -371,12 +435,18 @@ class EyeTracker:
             
             debug_font = pygame.font.SysFont('Arial', 16)
         
+        # Samples come from the shared producer loop, which keeps the sample rate
+        subscription = self.subscribe(maxsize=1, policy=LATEST_ONLY)
+        
         try:
             frame_count = 0
             clock = pygame.time.Clock() if debug else None
             
             while True:
-                gaze = self.get_gaze()
+                try:
+                    gaze = subscription.get(timeout=0.5)
+                except queue.Empty:
+                    gaze = None
                 
                 if gaze is not None:
                     frame_count += 1
@@ -413,12 +483,17 @@ class EyeTracker:
                         pygame.display.flip()
                         clock.tick(30)  # 30 FPS for debug window
                 
-                if not debug:
-                    time.sleep(0.05)  # 20 FPS for non-debug mode
-                
         except KeyboardInterrupt:
             print("\n🛑 Gaze tracking stopped")
+            metrics = self.get_metrics()
+            stats = metrics['rate']
+            if stats['latency_ms'] is not None:
+                print(f"    Inference on {stats['inference_ratio']:.0%} of samples "
+                      f"(every {stats['skip']} frame(s), {stats['latency_ms']:.1f} ms/step)")
+            if 'landmarks' in metrics:
+                print(f"    Landmarks reused on {metrics['landmarks']['hit_rate']:.0%} of frames")
         finally:
+            subscription.close()
             if debug and debug_screen is not None:
                 pygame.display.quit()
     
@@ -437,8 +512,14 @@ class EyeTracker:
         """
         Get current gaze position (single reading)
         
+        Frames skipped by the rate controller are not run through the model;
+        their position is estimated from the surrounding gaze events and
+        flagged with 'estimated': True.
+        
         Returns:
-            dict: {'position': (x, y), 'fixation': bool, 'algorithm': str} or None
+            dict: {'position': (x, y), 'fixation': bool, 'algorithm': str,
+                   'saccades': bool, 'blink': bool, 'estimated': bool,
+                   'timestamp': float} or None
         """
         if not self.is_calibrated:
             return None
@@ -448,20 +529,43 @@ class EyeTracker:
             if not ret:
                 return None
             
+            timestamp = time.time()
+            
+            if not self.rate_controller.should_process():
+                position, event_result = self.rate_controller.estimate(timestamp)
+                if event_result is not None:
+                    return {
+                        'position': position,
+                        'fixation': event_result.fixation,
+                        'algorithm': self.gestures.whichAlgorithm(context="tracker"),
+                        'saccades': event_result.saccades,
+                        'blink': bool(event_result.blink),
+                        'estimated': True,
+                        'timestamp': timestamp
+                    }
+                return None
+            
             frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             frame = np.flip(frame, axis=1)
             
             # Get gaze data (not calibrating)
+            start = time.perf_counter()
             event_result, _ = self.gestures.step(
-                frame, False, self.screen_width, self.screen_height, context="tracker"
+                frame, False, self.screen_width, self.screen_height, context="tracker",
+                timestamp=timestamp
             )
+            self.rate_controller.record_latency(time.perf_counter() - start)
             
             if event_result is not None:
+                self.rate_controller.update(timestamp, event_result)
                 return {
                     'position': event_result.point,
                     'fixation': event_result.fixation,
                     'algorithm': self.gestures.whichAlgorithm(context="tracker"),
-                    'saccades': event_result.saccades
+                    'saccades': event_result.saccades,
+                    'blink': bool(event_result.blink),
+                    'estimated': False,
+                    'timestamp': timestamp
                 }
         except Exception as e:
             print(f"❌ Error getting gaze: {e}")
@@ -469,8 +573,82 @@ class EyeTracker:
         return None
     
     
+    def subscribe(self, callback=None, maxsize=64, policy=LATEST_ONLY):
+        """
+        Receive gaze samples pushed from one shared capture and inference loop
+        
+        Use this instead of polling get_gaze() when more than one consumer
+        (overlay, recorder, ...) needs gaze - get_gaze() reads the camera, so
+        concurrent callers would steal each other's frames. The producer loop
+        starts with the first subscriber and stops after the last one leaves.
+        
+        Args:
+            callback: Called with each sample dict on the subscription's own
+                thread; without it consume with get(), iteration or async for
+            maxsize (int): Samples buffered for this subscriber
+            policy (str): 'latest' drops the oldest sample when the buffer is
+                full, 'lossless' makes the producer wait for this subscriber
+        
+        Returns:
+            Subscription: call close() (or use it as a context manager) to leave
+        """
+        if not self.is_calibrated:
+            print("⚠️  Eye tracker not calibrated! Subscribers receive no samples until it is.")
+        return self.gaze_hub.subscribe(callback=callback, maxsize=maxsize, policy=policy)
+    
+    
+    async def stream(self, maxsize=64, policy=LATEST_ONLY, batched=False):
+        """
+        Asynchronous gaze stream: ``async for sample in tracker.stream(): ...``
+        
+        Capture and inference stay on the tracker's producer thread; samples
+        are handed to the event loop by waking it once per wait, not with a
+        run_in_executor call per sample. Any number of streams, callbacks and
+        blocking subscribers share the same producer.
+        
+        Args:
+            maxsize (int): Samples buffered for this stream
+            policy (str): 'latest' or 'lossless', see subscribe()
+            batched (bool): Yield lists of every sample buffered since the
+                previous iteration instead of single samples
+        """
+        subscription = self.subscribe(maxsize=maxsize, policy=policy)
+        try:
+            if batched:
+                while True:
+                    samples = await subscription.get_batch()
+                    if not samples:
+                        return
+                    yield samples
+            else:
+                async for sample in subscription:
+                    yield sample
+        finally:
+            subscription.close()
+    
+    
+    def unsubscribe(self, subscription):
+        """Stop delivering samples to a subscription"""
+        self.gaze_hub.unsubscribe(subscription)
+    
+    
+    def get_metrics(self):
+        """
+        Pipeline metrics: rate controller stats and, when the landmark finder
+        keeps them (e.g. motion gating hit rate and audited error), its stats
+        
+        Returns:
+            dict: {'rate': {...}, 'landmarks': {...}}
+        """
+        metrics = {'rate': self.rate_controller.stats()}
+        if hasattr(self.gestures.finder, 'stats'):
+            metrics['landmarks'] = self.gestures.finder.stats()
+        return metrics
+    
+    
     def cleanup(self):
         """Clean up resources"""
+        self.gaze_hub.stop(close_subscriptions=True)
         try:
             pygame.quit()
         except:
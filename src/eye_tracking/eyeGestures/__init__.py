@@ -4,8 +4,9 @@ from eyeGestures.gazeEstimator import GazeTracker
 import eyeGestures.screenTracker.dataPoints as dp
 from eyeGestures.calibration_v1 import Calibrator as Calibrator_v1
 from eyeGestures.calibration_v2 import Calibrator as Calibrator_v2
-from eyeGestures.gevent import Gevent, Cevent
-from eyeGestures.utils import timeit, Buffor, low_pass_filter_fourier, recoverable
+from eyeGestures.gevent import Gevent, Cevent, DEBUG_NONE, DEBUG_EYES
+from eyeGestures.smoothing import create_smoother
+from eyeGestures.utils import timeit, Buffor, low_pass_filter_fourier, recoverable, head_normalised_key_points
 import numpy as np
 import pickle
 import time
@@ -16,21 +17,24 @@ VERSION = "3.0.0"
 class EyeGestures_v3:
     """Main class for EyeGesture tracker. It configures and manages entire algorithm"""
 
-    def __init__(self, calibration_radius = 1000):
+    def __init__(self, calibration_radius = 1000, finder = None, debug = DEBUG_NONE):
         self.calibration_radius = calibration_radius 
+        # DEBUG_EYES and above attach the face crop and eye objects to gaze events
+        self.debug = debug
 
         self.clb = dict() # Calibrator_v2()
         self.cap = None
 
         self.calibration = dict()
 
-        self.average_points = dict()
+        self.smoothers = dict()
+        self.smoother_config = ("moving_average", {"window": 20})
         self.iterator = dict()
-        self.filled_points= dict()
         self.enable_CN = False
         self.calibrate_gestures = False
 
-        self.finder = FaceFinder()
+        # any object with find(image) returning a face mesh or normalised landmark array
+        self.finder = finder if finder is not None else FaceFinder()
         self.face = Face()
 
         # this has to be contexted
@@ -56,7 +60,8 @@ class EyeGestures_v3:
         self.addContext(context)
         self.clb[context].updMatrix(np.array(points))
 
-    def getLandmarks(self, frame):
+    def getFaceGeometry(self, frame):
+        """Eye contours in pixels (32, 2), face box (x, y, w, h), blink and the flipped frame"""
 
         frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         frame = cv2.flip(frame,1)
@@ -70,8 +75,7 @@ class EyeGestures_v3:
         face_landmarks = self.face.getLandmarks()
         l_eye = self.face.getLeftEye()
         r_eye = self.face.getRightEye()
-        l_eye_landmarks = l_eye.getLandmarks()
-        r_eye_landmarks = r_eye.getLandmarks()
+        eye_points = np.concatenate((l_eye.getLandmarks(),r_eye.getLandmarks()))
         blink = l_eye.getBlink() and r_eye.getBlink()
 
         # get x,y offset
@@ -79,33 +83,28 @@ class EyeGestures_v3:
         y_offset = np.min(face_landmarks[:,1])
         x_width = np.max(face_landmarks[:,0]) - x_offset
         y_width = np.max(face_landmarks[:,1]) - y_offset
+        box = np.array((x_offset,y_offset,x_width,y_width))
+        return eye_points, box, blink, frame
 
-        # get head position
-        head_offset = np.zeros((1,2))
-        scale_x = 1
-        scale_y = 1
-        if np.array_equal(self.starting_head_position, np.zeros((1,2))):
-            self.starting_head_position = np.array([[x_offset,y_offset]])
-            self.starting_size = np.array([[x_width,y_width]])
-        else:
-            head_offset = np.array([[x_offset,y_offset]]) - self.starting_head_position
-            scale_x = self.starting_size[0,0]/x_width
-            scale_y = self.starting_size[0,1]/y_width
-
-        # eye_events = np.array([event.blink,event.fixation]).reshape(1, 2)
-        key_points = np.concatenate((l_eye_landmarks,r_eye_landmarks,np.array([[scale_x,scale_y]]),head_offset))
-        key_points[:,0] = key_points[:,0] - head_offset[:,0]
-        key_points[:,1] = key_points[:,1] - head_offset[:,1]
-
-        key_points[:,0] = key_points[:,0] * scale_x
-        key_points[:,1] = key_points[:,1] * scale_y
+    def getLandmarks(self, frame):
 
-        key_points[-1,0] = head_offset[:,0]
-        key_points[-1,1] = head_offset[:,1]
-        # print(self.starting_size,x_width,y_width)
+        key_points, blink, box, frame = self._keyPoints(frame)
+        x_offset, y_offset, x_width, y_width = box
         subframe = frame[int(y_offset):int(y_offset+y_width),int(x_offset):int(x_offset+x_width)]
         return key_points, blink, subframe
 
+    def _keyPoints(self, frame):
+
+        eye_points, box, blink, frame = self.getFaceGeometry(frame)
+
+        # head position is relative to the face box of the first frame
+        if np.array_equal(self.starting_head_position, np.zeros((1,2))):
+            self.starting_head_position = box[None,:2]
+            self.starting_size = box[None,2:]
+        starting_box = np.concatenate((self.starting_head_position[0],self.starting_size[0]))
+        key_points = head_normalised_key_points(eye_points[None], box[None], starting_box)[0]
+        return key_points, blink, box, frame
+
     def whichAlgorithm(self,context="main"):
         if context in self.clb:
             return self.clb[context].whichAlgorithm()
@@ -113,18 +112,31 @@ class EyeGestures_v3:
             return "None"
 
     def reset(self, context = "main"):
-        self.filled_points[context] = 0
+        if context in self.smoothers:
+            self.smoothers[context].filled = 0
         if context in self.clb:
            self.addContext(context)
 
+    def setSmoother(self, smoother = "moving_average", context = None, **kwargs):
+        """
+        Select the gaze smoother (see eyeGestures.smoothing) for one context,
+        or for every context created from now on when context is None,
+        e.g. setSmoother("one_euro", context="tracker", min_cutoff=0.5)
+        """
+        if context is None:
+            self.smoother_config = (smoother, kwargs)
+        else:
+            self.addContext(context)
+            self.smoothers[context] = create_smoother(smoother, **kwargs)
+
     def setFixation(self,fix):
         self.fix = fix
 
     def addContext(self, context):
         if context not in self.clb:
             self.clb[context] = Calibrator_v2(self.calibration_radius)
-            self.average_points[context] = np.zeros((20,2))
-            self.filled_points[context] = 0
+            smoother, kwargs = self.smoother_config
+            self.smoothers[context] = create_smoother(smoother, **kwargs)
             self.calibration[context] = False
             self.prev_timestamp[context] = time.time()
             self.prev_point[context] = np.array((0.0,0.0))
@@ -134,12 +146,14 @@ class EyeGestures_v3:
             self.key_points_buffer[context] = []
 
     @recoverable(ret_error_params=(None, None))
-    def step(self, frame, calibration, width, height, context="main"):
+    def step(self, frame, calibration, width, height, context="main", timestamp=None):
         self.addContext(context)
+        if timestamp is None:
+            timestamp = time.time()
 
         self.calibration[context] = calibration
 
-        key_points, blink, sub_frame = self.getLandmarks(frame)
+        key_points, blink, box, frame = self._keyPoints(frame)
 
         self.key_points_buffer[context].append(key_points)
         if len(self.key_points_buffer[context]) > 10:
@@ -147,31 +161,24 @@ class EyeGestures_v3:
         key_points = low_pass_filter_fourier(key_points,200)
 
         y_point = self.clb[context].predict(key_points)
-        self.average_points[context][1:,:] = self.average_points[context][:(self.average_points[context].shape[0] - 1),:]
-        self.average_points[context][0,:] = y_point
-
-        if self.filled_points[context] < self.average_points[context].shape[0] and (y_point != np.array([0.0,0.0])).any():
-            self.filled_points[context] += 1
-        if self.filled_points[context] == 0:
-            self.filled_points[context] = 1
-
-        averaged_point = np.sum(self.average_points[context][:,:],axis=0)/(self.filled_points[context])
+        smoother = self.smoothers[context]
+        averaged_point = smoother.update(y_point, timestamp)
 
         fixation = self.fixationTracker[context].process(
             averaged_point[0], averaged_point[1])
 
-        duration = time.time() - self.prev_timestamp[context]
+        duration = timestamp - self.prev_timestamp[context]
         velocity = abs(averaged_point - self.prev_point[context])/duration
         velocity = np.sqrt(velocity[0]**2+velocity[1]**2)
         self.prev_point[context] = averaged_point
-        self.prev_timestamp[context] = time.time()
+        self.prev_timestamp[context] = timestamp
  
         self.velocity_max[context] = max(self.velocity_max[context],velocity)
         self.velocity_min[context] = min(self.velocity_min[context],velocity)
 
         saccades = velocity > (self.velocity_max[context])/4
 
-        if self.calibration[context] and (self.clb[context].insideClbRadius(averaged_point,width,height) or self.filled_points[context] < self.average_points[context].shape[0] * 10):
+        if self.calibration[context] and (self.clb[context].insideClbRadius(averaged_point,width,height) or smoother.filled < smoother.window * 10):
             self.clb[context].add(key_points,self.clb[context].getCurrentPoint(width,height))
         else: 
             self.clb[context].post_fit()
@@ -180,16 +187,76 @@ class EyeGestures_v3:
             if self.clb[context].isReadyToMove():
                 self.clb[context].movePoint()
 
-        gevent = Gevent(
-            point=averaged_point,
-            blink=blink,
-            fixation=fixation,
-            saccades=saccades,
-            sub_frame=sub_frame
-        )
+        if self.debug >= DEBUG_EYES:
+            gevent = Gevent(
+                point=averaged_point,
+                blink=blink,
+                fixation=fixation,
+                l_eye=self.face.getLeftEye(),
+                r_eye=self.face.getRightEye(),
+                saccades=saccades,
+                sub_frame_source=(frame, box)
+            )
+        else:
+            gevent = Gevent(
+                point=averaged_point,
+                blink=blink,
+                fixation=fixation,
+                saccades=saccades
+            )
         cevent = Cevent(self.clb[context].getCurrentPoint(width,height),self.clb[context].acceptance_radius, self.clb[context].calibration_radius)
         return (gevent, cevent)
 
+    def step_batch(self, key_points, timestamps, context="main"):
+        """
+        Tracking (non-calibrating) step over N samples at once.
+
+        Args:
+            key_points: (N, 34, 2) or (N, 68) key points as returned by
+                getLandmarks, or (N, H, W, 3) frames to extract them from
+            timestamps: (N,) sample times in seconds
+
+        Returns:
+            (points (N, 2), fixation (N,), saccades (N,)) matching what N
+            consecutive step() calls on the same context would produce;
+            the context state is advanced as if they had been made
+        """
+        self.addContext(context)
+        self.calibration[context] = False
+
+        key_points = np.asarray(key_points)
+        if key_points.ndim == 4:
+            key_points = np.array([self.getLandmarks(frame)[0] for frame in key_points])
+        key_points = key_points.reshape(len(key_points), -1, 2).astype(float)
+        timestamps = np.asarray(timestamps, dtype=float)
+        n = len(key_points)
+        if n == 0:
+            return np.zeros((0,2)), np.zeros(0), np.zeros(0, dtype=bool)
+
+        self.key_points_buffer[context] = (self.key_points_buffer[context] + list(key_points[-10:]))[-10:]
+        y_points = self.clb[context].predict_batch(low_pass_filter_fourier(key_points,200))
+
+        averaged_points = self.smoothers[context].update_batch(y_points, timestamps)
+
+        fixation = np.empty(n)
+        tracker = self.fixationTracker[context]
+        for i, (x, y) in enumerate(averaged_points):
+            fixation[i] = tracker.process(x, y)
+
+        durations = np.diff(np.concatenate(([self.prev_timestamp[context]], timestamps)))
+        steps = np.diff(np.vstack((self.prev_point[context], averaged_points)), axis=0)
+        velocity = np.sqrt(np.sum((np.abs(steps) / durations[:, None])**2, axis=1))
+        velocity_max = np.maximum.accumulate(np.concatenate(([self.velocity_max[context]], velocity)))[1:]
+        saccades = velocity > velocity_max / 4
+
+        self.prev_point[context] = averaged_points[-1]
+        self.prev_timestamp[context] = timestamps[-1]
+        self.velocity_max[context] = velocity_max[-1]
+        self.velocity_min[context] = min(self.velocity_min[context], np.min(velocity))
+        self.clb[context].post_fit()
+
+        return averaged_points, fixation, saccades
+
 class EyeGestures_v2:
     """Main class for EyeGesture tracker. It configures and manages entire algorithm"""
 
@@ -200,7 +267,8 @@ class EyeGestures_v2:
 
         self.clb = dict() # Calibrator_v2()
         self.cap = None
-        self.gestures = EyeGestures_v1(285,115,200,100)
+        # v2 builds its key points from the eye objects on v1 events
+        self.gestures = EyeGestures_v1(285,115,200,100,debug=DEBUG_EYES)
 
         self.calibration = dict()
 
@@ -338,7 +406,8 @@ class EyeGestures_v1:
                  roi_x=225,
                  roi_y=105,
                  roi_width=80,
-                 roi_height=15):
+                 roi_height=15,
+                 debug=DEBUG_NONE):
 
         screen_width = 500
         screen_height = 500
@@ -364,7 +433,8 @@ class EyeGestures_v1:
                                 roi_x,
                                 roi_y,
                                 roi_width,
-                                roi_height)
+                                roi_height,
+                                debug=debug)
 
         self.calibrators = dict()
         self.calibrate = False
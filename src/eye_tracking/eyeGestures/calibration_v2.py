@@ -39,6 +39,19 @@ class Calibrator:
         self.calcualtion_coroutine = threading.Thread(target=self.__async_post_fit)
         self.fit_coroutines = [] 
 
+    def __getstate__(self):
+        # locks and fit threads cannot be pickled, saveModel only needs the fitted state
+        state = self.__dict__.copy()
+        for key in ('lock', 'calcualtion_coroutine', 'fit_coroutines'):
+            del state[key]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+        self.calcualtion_coroutine = threading.Thread(target=self.__async_post_fit)
+        self.fit_coroutines = []
+
     def __launch_fit(self):
         coroutine = threading.Thread(target=self.__async_fit)
         self.fit_coroutines.append(coroutine)
@@ -94,6 +107,15 @@ class Calibrator:
             self.cv_not_set = True
         pass
 
+    def fit(self,X,Y):
+        """Synchronously fit regressors on a whole batch of (features, screen point) samples"""
+        X = np.asarray(X, dtype=float).reshape(len(X), -1)
+        Y = np.asarray(Y, dtype=float)
+        with self.lock:
+            self.reg_x.fit(X,Y[:,0])
+            self.reg_y.fit(X,Y[:,1])
+            self.fitted = True
+
     def post_fit(self):
         if self.cv_not_set:
             # self.calcualtion_coroutine.start()
@@ -114,6 +136,15 @@ class Calibrator:
             else:
                 return np.array([0.0,0.0])
 
+    def predict_batch(self,X):
+        """Predict screen points for N samples at once, returns (N, 2) array"""
+        X = np.asarray(X, dtype=float).reshape(len(X), -1)
+        with self.lock:
+            if self.fitted:
+                return np.column_stack((self.reg_x.predict(X),self.reg_y.predict(X)))
+            else:
+                return np.zeros((len(X),2))
+
     def movePoint(self):
         with self.lock:
             self.X =   self.X + self.__tmp_X
@@ -6,11 +6,15 @@ import mediapipe as mp
 import eyeGestures.eye as eye
 
 
+class NoFaceError(ValueError):
+    """Raised when the finder found no face in the frame."""
+
+
 class FaceFinder:
 
-    def __init__(self):
+    def __init__(self, refine_landmarks=True):
         self.mp_face_mesh = mp.solutions.face_mesh.FaceMesh(
-            refine_landmarks=True,
+            refine_landmarks=refine_landmarks,
             static_image_mode=False,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
@@ -66,6 +70,10 @@ class Face:
 
     def _landmarks(self, face):
 
+        # backends returning normalised (N, 2+) arrays skip the per-landmark python loop
+        if isinstance(face, np.ndarray):
+            return face[:, :2] * np.array((self.image_w, self.image_h))
+
         __complex_landmark_points = face.multi_face_landmarks
         __complex_landmarks = __complex_landmark_points[0].landmark
 
@@ -79,6 +87,8 @@ class Face:
 
     def process(self, image, face):
         # try:
+        if face is None:
+            raise NoFaceError("no face in frame")
         self.face = face
         self.image_h, self.image_w, _ = image.shape
         self.landmarks = self._landmarks(self.face)
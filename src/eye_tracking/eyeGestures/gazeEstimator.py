@@ -1,5 +1,5 @@
 import numpy as np
-from eyeGestures.gevent import Gevent
+from eyeGestures.gevent import Gevent, DEBUG_NONE, DEBUG_EYES, DEBUG_FULL
 from eyeGestures.face import FaceFinder, Face
 from eyeGestures.Fixation import Fixation
 from eyeGestures.processing import EyeProcessor
@@ -38,9 +38,13 @@ class GazeTracker:
         roi_height,
         monitor_offset_x=0,
         monitor_offset_y=0,
+        debug=DEBUG_NONE,
     ):
         self.screen = dp.Screen(screen_width, screen_heigth)
 
+        # which debug payloads gaze events carry, see eyeGestures.gevent
+        self.debug = debug
+
         self.offset_x = 0
         self.offset_y = 0
 
@@ -70,6 +74,18 @@ class GazeTracker:
 
     #     self.calibration = False
 
+    def __debug_payload(self, l_eye, r_eye, display, context, context_id):
+        payload = dict()
+        if self.debug >= DEBUG_EYES:
+            payload.update(l_eye=l_eye, r_eye=r_eye)
+        if self.debug >= DEBUG_FULL:
+            payload.update(screen_man=display,
+                           roi=context.roi,
+                           edges=context.edges,
+                           cluster=context.cluster_boundaries,
+                           context=context_id)
+        return payload
+
     def __gaze_intersection(self, l_eye, r_eye, l_buff, r_buff):
         l_pupil = l_eye.getPupil()
         l_gaze = l_eye.getGaze(l_buff)
@@ -243,33 +259,11 @@ class GazeTracker:
                     self.point_screen[1],
                 ):
                     self.freezed_point = self.point_screen
-
-                event = Gevent(
-                    self.freezed_point,
-                    blink,
-                    fix,
-                    l_eye,
-                    r_eye,
-                    display,
-                    context.roi,
-                    context.edges,
-                    context.cluster_boundaries,
-                    context_id,
-                )
             else:
                 self.freezed_point = self.point_screen
-                event = Gevent(
-                    self.point_screen,
-                    blink,
-                    fix,
-                    l_eye,
-                    r_eye,
-                    display,
-                    context.roi,
-                    context.edges,
-                    context.cluster_boundaries,
-                    context_id,
-                )
+
+            event = Gevent(self.freezed_point, blink, fix, **self.__debug_payload(
+                l_eye, r_eye, display, context, context_id))
 
         return event
 
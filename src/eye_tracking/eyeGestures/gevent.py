@@ -1,9 +1,20 @@
 """Module providing a Gaze Events."""
 
+import numpy as np
+
+# debug levels controlling which payloads trackers attach to gaze events
+DEBUG_NONE = 0   # point, blink, fixation, saccades only
+DEBUG_EYES = 1   # + eye objects and face sub frame
+DEBUG_FULL = 2   # + screen manager, roi, edges, cluster and context
+
 
 class Gevent:
     """Class representing gaze event, with tracked points scaled to screen, blink and fixation."""
 
+    __slots__ = ('point', 'blink', 'fixation', 'saccades',
+                 'roi', 'edges', 'l_eye', 'r_eye', 'cluster', 'context', 'screen_man',
+                 '_sub_frame', '_sub_frame_source')
+
     def __init__(self,
                  point,
                  blink,
@@ -16,7 +27,8 @@ class Gevent:
                  cluster = None,
                  context = None,
                  saccades = False,
-                 sub_frame = None):
+                 sub_frame = None,
+                 sub_frame_source = None):
 
         self.point = point
         self.blink = blink
@@ -31,12 +43,30 @@ class Gevent:
         self.cluster = cluster
         self.context = context
         self.screen_man = screen_man
-        self.sub_frame = sub_frame
+
+        # (frame, (x, y, w, h)) the face crop is cut from on first access
+        self._sub_frame = sub_frame
+        self._sub_frame_source = sub_frame_source
+
+    @property
+    def sub_frame(self):
+        if self._sub_frame is None and self._sub_frame_source is not None:
+            frame, (x, y, w, h) = self._sub_frame_source
+            self._sub_frame = frame[int(y):int(y + h), int(x):int(x + w)]
+            self._sub_frame_source = None
+        return self._sub_frame
+
+    @sub_frame.setter
+    def sub_frame(self, sub_frame):
+        self._sub_frame = sub_frame
+        self._sub_frame_source = None
 
 
 class Cevent:
     """Class representing gaze event, with tracked points scaled to screen, blink and fixation."""
 
+    __slots__ = ('point', 'acceptance_radius', 'calibration_radius', 'calibration')
+
     def __init__(self,
                  point,
                  acceptance_radius,
@@ -47,3 +77,56 @@ class Cevent:
         self.acceptance_radius = acceptance_radius
         self.calibration_radius = calibration_radius
         self.calibration = calibration
+
+
+GEVENT_DTYPE = np.dtype([
+    ('timestamp', 'f8'),
+    ('x', 'f8'),
+    ('y', 'f8'),
+    ('fixation', 'f4'),
+    ('blink', '?'),
+    ('saccades', '?'),
+])
+
+
+class GeventArray:
+    """
+    Gaze events packed into a preallocated structured array (GEVENT_DTYPE)
+    for consumers processing many events at once. Capacity doubles when full.
+    """
+
+    def __init__(self, capacity = 1024):
+        self.buffer = np.zeros(capacity, dtype=GEVENT_DTYPE)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, event, timestamp):
+        if self.size == len(self.buffer):
+            self.buffer = np.concatenate((self.buffer, np.zeros(len(self.buffer), dtype=GEVENT_DTYPE)))
+        self.buffer[self.size] = (timestamp, event.point[0], event.point[1],
+                                  event.fixation, event.blink, event.saccades)
+        self.size += 1
+
+    def extend(self, timestamps, points, fixation, saccades, blink = None):
+        """Append N events given as arrays, e.g. EyeGestures_v3.step_batch output"""
+        n = len(timestamps)
+        while self.size + n > len(self.buffer):
+            self.buffer = np.concatenate((self.buffer, np.zeros(len(self.buffer), dtype=GEVENT_DTYPE)))
+        rows = self.buffer[self.size:self.size + n]
+        rows['timestamp'] = timestamps
+        rows['x'] = points[:, 0]
+        rows['y'] = points[:, 1]
+        rows['fixation'] = fixation
+        rows['saccades'] = saccades
+        rows['blink'] = False if blink is None else blink
+        self.size += n
+
+    @property
+    def data(self):
+        """View of the filled part of the buffer"""
+        return self.buffer[:self.size]
+
+    def clear(self):
+        self.size = 0
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from eyeGestures import EyeGestures_v1, EyeGestures_v2, EyeGestures_v3
+from eyeGestures.gevent import DEBUG_NONE, DEBUG_EYES, Cevent, Gevent, GeventArray
+from eyeGestures.synthetic import SyntheticFaceFinder
+
+FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+
+
+def test_events_are_slotted():
+    """[TEST]"""
+    event = Gevent(np.array((1.0, 2.0)), False, 0.5)
+    cevent = Cevent(np.array((0.0, 0.0)), 500, 1000)
+
+    assert not hasattr(event, '__dict__') and not hasattr(cevent, '__dict__')
+    with pytest.raises(AttributeError):
+        event.unknown = 1
+
+
+def test_sub_frame_cut_lazily():
+    """[TEST]"""
+    frame = np.arange(100 * 100).reshape(100, 100)
+    event = Gevent((0, 0), False, 0.0, sub_frame_source=(frame, (10.5, 20.2, 30, 40)))
+
+    assert np.array_equal(event.sub_frame, frame[20:60, 10:40])
+    assert event._sub_frame_source is None
+
+
+def test_debug_level_controls_payloads():
+    """[TEST]"""
+    gestures = EyeGestures_v3(finder=SyntheticFaceFinder())
+    event, _ = gestures.step(FRAME, False, 1000, 800)
+    assert event.sub_frame is None and event.l_eye is None
+
+    gestures.debug = DEBUG_EYES
+    event, _ = gestures.step(FRAME, False, 1000, 800)
+    assert event.sub_frame.shape[0] > 0 and event.l_eye is not None
+    assert np.array_equal(event.sub_frame, gestures.getLandmarks(FRAME)[2])
+
+
+def test_legacy_trackers_carry_eyes_only_when_read():
+    """[TEST]"""
+    assert EyeGestures_v1().gaze.debug == DEBUG_NONE
+    assert EyeGestures_v2().gestures.gaze.debug == DEBUG_EYES
+
+
+def test_gevent_array_packs_events():
+    """[TEST]"""
+    packed = GeventArray(capacity=2)
+    for i in range(3):
+        packed.append(Gevent(np.array((i, 2.0 * i)), i == 1, 0.1 * i, saccades=i == 2), timestamp=i / 10)
+    packed.extend(np.array((0.3, 0.4)), np.array(((3.0, 6.0), (4.0, 8.0))), np.zeros(2), np.array((False, True)))
+
+    data = packed.data
+    assert len(packed) == 5 and len(packed.buffer) == 8
+    assert np.allclose(data['y'], (0, 2, 4, 6, 8))
+    assert data['blink'].tolist() == [False, True, False, False, False]
+    assert data['saccades'].tolist() == [False, False, True, False, True]
+    assert np.allclose(data['timestamp'], (0, 0.1, 0.2, 0.3, 0.4))
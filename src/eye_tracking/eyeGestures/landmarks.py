@@ -0,0 +1,281 @@
+"""Module providing pluggable face landmark backends and latency based backend selection."""
+
+import os
+import time
+
+import cv2
+import numpy as np
+
+from eyeGestures.face import FaceFinder
+from eyeGestures.synthetic import SyntheticFaceFinder, N_LANDMARKS
+from eyeGestures.synthetic import LEFT_EYE_CONTOUR, RIGHT_EYE_CONTOUR, LEFT_IRIS, RIGHT_IRIS
+
+
+def estimate_pupil(gray, contour):
+    """
+    Cheap pupil estimator: centroid of the darkest pixels inside the eye contour.
+
+    Args:
+        gray: grayscale image
+        contour: (N, 2) eye contour in pixel coordinates
+
+    Returns:
+        (x, y) pupil center in pixels
+    """
+    h, w = gray.shape[:2]
+    x0 = int(max(np.min(contour[:, 0]), 0))
+    x1 = int(min(np.max(contour[:, 0]) + 1, w))
+    y0 = int(max(np.min(contour[:, 1]), 0))
+    y1 = int(min(np.max(contour[:, 1]) + 1, h))
+    if x1 - x0 < 2 or y1 - y0 < 2:
+        return np.mean(contour, axis=0)
+
+    crop = gray[y0:y1, x0:x1]
+    mask = np.zeros(crop.shape, dtype=np.uint8)
+    cv2.fillPoly(mask, [np.array(contour - (x0, y0), dtype=np.int32)], 1)
+    inside = crop[mask > 0]
+    if inside.size == 0:
+        return np.mean(contour, axis=0)
+
+    # halfway between the darkest pixel and the darkest decile, so a small pupil
+    # is not diluted by sclera or by skin the contour clips at the corners
+    threshold = (int(inside.min()) + np.percentile(inside, 10)) / 2
+    dark = (crop <= threshold) & (mask > 0)
+    ys, xs = np.nonzero(dark)
+    return np.array((x0 + np.mean(xs), y0 + np.mean(ys)))
+
+
+def _iris_points(center, radius):
+    """Center followed by 4 ring points, matching MediaPipe's refined iris layout"""
+    ring = np.linspace(0, 2 * np.pi, 4, endpoint=False)
+    return np.vstack((center, center + radius * np.column_stack((np.cos(ring), np.sin(ring)))))
+
+
+class LandmarkProvider:
+    """
+    Interface of face landmark backends.
+
+    `find(image)` returns normalised (478, 2) landmarks in MediaPipe's
+    refined face mesh layout (or None when no face was found), which is what
+    Face.process consumes. Backends are registered with a quality rank so a
+    selection policy can trade accuracy for latency.
+    """
+
+    name = "base"
+
+    def find(self, image):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MediaPipeIrisProvider(LandmarkProvider):
+    """MediaPipe face mesh with refined iris landmarks - most accurate, most expensive"""
+
+    name = "mediapipe_iris"
+
+    def __init__(self):
+        self.finder = FaceFinder(refine_landmarks=True)
+
+    def find(self, image):
+        face_mesh = self.finder.find(image)
+        if face_mesh is None:
+            return None
+        landmarks = face_mesh.multi_face_landmarks[0].landmark
+        return np.array([(lm.x, lm.y) for lm in landmarks])
+
+    def close(self):
+        self.finder.mp_face_mesh.close()
+
+
+class MediaPipeMeshProvider(LandmarkProvider):
+    """MediaPipe face mesh without iris refinement, pupils estimated from the darkest eye pixels"""
+
+    name = "mediapipe_mesh"
+
+    def __init__(self):
+        self.finder = FaceFinder(refine_landmarks=False)
+
+    def find(self, image):
+        face_mesh = self.finder.find(image)
+        if face_mesh is None:
+            return None
+        mesh = np.array([(lm.x, lm.y) for lm in face_mesh.multi_face_landmarks[0].landmark])
+
+        h, w = image.shape[:2]
+        size = np.array((w, h))
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        landmarks = np.empty((N_LANDMARKS, 2))
+        landmarks[:len(mesh)] = mesh
+        for contour_ids, iris_ids in ((LEFT_EYE_CONTOUR, LEFT_IRIS), (RIGHT_EYE_CONTOUR, RIGHT_IRIS)):
+            contour = mesh[contour_ids] * size
+            pupil = estimate_pupil(gray, contour)
+            radius = np.ptp(contour[:, 0]) * 0.2
+            landmarks[iris_ids] = _iris_points(pupil, radius) / size
+        return landmarks
+
+    def close(self):
+        self.finder.mp_face_mesh.close()
+
+
+class OpenCVProvider(LandmarkProvider):
+    """
+    OpenCV face and eye detection fitted onto a generic face mesh - cheapest backend.
+
+    Faces are found with the OpenCV DNN SSD face detector when its model files
+    are available (EYEGESTURES_DNN_MODEL_DIR with deploy.prototxt and
+    res10_300x300_ssd_iter_140000.caffemodel), otherwise with the Haar cascade
+    shipped with OpenCV. Eyes come from the Haar eye cascade and pupils from
+    the darkest-pixel estimator; the remaining landmarks are the synthetic
+    face template scaled to the detected face box.
+    """
+
+    name = "opencv"
+
+    DNN_PROTOTXT = "deploy.prototxt"
+    DNN_MODEL = "res10_300x300_ssd_iter_140000.caffemodel"
+    DNN_CONFIDENCE = 0.5
+
+    def __init__(self, model_dir=None):
+        model_dir = model_dir or os.environ.get("EYEGESTURES_DNN_MODEL_DIR")
+        self.net = None
+        if model_dir is not None:
+            self.net = cv2.dnn.readNetFromCaffe(os.path.join(model_dir, self.DNN_PROTOTXT),
+                                                os.path.join(model_dir, self.DNN_MODEL))
+        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+        self.eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_eye.xml")
+        if self.face_cascade.empty() or self.eye_cascade.empty():
+            raise RuntimeError("OpenCV haar cascades are not available")
+
+        shape = SyntheticFaceFinder(start_time=0.0)
+        self.template = shape.template
+        self.eyes = shape.eyes
+        self.face_box = (shape.FACE_CENTER - shape.FACE_AXES, 2 * shape.FACE_AXES)
+        self.prev_eye_boxes = None
+
+    def _detect_face(self, image, gray):
+        h, w = gray.shape
+        if self.net is not None:
+            blob = cv2.dnn.blobFromImage(cv2.resize(image, (300, 300)), 1.0, (300, 300), (104.0, 177.0, 123.0))
+            self.net.setInput(blob)
+            detections = self.net.forward()[0, 0]
+            detections = detections[detections[:, 2] > self.DNN_CONFIDENCE]
+            if len(detections) == 0:
+                return None
+            x0, y0, x1, y1 = detections[np.argmax(detections[:, 2]), 3:7] * (w, h, w, h)
+            return np.array((x0, y0, x1 - x0, y1 - y0))
+
+        faces = self.face_cascade.detectMultiScale(gray, 1.2, 5)
+        if len(faces) == 0:
+            return None
+        return np.array(max(faces, key=lambda f: f[2] * f[3]), dtype=float)
+
+    def find(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        face = self._detect_face(image, gray)
+        if face is None:
+            return None
+        x, y, fw, fh = face
+        h, w = gray.shape
+        size = np.array((w, h))
+
+        # generic face mesh stretched over the detected face box
+        origin, extent = self.face_box
+        landmarks = (np.array((x, y)) + (self.template - origin) / extent * (fw, fh)) / size
+
+        upper = gray[int(y):int(y + fh * 0.6), int(x):int(x + fw)]
+        eye_boxes = self.eye_cascade.detectMultiScale(upper, 1.1, 5)
+        if len(eye_boxes) >= 2:
+            eye_boxes = sorted(eye_boxes, key=lambda e: e[2] * e[3])[-2:]
+            # image-right eye carries MediaPipe's LEFT_EYE indices, as in the template
+            self.prev_eye_boxes = sorted(eye_boxes, key=lambda e: -e[0])
+        if self.prev_eye_boxes is None:
+            return landmarks
+
+        for eye, (ex, ey, ew, eh) in zip(self.eyes, self.prev_eye_boxes):
+            center = np.array((x + ex + ew / 2, y + ey + eh / 2))
+            axes = np.array((ew * 0.4, eh * 0.2))
+            contour = center + axes * eye['unit']
+            pupil = estimate_pupil(gray, contour)
+            landmarks[eye['contour']] = contour / size
+            landmarks[eye['iris']] = _iris_points(pupil, axes[1]) / size
+        return landmarks
+
+
+PROVIDERS = dict()
+
+
+def register_provider(name, factory, quality):
+    """Register a landmark backend; higher quality backends are tried first during selection"""
+    PROVIDERS[name] = (factory, quality)
+
+
+def available_providers():
+    """Registered backend names, best quality first"""
+    return sorted(PROVIDERS, key=lambda name: -PROVIDERS[name][1])
+
+
+def create_provider(name, **kwargs):
+    if name not in PROVIDERS:
+        raise KeyError(f"Unknown landmark provider: {name}")
+    return PROVIDERS[name][0](**kwargs)
+
+
+def measure_latency(provider, image, probe_frames=5, warmup=1):
+    """Median seconds per find() call on the given image"""
+    for _ in range(warmup):
+        provider.find(image)
+    samples = []
+    for _ in range(probe_frames):
+        start = time.perf_counter()
+        provider.find(image)
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples))
+
+
+def select_provider(image, target_latency=1/30.0, names=None, probe_frames=5):
+    """
+    Pick the best quality backend whose measured per-frame latency fits the budget.
+
+    Backends that fail to initialise are skipped. When none fits the budget
+    the fastest one is returned, so slow machines degrade instead of stalling.
+    The chosen provider gets `latency` and `selection` attributes describing
+    the measurements.
+    """
+    names = names or available_providers()
+    measured = []
+    chosen = None
+    for name in names:
+        try:
+            provider = create_provider(name)
+            latency = measure_latency(provider, image, probe_frames)
+        except Exception as e:
+            print(f"Landmark provider {name} unavailable: {e}")
+            continue
+
+        measured.append((name, latency, provider))
+        if latency <= target_latency:
+            chosen = (name, latency, provider)
+            break
+
+    if not measured:
+        raise RuntimeError("No landmark provider could be initialised")
+    if chosen is None:
+        chosen = min(measured, key=lambda m: m[1])
+
+    for name, _, provider in measured:
+        if provider is not chosen[2]:
+            provider.close()
+
+    name, latency, provider = chosen
+    provider.latency = latency
+    provider.selection = {n: l for n, l, _ in measured}
+    print(f"Landmark provider: {name} ({latency * 1000:.1f} ms/frame, budget {target_latency * 1000:.1f} ms)")
+    return provider
+
+
+register_provider(MediaPipeIrisProvider.name, MediaPipeIrisProvider, 3)
+register_provider(MediaPipeMeshProvider.name, MediaPipeMeshProvider, 2)
+register_provider(OpenCVProvider.name, OpenCVProvider, 1)
@@ -0,0 +1,89 @@
+import time
+
+import cv2
+import numpy as np
+
+from eyeGestures import landmarks
+from eyeGestures.landmarks import (LandmarkProvider, available_providers, estimate_pupil,
+                                   register_provider, select_provider)
+
+FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+
+
+class _FakeProvider(LandmarkProvider):
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.closed = False
+
+    def find(self, image):
+        time.sleep(self.delay)
+        return np.zeros((478, 2))
+
+    def close(self):
+        self.closed = True
+
+
+def _with_fake_providers(providers, test):
+    saved = dict(landmarks.PROVIDERS)
+    landmarks.PROVIDERS.clear()
+    try:
+        for name, factory, quality in providers:
+            register_provider(name, factory, quality)
+        return test()
+    finally:
+        landmarks.PROVIDERS.clear()
+        landmarks.PROVIDERS.update(saved)
+
+
+def test_registry_sorted_by_quality():
+    """[TEST]"""
+    assert available_providers()[:3] == ["mediapipe_iris", "mediapipe_mesh", "opencv"]
+
+
+def test_estimate_pupil_finds_dark_disk():
+    """[TEST]"""
+    gray = np.full((100, 200), 200, dtype=np.uint8)
+    cv2.circle(gray, (120, 50), 6, 10, -1)
+    theta = np.linspace(0, 2 * np.pi, 16, endpoint=False)
+    contour = np.column_stack((100 + 40 * np.cos(theta), 50 + 20 * np.sin(theta)))
+
+    assert np.allclose(estimate_pupil(gray, contour), (120, 50), atol=1.5)
+
+
+def test_select_provider_picks_best_within_budget():
+    """[TEST]"""
+    def broken():
+        raise RuntimeError("no model")
+
+    def run():
+        provider = select_provider(FRAME, target_latency=0.005, probe_frames=2)
+        assert provider.delay == 0.0
+        assert set(provider.selection) == {"slow", "fast"}
+        return provider
+
+    _with_fake_providers([("broken", broken, 4),
+                          ("slow", lambda: _FakeProvider(0.02), 3),
+                          ("fast", lambda: _FakeProvider(0.0), 2),
+                          ("unused", lambda: _FakeProvider(0.0), 1)], run)
+
+
+def test_select_provider_falls_back_to_fastest():
+    """[TEST]"""
+    created = []
+
+    def factory(delay):
+        def make():
+            created.append(_FakeProvider(delay))
+            return created[-1]
+        return make
+
+    def run():
+        return select_provider(FRAME, target_latency=0.001, probe_frames=2)
+
+    provider = _with_fake_providers([("slower", factory(0.02), 2),
+                                     ("slow", factory(0.01), 1)], run)
+
+    assert provider.delay == 0.01
+    assert provider.latency > 0.001
+    assert created[0].closed and not created[1].closed
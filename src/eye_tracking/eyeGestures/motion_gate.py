@@ -0,0 +1,160 @@
+"""Module providing motion-gated landmark reuse in front of an expensive landmark finder."""
+
+import cv2
+import numpy as np
+
+from eyeGestures.landmarks import LandmarkProvider, estimate_pupil
+from eyeGestures.synthetic import LEFT_EYE_CONTOUR, RIGHT_EYE_CONTOUR, LEFT_IRIS, RIGHT_IRIS
+
+EYES = ((LEFT_EYE_CONTOUR, LEFT_IRIS), (RIGHT_EYE_CONTOUR, RIGHT_IRIS))
+
+
+def as_landmark_array(face_mesh):
+    """Normalise a finder result (MediaPipe face mesh or array) to an (N, 2) array"""
+    if face_mesh is None or isinstance(face_mesh, np.ndarray):
+        return face_mesh
+    return np.array([(lm.x, lm.y) for lm in face_mesh.multi_face_landmarks[0].landmark])
+
+
+class MotionGatedFinder(LandmarkProvider):
+    """
+    Wraps a finder and reruns it only when the eye regions changed.
+
+    The eye ROIs of the last full detection are cut out of each new frame,
+    downsampled to `patch_size` and compared with the stored patches by mean
+    absolute grayscale difference. Below `threshold` the previous landmarks
+    are reused and only the iris points are moved, by the shift of the
+    darkest-pixel pupil estimate since the reference frame. A full detection
+    is forced after `max_reuse` consecutive reused frames.
+
+    With `audit_every` > 0 every Nth reused frame is also run through the
+    wrapped finder, and the pixel distance between reused and fresh eye and
+    iris landmarks is accumulated as the accuracy cost of gating.
+    """
+
+    name = "motion_gated"
+
+    def __init__(self,
+                 finder,
+                 threshold=6.0,
+                 patch_size=(16, 8),
+                 margin=0.5,
+                 max_reuse=30,
+                 audit_every=0):
+
+        self.finder = finder
+        self.threshold = threshold
+        self.patch_size = patch_size
+        self.margin = margin
+        self.max_reuse = max_reuse
+        self.audit_every = audit_every
+
+        self.reference = None
+        self.reuse_count = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.audits = 0
+        self.error_sum = 0.0
+        self.error_max = 0.0
+        self.last_motion = None
+
+    def _rois(self, landmarks, size):
+        """Pixel boxes (x0, y0, x1, y1) around each eye, grown by margin"""
+        h, w = size
+        rois = []
+        for contour, _ in EYES:
+            points = landmarks[contour] * (w, h)
+            (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+            mx, my = (x1 - x0) * self.margin, (y1 - y0 + (x1 - x0) * 0.25) * self.margin
+            rois.append((int(max(x0 - mx, 0)), int(max(y0 - my, 0)),
+                         int(min(x1 + mx + 1, w)), int(min(y1 + my + 1, h))))
+        return rois
+
+    def _patches(self, gray, rois):
+        patches = []
+        for x0, y0, x1, y1 in rois:
+            if x1 - x0 < 2 or y1 - y0 < 2:
+                return None
+            patches.append(cv2.resize(gray[y0:y1, x0:x1], self.patch_size,
+                                      interpolation=cv2.INTER_AREA).astype(np.int16))
+        return patches
+
+    def _pupils(self, gray, landmarks):
+        h, w = gray.shape
+        return [estimate_pupil(gray, landmarks[contour] * (w, h)) for contour, _ in EYES]
+
+    def _detect(self, image, gray):
+        landmarks = as_landmark_array(self.finder.find(image))
+        self.misses += 1
+        self.reuse_count = 0
+        if landmarks is None:
+            self.reference = None
+            return None
+
+        rois = self._rois(landmarks, gray.shape)
+        patches = self._patches(gray, rois)
+        self.reference = None if patches is None else {
+            'landmarks': landmarks,
+            'rois': rois,
+            'patches': patches,
+            'pupils': self._pupils(gray, landmarks),
+        }
+        return landmarks
+
+    def _reuse(self, gray):
+        h, w = gray.shape
+        landmarks = self.reference['landmarks'].copy()
+        for (_, iris), before, after in zip(EYES, self.reference['pupils'], self._pupils(gray, landmarks)):
+            landmarks[iris] += (after - before) / (w, h)
+        return landmarks
+
+    def _audit(self, image, gray, reused):
+        fresh = as_landmark_array(self.finder.find(image))
+        if fresh is None:
+            return
+        h, w = gray.shape
+        ids = np.concatenate([np.concatenate((contour, iris)) for contour, iris in EYES])
+        error = np.linalg.norm((fresh[ids] - reused[ids]) * (w, h), axis=1).mean()
+        self.audits += 1
+        self.error_sum += error
+        self.error_max = max(self.error_max, error)
+
+    def find(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+
+        if self.reference is None or self.reuse_count >= self.max_reuse:
+            return self._detect(image, gray)
+
+        patches = self._patches(gray, self.reference['rois'])
+        if patches is None:
+            return self._detect(image, gray)
+        self.last_motion = float(np.mean([np.abs(a - b).mean() for a, b in zip(patches, self.reference['patches'])]))
+        if self.last_motion >= self.threshold:
+            return self._detect(image, gray)
+
+        landmarks = self._reuse(gray)
+        self.hits += 1
+        self.reuse_count += 1
+        if self.audit_every > 0 and self.hits % self.audit_every == 0:
+            self._audit(image, gray, landmarks)
+        return landmarks
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'frames': total,
+            'hits': self.hits,
+            'hit_rate': self.hits / total if total else 0.0,
+            'audits': self.audits,
+            'mean_error_px': self.error_sum / self.audits if self.audits else None,
+            'max_error_px': self.error_max if self.audits else None,
+        }
+
+    def reset(self):
+        self.reference = None
+        self.reuse_count = 0
+
+    def close(self):
+        if hasattr(self.finder, 'close'):
+            self.finder.close()
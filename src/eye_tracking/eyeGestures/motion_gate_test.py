@@ -0,0 +1,120 @@
+import os
+
+import cv2
+import numpy as np
+
+from eyeGestures.motion_gate import MotionGatedFinder
+from eyeGestures.synthetic import SyntheticFaceFinder
+
+WIDTH = 640
+HEIGHT = 480
+EYES = SyntheticFaceFinder(start_time=0).eyes
+
+
+class _ScriptedFinder:
+
+    def __init__(self):
+        self.landmarks = None
+        self.calls = 0
+
+    def find(self, image):
+        self.calls += 1
+        return self.landmarks
+
+
+def _render(landmarks):
+    image = np.full((HEIGHT, WIDTH, 3), 120, dtype=np.uint8)
+    size = np.array((WIDTH, HEIGHT))
+    for eye in EYES:
+        cv2.fillPoly(image, [np.int32(landmarks[eye['contour']] * size)], (230, 230, 230))
+        center = landmarks[eye['iris'][0]] * size
+        radius = np.linalg.norm(landmarks[eye['iris'][1]] - landmarks[eye['iris'][0]]) * WIDTH
+        cv2.circle(image, tuple(np.int32(center)), int(radius), (20, 20, 20), -1)
+    return image
+
+
+def _frames(**kwargs):
+    synthetic = SyntheticFaceFinder(**kwargs)
+    inner = _ScriptedFinder()
+    gate = MotionGatedFinder(inner, audit_every=1)
+    return synthetic, inner, gate
+
+
+def _feed(gate, inner, landmarks):
+    inner.landmarks = landmarks
+    return gate.find(_render(landmarks))
+
+
+def test_still_face_reuses_landmarks():
+    """[TEST]"""
+    synthetic, inner, gate = _frames()
+    for _ in range(10):
+        _feed(gate, inner, synthetic.landmarks_at(0))
+
+    stats = gate.stats()
+    assert stats['hits'] == 9
+    assert stats['hit_rate'] == 0.9
+    assert stats['mean_error_px'] < 0.5
+
+
+def test_small_gaze_shift_moves_only_iris():
+    """[TEST]"""
+    synthetic, inner, gate = _frames(gaze=[(0, (0.5, 0.5)), (1, (0.6, 0.5))])
+    first = _feed(gate, inner, synthetic.landmarks_at(0))
+    truth = synthetic.landmarks_at(1)
+    reused = _feed(gate, inner, truth)
+
+    assert gate.stats()['hits'] == 1
+    iris = [473, 468]
+    contour = [263, 33]
+    assert np.allclose(reused[contour], first[contour])
+    assert np.all(reused[iris, 0] > first[iris, 0])
+    assert np.abs((reused[iris] - truth[iris]) * (WIDTH, HEIGHT)).max() < 1.5
+
+
+def test_head_motion_triggers_detection():
+    """[TEST]"""
+    synthetic, inner, gate = _frames(head=[(0, (0.0, 0.0)), (1, (0.05, 0.0))])
+    _feed(gate, inner, synthetic.landmarks_at(0))
+    moved = synthetic.landmarks_at(1)
+    result = _feed(gate, inner, moved)
+
+    assert inner.calls == 2
+    assert gate.stats()['hits'] == 0
+    assert np.array_equal(result, moved)
+
+
+def test_max_reuse_forces_detection():
+    """[TEST]"""
+    synthetic = SyntheticFaceFinder()
+    inner = _ScriptedFinder()
+    gate = MotionGatedFinder(inner, max_reuse=3)
+    for _ in range(8):
+        _feed(gate, inner, synthetic.landmarks_at(0))
+
+    assert inner.calls == 2
+
+
+def test_eyetracker_audits_reuse_by_default():
+    """[TEST]"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    from EyeTracker import EyeTracker
+
+    class _Capture:
+        def read(self):
+            return True, None
+
+    landmarks = SyntheticFaceFinder(start_time=0).landmarks_at(0)
+    tracker = EyeTracker(capture=_Capture(), screen_size=(WIDTH, HEIGHT))
+    inner = _ScriptedFinder()
+    inner.landmarks = landmarks
+    tracker.gestures.finder.finder = inner
+
+    frame = _render(landmarks)
+    for _ in range(61):
+        tracker.gestures.getLandmarks(frame)
+
+    stats = tracker.get_metrics()['landmarks']
+    assert stats['hits'] >= 30
+    assert stats['audits'] >= 1
+    assert stats['mean_error_px'] is not None
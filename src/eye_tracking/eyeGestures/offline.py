@@ -0,0 +1,275 @@
+"""Module providing parallel offline reprocessing of recorded webcam sessions."""
+
+import argparse
+import csv
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from eyeGestures import EyeGestures_v3
+from eyeGestures.calibration_v2 import Calibrator
+from eyeGestures.face import NoFaceError
+from eyeGestures.landmarks import create_provider
+from eyeGestures.utils import head_normalised_key_points
+
+N_EYE_POINTS = 32
+
+
+def video_info(path):
+    """(frame count, fps) of a video file"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video: {path}")
+    n_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+    return n_frames, fps
+
+
+def plan_shards(n_frames, shard_frames, warmup_frames):
+    """
+    Split [0, n_frames) into consecutive shards.
+
+    Returns:
+        list of (warm_start, start, stop); frames in [warm_start, start) only
+        prime the landmark tracker and are dropped from the shard's output
+    """
+    shard_frames = max(int(shard_frames), 1)
+    return [(max(start - warmup_frames, 0), start, min(start + shard_frames, n_frames))
+            for start in range(0, n_frames, shard_frames)]
+
+
+def _make_gestures(backend, finder_factory):
+    if finder_factory is not None:
+        return EyeGestures_v3(finder=finder_factory())
+    if backend is not None:
+        return EyeGestures_v3(finder=create_provider(backend))
+    return EyeGestures_v3()
+
+
+def live_frame(frame):
+    """Camera frame converted the way EyeTracker.get_gaze feeds it to the pipeline"""
+    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return np.flip(frame, axis=1)
+
+
+def extract_shard(path, warm_start, start, stop, backend=None, finder_factory=None):
+    """
+    Landmark extraction for frames [start, stop) of a video, run by one worker.
+
+    Returns:
+        (start, eye_points (n, 32, 2), boxes (n, 4), blink (n,), skipped);
+        frames without a face are NaN in eye_points and boxes and counted
+        in skipped
+    """
+    gestures = _make_gestures(backend, finder_factory)
+    n = stop - start
+    eye_points = np.full((n, N_EYE_POINTS, 2), np.nan, dtype=np.float32)
+    boxes = np.full((n, 4), np.nan, dtype=np.float32)
+    blink = np.zeros(n, dtype=bool)
+    skipped = 0
+
+    cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, warm_start)
+    for index in range(warm_start, stop):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        try:
+            points, box, closed, _ = gestures.getFaceGeometry(live_frame(frame))
+        except NoFaceError:
+            if index >= start:
+                skipped += 1
+            continue
+        if index >= start:
+            eye_points[index - start] = points
+            boxes[index - start] = box
+            blink[index - start] = closed
+    cap.release()
+
+    if hasattr(gestures.finder, 'close'):
+        gestures.finder.close()
+    return start, eye_points, boxes, blink, skipped
+
+
+def _extract_task(task):
+    return extract_shard(*task)
+
+
+def reprocess(path,
+              workers=None,
+              shard_seconds=10.0,
+              warmup_frames=30,
+              backend=None,
+              finder_factory=None,
+              progress=True):
+    """
+    Extract per-frame landmarks of a whole recording using a process pool.
+
+    The recording is cut into time ranges of `shard_seconds`; each worker
+    decodes its range starting `warmup_frames` early so the face mesh
+    tracker has converged by the first frame it keeps. Shards are merged back
+    in frame order.
+
+    Args:
+        workers: process count, defaults to os.cpu_count(); 1 runs inline
+        finder_factory: picklable callable returning a finder, overrides backend
+
+    Returns:
+        dict with timestamps, eye_points, boxes, blink and valid arrays and
+        the count of frames skipped for having no face
+    """
+    n_frames, fps = video_info(path)
+    workers = workers or os.cpu_count() or 1
+    shards = plan_shards(n_frames, shard_seconds * fps, warmup_frames)
+    tasks = [(path, warm_start, start, stop, backend, finder_factory) for warm_start, start, stop in shards]
+
+    eye_points = np.full((n_frames, N_EYE_POINTS, 2), np.nan, dtype=np.float32)
+    boxes = np.full((n_frames, 4), np.nan, dtype=np.float32)
+    blink = np.zeros(n_frames, dtype=bool)
+    skipped = 0
+
+    started = time.time()
+    if workers == 1:
+        results = map(_extract_task, tasks)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_extract_task, tasks)
+
+    try:
+        for done, (start, points, box, closed, missed) in enumerate(results, 1):
+            eye_points[start:start + len(points)] = points
+            boxes[start:start + len(box)] = box
+            blink[start:start + len(closed)] = closed
+            skipped += missed
+            if progress:
+                print(f"\r🎞️  {done}/{len(tasks)} shards, {skipped} frames without a face "
+                      f"({time.time() - started:.0f}s)", end="", flush=True)
+    finally:
+        if workers != 1:
+            executor.shutdown()
+    if progress:
+        print()
+
+    return {
+        'timestamps': np.arange(n_frames) / fps,
+        'eye_points': eye_points,
+        'boxes': boxes,
+        'blink': blink,
+        'valid': ~np.isnan(boxes).any(axis=1),
+        'fps': fps,
+        'skipped': skipped,
+    }
+
+
+def key_points(session):
+    """(N, 34, 2) model features of every valid frame, head position relative to the first valid frame"""
+    valid = session['valid']
+    if not valid.any():
+        return np.zeros((0, N_EYE_POINTS + 2, 2))
+    boxes = session['boxes'][valid].astype(float)
+    return head_normalised_key_points(session['eye_points'][valid], boxes, boxes[0])
+
+
+def load_targets(path):
+    """Calibration targets CSV with t (seconds from recording start), x, y columns"""
+    with open(path, newline='') as f:
+        rows = [(float(r['t']), float(r['x']), float(r['y'])) for r in csv.DictReader(f)]
+    return np.array(rows).reshape(-1, 3)
+
+
+def calibrate(session, targets, calibrator=None):
+    """
+    Fit a calibrator in one batch on frames nearest to each (t, x, y) target.
+
+    Returns:
+        the fitted Calibrator
+    """
+    calibrator = calibrator or Calibrator()
+    valid_times = session['timestamps'][session['valid']]
+    features = key_points(session)
+    idx = np.clip(np.searchsorted(valid_times, targets[:, 0]), 0, len(valid_times) - 1)
+    prev = np.clip(idx - 1, 0, len(valid_times) - 1)
+    nearest = np.where(np.abs(valid_times[prev] - targets[:, 0]) < np.abs(valid_times[idx] - targets[:, 0]), prev, idx)
+    calibrator.fit(features[nearest], targets[:, 1:])
+    return calibrator
+
+
+def predict(session, calibrator):
+    """(N, 2) gaze for every frame of the session, NaN where no face was found"""
+    gaze = np.full((len(session['timestamps']), 2), np.nan)
+    gaze[session['valid']] = calibrator.predict_batch(key_points(session))
+    return gaze
+
+
+def analyse(session, calibrator):
+    """
+    Smoothed gaze, fixation and saccade flags for every frame, as the live
+    tracker would have produced them, computed with EyeGestures_v3.step_batch
+
+    Returns:
+        (gaze (N, 2), fixation (N,), saccades (N,)), NaN / False where no face was found
+    """
+    n = len(session['timestamps'])
+    valid = session['valid']
+    gaze = np.full((n, 2), np.nan)
+    fixation = np.full(n, np.nan)
+    saccades = np.zeros(n, dtype=bool)
+    if not valid.any():
+        return gaze, fixation, saccades
+
+    gestures = EyeGestures_v3(finder=object())
+    gestures.addContext("main")
+    gestures.clb["main"] = calibrator
+    times = session['timestamps'][valid]
+    gestures.prev_timestamp["main"] = times[0] - 1.0 / session['fps']
+    gaze[valid], fixation[valid], saccades[valid] = gestures.step_batch(key_points(session), times)
+    return gaze, fixation, saccades
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reprocess a recorded webcam session offline")
+    parser.add_argument('video', help="recorded webcam video")
+    parser.add_argument('--out', help="output .npz (defaults to <video>.gaze.npz)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--shard-seconds', type=float, default=10.0)
+    parser.add_argument('--warmup', type=int, default=30, help="frames decoded before each shard")
+    parser.add_argument('--backend', help="landmark backend name (see eyeGestures.landmarks)")
+    parser.add_argument('--targets', help="calibration targets CSV (t, x, y)")
+    parser.add_argument('--model', help="pickled calibrator (EyeGestures_v3.saveModel output)")
+    args = parser.parse_args(argv)
+
+    started = time.time()
+    session = reprocess(args.video, args.workers, args.shard_seconds, args.warmup, args.backend)
+    print(f"✅ Extracted {session['valid'].sum()}/{len(session['valid'])} frames "
+          f"in {time.time() - started:.1f}s")
+
+    calibrator = None
+    if args.model:
+        with open(args.model, 'rb') as f:
+            calibrator = pickle.loads(f.read())
+    if args.targets:
+        calibrator = calibrate(session, load_targets(args.targets), calibrator)
+
+    output = {k: v for k, v in session.items() if k != 'fps'}
+    output['fps'] = np.array(session['fps'])
+    if calibrator is not None:
+        output['raw_gaze'] = predict(session, calibrator)
+        output['gaze'], output['fixation'], output['saccades'] = analyse(session, calibrator)
+
+    out = args.out or os.path.splitext(args.video)[0] + ".gaze.npz"
+    np.savez_compressed(out, **output)
+    print(f"💾 Results written to {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
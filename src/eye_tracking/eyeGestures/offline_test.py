@@ -0,0 +1,133 @@
+import cv2
+import numpy as np
+import pytest
+
+from eyeGestures import EyeGestures_v3
+from eyeGestures.offline import analyse, calibrate, key_points, live_frame, plan_shards, predict, reprocess
+from eyeGestures.synthetic import SyntheticFaceFinder
+
+N_FRAMES = 40
+
+
+class _BrightnessFinder:
+    """Synthetic face whose gaze follows the frame brightness, so results depend on frame order"""
+
+    def __init__(self):
+        self.synthetic = SyntheticFaceFinder(start_time=0)
+
+    def find(self, image):
+        level = image.mean() / 255.0
+        return self.synthetic.landmarks_at(0) if level == 0 else \
+            SyntheticFaceFinder(gaze=(level, 0.5), head=(0.02 * level, 0.0), start_time=0).landmarks_at(0)
+
+
+class _DarkFrameFinder(_BrightnessFinder):
+    """No face in the darker half of the recording"""
+
+    def find(self, image):
+        return None if image.mean() < 120 else super().find(image)
+
+
+class _BrokenFinder:
+
+    def find(self, image):
+        raise KeyError("landmark table")
+
+
+def _video(tmp_path):
+    path = str(tmp_path / "session.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 20.0, (64, 48))
+    for i in range(N_FRAMES):
+        writer.write(np.full((48, 64, 3), 20 + i * 5, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_plan_shards_cover_recording():
+    """[TEST]"""
+    shards = plan_shards(95, 20, 5)
+
+    assert shards[0] == (0, 0, 20)
+    assert shards[1] == (15, 20, 40)
+    assert shards[-1] == (75, 80, 95)
+    assert sum(stop - start for _, start, stop in shards) == 95
+
+
+def test_parallel_matches_inline(tmp_path):
+    """[TEST]"""
+    path = _video(tmp_path)
+    inline = reprocess(path, workers=1, shard_seconds=0.5, warmup_frames=3,
+                       finder_factory=_BrightnessFinder, progress=False)
+    parallel = reprocess(path, workers=3, shard_seconds=0.5, warmup_frames=3,
+                         finder_factory=_BrightnessFinder, progress=False)
+
+    assert inline['valid'].all()
+    assert np.array_equal(inline['eye_points'], parallel['eye_points'])
+    assert np.all(np.diff(parallel['boxes'][:, 0]) > 0)
+    assert np.allclose(parallel['timestamps'][:3], (0.0, 0.05, 0.1))
+
+
+def test_key_points_match_streaming_pipeline(tmp_path):
+    """[TEST]"""
+    path = _video(tmp_path)
+    session = reprocess(path, workers=1, finder_factory=_BrightnessFinder, progress=False)
+
+    gestures = EyeGestures_v3(finder=_BrightnessFinder())
+    cap = cv2.VideoCapture(path)
+    streamed = []
+    for _ in range(N_FRAMES):
+        streamed.append(gestures.getLandmarks(live_frame(cap.read()[1]))[0])
+
+    assert session['skipped'] == 0
+    assert np.allclose(key_points(session), streamed, atol=1e-3)
+
+
+def test_frames_without_face_are_counted(tmp_path):
+    """[TEST]"""
+    path = _video(tmp_path)
+    session = reprocess(path, workers=1, shard_seconds=0.5, warmup_frames=3,
+                        finder_factory=_DarkFrameFinder, progress=False)
+
+    assert session['skipped'] == np.count_nonzero(~session['valid'])
+    assert 0 < session['skipped'] < N_FRAMES
+    assert not session['valid'][0] and session['valid'][-1]
+
+
+def test_extraction_errors_are_not_swallowed(tmp_path):
+    """[TEST]"""
+    path = _video(tmp_path)
+
+    with pytest.raises(KeyError):
+        reprocess(path, workers=1, finder_factory=_BrokenFinder, progress=False)
+
+
+def test_batch_calibration_and_prediction(tmp_path):
+    """[TEST]"""
+    path = _video(tmp_path)
+    session = reprocess(path, workers=1, finder_factory=_BrightnessFinder, progress=False)
+    session['valid'][5] = False
+    truth = np.column_stack((np.linspace(0, 1000, N_FRAMES), np.full(N_FRAMES, 400.0)))
+    targets = np.column_stack((session['timestamps'], truth))[::2]
+
+    gaze = predict(session, calibrate(session, targets))
+
+    assert np.isnan(gaze[5]).all()
+    valid = session['valid']
+    assert np.abs(gaze[valid] - truth[valid]).max() < 60
+
+
+def test_analyse_smooths_valid_frames(tmp_path):
+    """[TEST]"""
+    path = _video(tmp_path)
+    session = reprocess(path, workers=1, finder_factory=_BrightnessFinder, progress=False)
+    session['valid'][5] = False
+    truth = np.column_stack((np.linspace(0, 1000, N_FRAMES), np.full(N_FRAMES, 400.0)))
+    calibrator = calibrate(session, np.column_stack((session['timestamps'], truth)))
+
+    gaze, fixation, saccades = analyse(session, calibrator)
+
+    assert np.isnan(gaze[5]).all() and not saccades[5]
+    valid = session['valid']
+    assert np.allclose(gaze[0], predict(session, calibrator)[0])
+    assert np.all(np.diff(gaze[valid, 0]) > 0)
+    assert np.all(fixation[valid] >= 0)
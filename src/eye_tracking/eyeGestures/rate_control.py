@@ -0,0 +1,146 @@
+"""Module providing adaptive frame skipping with gaze interpolation for a fixed output rate."""
+
+import math
+import time
+
+import numpy as np
+
+
+class RateController:
+    """
+    Keeps gaze output at a uniform rate when inference is slower than a frame.
+
+    Pipeline latency is tracked with an exponential moving average; when it
+    exceeds the output interval only every Nth frame is run through
+    EyeGestures_v3.step, N = ceil(latency / interval) bounded by `max_skip`.
+    Samples for skipped frames are estimated from the last two inferred gaze
+    events: between them the point is interpolated, past the newest one it is
+    held during fixations and blinks and extrapolated with the measured
+    velocity during saccades, for at most `max_extrapolation` seconds.
+    Interpolation is opt-in: with the default `delay` of 0 a skipped frame
+    lies past the newest inferred event, so it is held or extrapolated. A
+    positive `delay` renders estimated samples that far in the past, trading
+    latency for interpolation; about (skip - 1) intervals covers every
+    skipped frame.
+    """
+
+    def __init__(self,
+                 target_rate=20.0,
+                 max_skip=8,
+                 smoothing=0.2,
+                 max_extrapolation=0.1,
+                 delay=0.0,
+                 bounds=None):
+
+        self.target_rate = target_rate
+        self.interval = 1.0 / target_rate
+        self.max_skip = max_skip
+        self.smoothing = smoothing
+        self.max_extrapolation = max_extrapolation
+        self.delay = delay
+        self.bounds = bounds
+
+        self.latency = None
+        self.skip = 1
+        self.frames_since_inference = None
+
+        # last two inferred samples: (timestamp, point, event)
+        self.samples = []
+
+        self.processed = 0
+        self.estimated = 0
+        self.deadline = None
+
+    def should_process(self):
+        """True when the current frame should go through the full pipeline"""
+        if self.frames_since_inference is None or self.frames_since_inference + 1 >= self.skip:
+            self.frames_since_inference = 0
+            return True
+        self.frames_since_inference += 1
+        return False
+
+    def record_latency(self, latency):
+        """Feed the duration of one step() call and adapt the skip factor"""
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.smoothing * (latency - self.latency)
+        self.skip = int(min(max(math.ceil(self.latency / self.interval - 1e-9), 1), self.max_skip))
+
+    def update(self, timestamp, event):
+        """Store an inferred Gevent taken at timestamp"""
+        self.samples.append((timestamp, np.array(event.point, dtype=float), event))
+        if len(self.samples) > 2:
+            self.samples.pop(0)
+        self.processed += 1
+
+    def estimate(self, timestamp):
+        """
+        Gaze point for a frame at timestamp that was not run through inference.
+
+        Returns:
+            (point, event) where event is the inferred Gevent the estimate is
+            based on, or (None, None) before the first inference
+        """
+        if not self.samples:
+            return None, None
+        self.estimated += 1
+        t = timestamp - self.delay
+
+        t_last, p_last, e_last = self.samples[-1]
+        if len(self.samples) < 2:
+            return self._clip(p_last), e_last
+
+        t_prev, p_prev, _ = self.samples[0]
+        span = t_last - t_prev
+        if span <= 0:
+            return self._clip(p_last), e_last
+
+        if t <= t_last:
+            alpha = min(max((t - t_prev) / span, 0.0), 1.0)
+            return self._clip(p_prev + alpha * (p_last - p_prev)), e_last
+
+        if e_last.blink or not e_last.saccades:
+            return self._clip(p_last), e_last
+
+        ahead = min(t - t_last, self.max_extrapolation)
+        velocity = (p_last - p_prev) / span
+        return self._clip(p_last + velocity * ahead), e_last
+
+    def _clip(self, point):
+        if self.bounds is None:
+            return point
+        return np.clip(point, (0, 0), self.bounds)
+
+    def pace(self):
+        """Sleep until the next output slot; slots a late caller missed are skipped, not burst"""
+        now = time.perf_counter()
+        if self.deadline is None:
+            self.deadline = now
+        self.deadline += self.interval
+        if self.deadline < now:
+            # stay on the original grid so later samples keep a uniform spacing
+            self.deadline += math.ceil((now - self.deadline) / self.interval) * self.interval
+        remaining = self.deadline - now
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def stats(self):
+        total = self.processed + self.estimated
+        return {
+            'target_rate': self.target_rate,
+            'skip': self.skip,
+            'latency_ms': None if self.latency is None else self.latency * 1000,
+            'processed': self.processed,
+            'estimated': self.estimated,
+            'inference_ratio': self.processed / total if total else 0.0,
+        }
+
+    def reset(self):
+        self.latency = None
+        self.skip = 1
+        self.frames_since_inference = None
+        self.samples = []
+        self.processed = 0
+        self.estimated = 0
+        self.deadline = None
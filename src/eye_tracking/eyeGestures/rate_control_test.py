@@ -0,0 +1,91 @@
+import numpy as np
+
+from eyeGestures import rate_control
+from eyeGestures.gevent import Gevent
+from eyeGestures.rate_control import RateController
+
+
+def _event(x, y, saccades=False, blink=False):
+    return Gevent(point=np.array((x, y)), blink=blink, fixation=0.0, saccades=saccades)
+
+
+def test_skip_follows_latency():
+    """[TEST]"""
+    controller = RateController(target_rate=20.0, max_skip=4, smoothing=1.0)
+
+    controller.record_latency(0.01)
+    assert controller.skip == 1
+    controller.record_latency(0.12)
+    assert controller.skip == 3
+    controller.record_latency(1.0)
+    assert controller.skip == 4
+
+    controller.record_latency(0.12)
+    processed = [controller.should_process() for _ in range(9)]
+    assert processed == [True, False, False] * 3
+
+
+def test_interpolates_between_inferred_samples():
+    """[TEST]"""
+    controller = RateController(delay=0.1)
+    controller.update(1.0, _event(100, 100))
+    controller.update(1.1, _event(200, 300))
+
+    point, _ = controller.estimate(1.15)
+
+    assert np.allclose(point, (150, 200))
+
+
+def test_extrapolates_saccades_and_holds_fixations():
+    """[TEST]"""
+    controller = RateController(max_extrapolation=0.1, bounds=(1000, 1000))
+    controller.update(1.0, _event(100, 100))
+    controller.update(1.1, _event(200, 100, saccades=True))
+
+    assert np.allclose(controller.estimate(1.15)[0], (250, 100))
+    assert np.allclose(controller.estimate(5.0)[0], (300, 100))
+
+    controller.update(1.2, _event(210, 100, saccades=False))
+    assert np.allclose(controller.estimate(1.3)[0], (210, 100))
+
+    controller.update(1.3, _event(990, 100, saccades=True))
+    assert controller.estimate(1.4)[0][0] == 1000
+
+
+def test_stats_count_estimated_samples():
+    """[TEST]"""
+    controller = RateController()
+    assert controller.estimate(0.0) == (None, None)
+
+    controller.update(0.0, _event(0, 0))
+    controller.estimate(0.05)
+    stats = controller.stats()
+
+    assert stats['processed'] == 1 and stats['estimated'] == 1
+    assert stats['inference_ratio'] == 0.5
+
+
+def test_pace_keeps_schedule_after_slow_frames(monkeypatch):
+    """[TEST]"""
+    class _Clock:
+        now = 10.0
+
+        def perf_counter(self):
+            return self.now
+
+        def sleep(self, seconds):
+            self.now += seconds
+
+    clock = _Clock()
+    monkeypatch.setattr(rate_control, "time", clock)
+    controller = RateController(target_rate=20.0)
+
+    slots = []
+    for latency in [0.12, 0.0, 0.0] * 4:
+        controller.pace()
+        slots.append(clock.now)
+        clock.now += latency
+
+    steps = (np.array(slots) - 10.0) / 0.05
+    assert np.allclose(steps, np.round(steps))
+    assert np.allclose(np.diff(slots)[1:3], 0.05)
@@ -0,0 +1,243 @@
+"""Module providing gaze point smoothers used by EyeGestures_v3 contexts."""
+
+import numpy as np
+
+DEFAULT_RATE = 30.0
+
+
+class Smoother:
+    """
+    Base class of gaze smoothers.
+
+    `update(point, timestamp)` takes one raw (x, y) prediction and returns the
+    smoothed point; `update_batch(points, timestamps)` does the same for N
+    points and must give the same result as N update calls. `filled` counts
+    samples contributing to the output, capped at `window`.
+    """
+
+    name = "base"
+
+    def __init__(self, window=20):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.filled = 0
+
+    def update(self, point, timestamp=None):
+        raise NotImplementedError
+
+    def update_batch(self, points, timestamps=None):
+        points = np.asarray(points, dtype=float)
+        if timestamps is None:
+            timestamps = [None] * len(points)
+        out = np.empty_like(points)
+        for i, (point, timestamp) in enumerate(zip(points, timestamps)):
+            out[i] = self.update(point, timestamp)
+        return out
+
+    def _count(self):
+        self.filled = min(self.filled + 1, self.window)
+
+
+class MovingAverage(Smoother):
+    """
+    Moving average over the last `window` points kept in a ring buffer with a running sum.
+
+    Semantics follow the original EyeGestures_v3 window: the sum always covers
+    `window` slots (zeros before they are written) and is divided by the
+    number of non-zero points seen so far, capped at `window` and at least 1.
+    The running sum is recomputed from the buffer once per window to drop
+    accumulated rounding error, keeping updates O(1) amortised.
+    """
+
+    name = "moving_average"
+
+    def reset(self):
+        self.filled = 0
+        self.buffer = np.zeros((self.window, 2))
+        self.head = 0
+        self.sum = np.zeros(2)
+        self.updates = 0
+
+    def points(self):
+        """Window contents, oldest first"""
+        return np.roll(self.buffer, -self.head, axis=0)
+
+    def _fill(self, nonzero):
+        if self.filled < self.window and nonzero:
+            self.filled += 1
+        if self.filled == 0:
+            self.filled = 1
+
+    def update(self, point, timestamp=None):
+        point = np.asarray(point, dtype=float)
+        self.sum += point - self.buffer[self.head]
+        self.buffer[self.head] = point
+        self.head = (self.head + 1) % self.window
+        self._fill((point != 0.0).any())
+
+        self.updates += 1
+        if self.updates % self.window == 0:
+            self.sum = np.sum(self.buffer, axis=0)
+        return self.sum / self.filled
+
+    def update_batch(self, points, timestamps=None):
+        points = np.asarray(points, dtype=float)
+        n = len(points)
+        if n == 0:
+            return np.zeros((0, 2))
+
+        history = np.concatenate((self.points(), points))
+        sums = np.cumsum(np.vstack((np.zeros((1, 2)), history)), axis=0)
+        window_sums = sums[self.window + 1:] - sums[1:n + 1]
+
+        nonzero = (points != 0.0).any(axis=1)
+        filled = self.filled
+        if filled == 0 and not nonzero[0]:
+            filled = 1
+        filled = np.minimum(filled + np.cumsum(nonzero), self.window)
+
+        self.buffer = history[-self.window:].copy()
+        self.head = 0
+        self.sum = np.sum(self.buffer, axis=0)
+        self.filled = int(filled[-1])
+        self.updates += n
+        return window_sums / filled[:, None]
+
+
+class ExponentialMovingAverage(Smoother):
+    """Exponential moving average, alpha defaults to 2 / (window + 1) like a pandas span"""
+
+    name = "ema"
+
+    def __init__(self, window=20, alpha=None):
+        self.alpha = alpha if alpha is not None else 2.0 / (window + 1)
+        super().__init__(window)
+
+    def reset(self):
+        self.filled = 0
+        self.value = None
+
+    def update(self, point, timestamp=None):
+        point = np.asarray(point, dtype=float)
+        if self.value is None:
+            self.value = point.copy()
+        else:
+            self.value = self.value + self.alpha * (point - self.value)
+        self._count()
+        return self.value.copy()
+
+
+class OneEuroFilter(Smoother):
+    """
+    One Euro filter (Casiez et al. 2012): an EMA whose cutoff frequency rises
+    with speed, smoothing fixations strongly while letting saccades through.
+    """
+
+    name = "one_euro"
+
+    def __init__(self, window=20, min_cutoff=1.0, beta=0.007, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        super().__init__(window)
+
+    def reset(self):
+        self.filled = 0
+        self.value = None
+        self.derivative = np.zeros(2)
+        self.timestamp = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * np.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def update(self, point, timestamp=None):
+        point = np.asarray(point, dtype=float)
+        if self.value is None:
+            self.value = point.copy()
+            self.timestamp = timestamp
+            self._count()
+            return self.value.copy()
+
+        dt = 1.0 / DEFAULT_RATE
+        if timestamp is not None and self.timestamp is not None and timestamp > self.timestamp:
+            dt = timestamp - self.timestamp
+        self.timestamp = timestamp
+
+        derivative = (point - self.value) / dt
+        self.derivative += self._alpha(self.d_cutoff, dt) * (derivative - self.derivative)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.derivative)
+        self.value = self.value + self._alpha(cutoff, dt) * (point - self.value)
+        self._count()
+        return self.value.copy()
+
+
+class ConstantVelocityKalman(Smoother):
+    """
+    Kalman filter with a constant-velocity motion model per axis.
+
+    `process_noise` is the acceleration variance (px/s^2)^2 and
+    `measurement_noise` the variance of a raw prediction (px^2).
+    """
+
+    name = "kalman"
+
+    def __init__(self, window=20, process_noise=5e4, measurement_noise=400.0):
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        super().__init__(window)
+
+    def reset(self):
+        self.filled = 0
+        # state per axis: (position, velocity), rows are x and y
+        self.state = None
+        self.covariance = None
+        self.timestamp = None
+
+    def update(self, point, timestamp=None):
+        point = np.asarray(point, dtype=float)
+        if self.state is None:
+            self.state = np.column_stack((point, np.zeros(2)))
+            self.covariance = np.array([[self.measurement_noise, 0.0], [0.0, 1e6]])
+            self.timestamp = timestamp
+            self._count()
+            return point.copy()
+
+        dt = 1.0 / DEFAULT_RATE
+        if timestamp is not None and self.timestamp is not None and timestamp > self.timestamp:
+            dt = timestamp - self.timestamp
+        self.timestamp = timestamp
+
+        # predict, both axes share the same covariance since they share the model
+        F = np.array([[1.0, dt], [0.0, 1.0]])
+        Q = self.process_noise * np.array([[dt**4 / 4, dt**3 / 2], [dt**3 / 2, dt**2]])
+        self.state = self.state @ F.T
+        P = F @ self.covariance @ F.T + Q
+
+        # correct with the position measurement
+        gain = P[:, 0] / (P[0, 0] + self.measurement_noise)
+        innovation = point - self.state[:, 0]
+        self.state = self.state + innovation[:, None] * gain[None, :]
+        self.covariance = P - np.outer(gain, P[0, :])
+        self._count()
+        return self.state[:, 0].copy()
+
+
+SMOOTHERS = {
+    MovingAverage.name: MovingAverage,
+    ExponentialMovingAverage.name: ExponentialMovingAverage,
+    OneEuroFilter.name: OneEuroFilter,
+    ConstantVelocityKalman.name: ConstantVelocityKalman,
+}
+
+
+def create_smoother(smoother="moving_average", **kwargs):
+    """Smoother instance from a name in SMOOTHERS (kwargs go to its constructor) or an instance"""
+    if isinstance(smoother, Smoother):
+        return smoother
+    if smoother not in SMOOTHERS:
+        raise KeyError(f"Unknown smoother: {smoother}")
+    return SMOOTHERS[smoother](**kwargs)
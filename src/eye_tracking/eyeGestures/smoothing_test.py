@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from eyeGestures import EyeGestures_v3
+from eyeGestures.smoothing import SMOOTHERS, MovingAverage, create_smoother
+
+
+def _shifting_average(points, window=20):
+    """The array shifting average EyeGestures_v3.step used before smoothers"""
+    average_points = np.zeros((window, 2))
+    filled_points = 0
+    out = []
+    for y_point in points:
+        average_points[1:, :] = average_points[:window - 1, :]
+        average_points[0, :] = y_point
+        if filled_points < window and (y_point != np.array([0.0, 0.0])).any():
+            filled_points += 1
+        if filled_points == 0:
+            filled_points = 1
+        out.append(np.sum(average_points, axis=0) / filled_points)
+    return np.array(out)
+
+
+def _points(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0, 1500, size=(n, 2))
+    points[:3] = 0.0
+    points[rng.uniform(size=n) < 0.1] = 0.0
+    return points
+
+
+@pytest.mark.parametrize("window", [1, 5, 20, 64])
+def test_moving_average_keeps_shifting_semantics(window):
+    """[TEST]"""
+    points = _points()
+    smoother = MovingAverage(window)
+
+    result = np.array([smoother.update(p) for p in points])
+
+    assert np.allclose(result, _shifting_average(points, window), rtol=0, atol=1e-9)
+    assert smoother.filled == window
+
+
+@pytest.mark.parametrize("name", sorted(SMOOTHERS))
+def test_update_batch_matches_update(name):
+    """[TEST]"""
+    points = _points(200)
+    timestamps = np.arange(200) / 30.0
+    streaming = create_smoother(name, window=10)
+    batch = create_smoother(name, window=10)
+
+    expected = np.array([streaming.update(p, t) for p, t in zip(points, timestamps)])
+    result = np.vstack((batch.update_batch(points[:70], timestamps[:70]),
+                        batch.update_batch(points[70:], timestamps[70:])))
+
+    assert np.allclose(result, expected, atol=1e-9)
+    assert batch.filled == streaming.filled
+
+
+def test_filters_follow_a_step():
+    """[TEST]"""
+    timestamps = np.arange(60) / 30.0
+    points = np.where(timestamps[:, None] < 0.5, (100.0, 100.0), (900.0, 500.0))
+
+    for name in SMOOTHERS:
+        result = create_smoother(name, window=10).update_batch(points, timestamps)
+        assert np.allclose(result[14], (100, 100)), name
+        assert np.allclose(result[-1], (900, 500), atol=15), name
+
+
+def test_kalman_tracks_constant_velocity_without_lag():
+    """[TEST]"""
+    timestamps = np.arange(90) / 30.0
+    points = np.column_stack((100 + 300 * timestamps, np.full(90, 400.0)))
+
+    kalman = create_smoother("kalman").update_batch(points, timestamps)
+    average = create_smoother("moving_average").update_batch(points, timestamps)
+
+    assert abs(kalman[-1, 0] - points[-1, 0]) < 5
+    assert abs(average[-1, 0] - points[-1, 0]) > 50
+
+
+def test_smoother_selectable_per_context():
+    """[TEST]"""
+    gestures = EyeGestures_v3(finder=object())
+    gestures.setSmoother("ema", context="tracker", window=5)
+    gestures.setSmoother("kalman")
+    gestures.addContext("main")
+    gestures.addContext("other")
+
+    assert gestures.smoothers["tracker"].name == "ema"
+    assert gestures.smoothers["tracker"].alpha == pytest.approx(1 / 3)
+    assert gestures.smoothers["main"].name == "kalman"
+    with pytest.raises(KeyError):
+        gestures.setSmoother("median", context="main")
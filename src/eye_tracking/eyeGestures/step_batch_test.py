@@ -0,0 +1,71 @@
+import numpy as np
+
+from eyeGestures import EyeGestures_v3
+from eyeGestures.synthetic import SyntheticFaceFinder, gaze_path
+
+FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+WIDTH = 1000
+HEIGHT = 800
+TARGETS = [(0.2, 0.2), (0.8, 0.3), (0.5, 0.8), (0.1, 0.6)]
+
+
+def _finder():
+    return SyntheticFaceFinder(rate=30.0, gaze=gaze_path(TARGETS, dwell=0.6), noise=0.0005, seed=7, start_time=100.0)
+
+
+def _gestures(model=None):
+    gestures = EyeGestures_v3(finder=_finder())
+    gestures.addContext("main")
+    gestures.prev_timestamp["main"] = 99.9
+    if model is None:
+        key_points = [gestures.getLandmarks(FRAME)[0] for _ in range(72)]
+        truth = [gestures.finder.screen_target(WIDTH, HEIGHT, t) for t in np.arange(72) / 30.0]
+        gestures.clb["main"].fit(np.array(key_points), np.array(truth))
+        gestures.finder = _finder()
+        gestures.starting_head_position = np.zeros((1, 2))
+    else:
+        gestures.loadModel(model)
+    return gestures
+
+
+def _streamed(gestures, n):
+    points, fixation, saccades = [], [], []
+    for _ in range(n):
+        event, _ = gestures.step(FRAME, False, WIDTH, HEIGHT, timestamp=gestures.finder.next_timestamp)
+        points.append(event.point)
+        fixation.append(event.fixation)
+        saccades.append(event.saccades)
+    return np.array(points), np.array(fixation), np.array(saccades)
+
+
+def test_step_batch_matches_step():
+    """[TEST]"""
+    streaming = _gestures()
+    expected = _streamed(streaming, 72)
+
+    batch = _gestures(streaming.saveModel())
+    key_points = np.array([batch.getLandmarks(FRAME)[0] for _ in range(72)])
+    result = batch.step_batch(key_points, 100.0 + np.arange(72) / 30.0)
+
+    assert np.allclose(result[0], expected[0], atol=1e-6)
+    assert np.allclose(result[1], expected[1])
+    assert np.array_equal(result[2], expected[2])
+    assert expected[2].any() and not expected[2].all()
+
+
+def test_step_batch_continues_context_state():
+    """[TEST]"""
+    streaming = _gestures()
+    expected = _streamed(streaming, 60)
+
+    batch = _gestures(streaming.saveModel())
+    key_points = np.array([batch.getLandmarks(FRAME)[0] for _ in range(60)]).reshape(60, -1)
+    timestamps = 100.0 + np.arange(60) / 30.0
+    first = batch.step_batch(key_points[:25], timestamps[:25])
+    second = batch.step_batch(key_points[25:], timestamps[25:])
+
+    assert np.allclose(np.vstack((first[0], second[0])), expected[0], atol=1e-6)
+    assert np.array_equal(np.concatenate((first[2], second[2])), expected[2])
+    assert np.allclose(batch.prev_point["main"], streaming.prev_point["main"])
+    assert batch.smoothers["main"].filled == streaming.smoothers["main"].filled
+    assert np.allclose(batch.smoothers["main"].points(), streaming.smoothers["main"].points())
@@ -0,0 +1,211 @@
+"""Module providing a synthetic face landmark backend, so the pipeline can run without a camera."""
+
+import time
+
+import numpy as np
+import mediapipe as mp
+
+N_LANDMARKS = 478
+
+LEFT_EYE_CORNER = 263
+RIGHT_EYE_CORNER = 33
+LEFT_IRIS = [473, 474, 475, 476, 477]   # center first, then the ring
+RIGHT_IRIS = [468, 469, 470, 471, 472]
+
+
+def eye_contour(connections, corner):
+    """Order eye contour landmarks by walking their connections around the eye, starting at a corner"""
+    adjacency = dict()
+    for a, b in connections:
+        adjacency.setdefault(a, []).append(b)
+        adjacency.setdefault(b, []).append(a)
+
+    loop = [corner]
+    prev, cur = None, corner
+    while True:
+        nxt = [n for n in adjacency[cur] if n != prev][0]
+        if nxt == corner:
+            return np.array(loop)
+        loop.append(nxt)
+        prev, cur = cur, nxt
+
+
+LEFT_EYE_CONTOUR = eye_contour(mp.solutions.face_mesh.FACEMESH_LEFT_EYE, LEFT_EYE_CORNER)
+RIGHT_EYE_CONTOUR = eye_contour(mp.solutions.face_mesh.FACEMESH_RIGHT_EYE, RIGHT_EYE_CORNER)
+
+
+def keyframes(points):
+    """Turn [(t, value), ...] into a script linearly interpolating value over time"""
+    times = np.array([p[0] for p in points], dtype=float)
+    values = np.array([p[1] for p in points], dtype=float).reshape(len(points), -1)
+
+    def script(t):
+        out = np.array([np.interp(t, times, values[:, i]) for i in range(values.shape[1])])
+        return out if out.size > 1 else out[0]
+    return script
+
+
+def gaze_path(targets, dwell=1.0, transition=0.05, start=0.0):
+    """Script dwelling `dwell` seconds on each normalised target with a fast saccade between them"""
+    points = []
+    t = start
+    for target in targets:
+        points.append((t, target))
+        t += dwell
+        points.append((t - transition, target))
+    return keyframes(points)
+
+
+def _as_script(value, default):
+    if value is None:
+        value = default
+    if callable(value):
+        return value
+    if isinstance(value, (list, tuple)) and len(value) > 0 and isinstance(value[0], (list, tuple)):
+        return keyframes(value)
+    constant = np.array(value, dtype=float)
+    return lambda t: constant
+
+
+class SyntheticFaceFinder:
+    """
+    FaceFinder replacement generating parametric 478-point landmark sets.
+
+    Every call to `find` advances a virtual clock by 1/rate seconds, so the
+    pipeline can be driven at any rate independently of the wall clock. Head
+    translation, head scale and gaze target are scripts: a constant, a
+    callable of time or a list of (t, value) keyframes. Blinks are given as
+    (start, duration) pairs. `timestamp` holds the time of the last frame on
+    the time.time() clock; `next_timestamp` is the time of the frame the next
+    `find` call produces, which is what EyeGestures_v3.step(timestamp=...)
+    expects since the argument is evaluated before landmarks are extracted.
+    """
+
+    # face geometry in normalised image coordinates
+    FACE_CENTER = np.array((0.5, 0.5))
+    FACE_AXES = np.array((0.15, 0.2))
+    EYE_Y = 0.43
+    EYE_X_OFFSET = 0.065
+    EYE_AXES = np.array((0.03, 0.012))
+    IRIS_RADIUS = 0.006
+
+    # how far pupils and lids travel for a gaze at the screen edge, relative to eye size
+    PUPIL_TRAVEL = np.array((0.45, 0.35))
+    UPPER_LID_TRAVEL = np.array((0.15, 0.30))
+    LOWER_LID_TRAVEL = np.array((0.10, 0.10))
+
+    def __init__(self,
+                 rate=30.0,
+                 gaze=None,
+                 head=None,
+                 scale=None,
+                 blinks=(),
+                 noise=0.0,
+                 seed=0,
+                 start_time=None):
+
+        self.rate = rate
+        self.gaze = _as_script(gaze, (0.5, 0.5))
+        self.head = _as_script(head, (0.0, 0.0))
+        self.scale = _as_script(scale, 1.0)
+        self.blinks = list(blinks)
+        self.noise = noise
+        self.rng = np.random.default_rng(seed)
+
+        self.start_time = time.time() if start_time is None else start_time
+        self.frame_index = 0
+        self.t = 0.0
+        self.timestamp = self.start_time
+
+        self.template, self.eyes = self._build_template()
+
+    def _build_template(self):
+        # fixed seed: the face shape is the same for every generator
+        rng = np.random.default_rng(478)
+        angles = rng.uniform(0, 2 * np.pi, N_LANDMARKS)
+        radii = np.sqrt(rng.uniform(0, 1, N_LANDMARKS))
+        template = self.FACE_CENTER + self.FACE_AXES * np.column_stack((radii * np.cos(angles),
+                                                                        radii * np.sin(angles)))
+
+        eyes = []
+        for contour, iris, side in ((LEFT_EYE_CONTOUR, LEFT_IRIS, 1), (RIGHT_EYE_CONTOUR, RIGHT_IRIS, -1)):
+            theta = np.linspace(0, 2 * np.pi, len(contour), endpoint=False)
+            unit = np.column_stack((np.cos(theta), np.sin(theta)))
+            center = np.array((self.FACE_CENTER[0] + side * self.EYE_X_OFFSET, self.EYE_Y))
+            template[contour] = center + self.EYE_AXES * unit
+
+            ring = np.linspace(0, 2 * np.pi, len(iris) - 1, endpoint=False)
+            iris_unit = np.vstack(((0.0, 0.0), np.column_stack((np.cos(ring), np.sin(ring)))))
+            template[iris] = center + self.IRIS_RADIUS * iris_unit
+
+            eyes.append({
+                'contour': contour,
+                'unit': unit,
+                'upper': unit[:, 1] < 0,
+                'iris': np.array(iris),
+                'iris_unit': iris_unit,
+                'center': center,
+            })
+        return template, eyes
+
+    def closure(self, t):
+        """Eye closure in [0, 1] at time t, ramping over the first and last quarter of each blink"""
+        for start, duration in self.blinks:
+            if start <= t < start + duration:
+                phase = (t - start) / duration
+                return float(min(1.0, phase * 4, (1 - phase) * 4))
+        return 0.0
+
+    def gaze_target(self, t=None):
+        """Normalised screen point the synthetic subject is looking at"""
+        return np.asarray(self.gaze(self.t if t is None else t), dtype=float)
+
+    def screen_target(self, width, height, t=None):
+        return self.gaze_target(t) * np.array((width, height))
+
+    def landmarks_at(self, t):
+        """Normalised (478, 2) landmarks at time t"""
+        landmarks = self.template.copy()
+        direction = (self.gaze_target(t) - 0.5) * 2
+        closure = self.closure(t)
+
+        for eye in self.eyes:
+            upper = eye['upper'][:, None]
+            lid_travel = np.where(upper, self.UPPER_LID_TRAVEL, self.LOWER_LID_TRAVEL)
+            unit = eye['unit'] * np.array((1.0, 1.0 - closure))
+            landmarks[eye['contour']] = eye['center'] + self.EYE_AXES * (unit + lid_travel * direction)
+
+            pupil = eye['center'] + self.EYE_AXES * self.PUPIL_TRAVEL * direction
+            landmarks[eye['iris']] = pupil + self.IRIS_RADIUS * eye['iris_unit']
+
+        scale = float(self.scale(t))
+        landmarks = self.FACE_CENTER + (landmarks - self.FACE_CENTER) * scale + self.head(t)
+
+        if self.noise > 0:
+            landmarks += self.rng.normal(0, self.noise, landmarks.shape)
+        return landmarks
+
+    @property
+    def next_timestamp(self):
+        return self.start_time + self.frame_index / self.rate
+
+    def find(self, image=None):
+        """Return the next synthetic landmark set, advancing the virtual clock by one frame"""
+        self.t = self.frame_index / self.rate
+        self.timestamp = self.start_time + self.t
+        self.frame_index += 1
+        return self.landmarks_at(self.t)
+
+    def generate(self, n_frames):
+        """Generate n frames at once, returns (timestamps, landmarks of shape (n, 478, 2))"""
+        landmarks = np.empty((n_frames, N_LANDMARKS, 2))
+        timestamps = np.empty(n_frames)
+        for i in range(n_frames):
+            landmarks[i] = self.find()
+            timestamps[i] = self.timestamp
+        return timestamps, landmarks
+
+    def reset(self):
+        self.frame_index = 0
+        self.t = 0.0
+        self.timestamp = self.start_time
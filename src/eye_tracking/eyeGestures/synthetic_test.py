@@ -0,0 +1,73 @@
+import numpy as np
+
+from eyeGestures import EyeGestures_v3
+from eyeGestures.face import Face
+from eyeGestures.synthetic import SyntheticFaceFinder, gaze_path, keyframes
+
+FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+WIDTH = 1000
+HEIGHT = 800
+
+
+def test_landmarks_shape_and_rate():
+    """[TEST]"""
+    finder = SyntheticFaceFinder(rate=200.0, start_time=10.0)
+    timestamps, landmarks = finder.generate(5)
+
+    assert landmarks.shape == (5, 478, 2)
+    assert np.allclose(np.diff(timestamps), 1 / 200.0)
+    assert timestamps[0] == 10.0
+
+
+def test_deterministic_with_seed():
+    """[TEST]"""
+    a = SyntheticFaceFinder(noise=0.001, seed=3, start_time=0).generate(3)[1]
+    b = SyntheticFaceFinder(noise=0.001, seed=3, start_time=0).generate(3)[1]
+
+    assert np.array_equal(a, b)
+
+
+def test_blink_detected_by_face():
+    """[TEST]"""
+    finder = SyntheticFaceFinder(rate=10.0, blinks=[(1.0, 0.4)])
+    face = Face()
+
+    blinks = []
+    for _ in range(20):
+        face.process(FRAME, finder.find())
+        blinks.append(face.getLeftEye().getBlink() and face.getRightEye().getBlink())
+
+    assert not any(blinks[:10])
+    assert any(blinks[10:14])
+    assert not any(blinks[15:])
+
+
+def test_head_translation_and_scale():
+    """[TEST]"""
+    still = SyntheticFaceFinder().landmarks_at(0)
+    moved = SyntheticFaceFinder(head=[(0, (0.0, 0.0)), (1, (0.1, 0.0))],
+                                scale=keyframes([(0, 1.0), (1, 1.2)])).landmarks_at(1)
+
+    assert np.mean(moved[:, 0]) > np.mean(still[:, 0]) + 0.09
+    assert np.ptp(moved[:, 1]) > np.ptp(still[:, 1]) * 1.15
+
+
+def test_calibrated_pipeline_tracks_scripted_gaze():
+    """[TEST]"""
+    targets = [(x, y) for x in (0.1, 0.5, 0.9) for y in (0.1, 0.5, 0.9)]
+    finder = SyntheticFaceFinder(rate=30.0, gaze=gaze_path(targets, dwell=0.5))
+    gestures = EyeGestures_v3(finder=finder)
+    gestures.addContext("main")
+
+    key_points, truth = [], []
+    for _ in range(int(len(targets) * 0.5 * 30)):
+        key_points.append(gestures.getLandmarks(FRAME)[0])
+        truth.append(finder.screen_target(WIDTH, HEIGHT))
+    gestures.clb["main"].fit(np.array(key_points), np.array(truth))
+
+    gestures.finder = SyntheticFaceFinder(rate=30.0, gaze=(0.3, 0.7))
+    for _ in range(30):
+        event, _ = gestures.step(FRAME, False, WIDTH, HEIGHT, timestamp=gestures.finder.next_timestamp)
+
+    assert np.linalg.norm(event.point - np.array((0.3 * WIDTH, 0.7 * HEIGHT))) < 50
+    assert event.fixation > 0.5
@@ -41,16 +41,31 @@ def timeit(func):
     return inner
 
 def low_pass_filter_fourier(data, cutoff_frequency):
-    # Apply Fourier Transform-based filter column-wise
-    filtered_data = np.zeros_like(data, dtype=float)
-    for col in range(data.shape[1]):  # Iterate over each column
-        fft_data = np.fft.fft(data[:, col])
-        frequencies = np.fft.fftfreq(len(data[:, col]))
-        # Apply the low-pass filter
-        fft_data[np.abs(frequencies) > cutoff_frequency] = 0
-        # Perform Inverse Fourier Transform
-        filtered_data[:, col] = np.fft.ifft(fft_data).real
-    return filtered_data
+    # Apply Fourier Transform-based filter column-wise, along the second to last
+    # axis, so (points, 2) and (frames, points, 2) arrays are both accepted
+    fft_data = np.fft.fft(data, axis=-2)
+    frequencies = np.fft.fftfreq(data.shape[-2])
+    # Apply the low-pass filter
+    fft_data[..., np.abs(frequencies) > cutoff_frequency, :] = 0
+    # Perform Inverse Fourier Transform
+    return np.fft.ifft(fft_data, axis=-2).real
+
+def head_normalised_key_points(eye_points, boxes, starting_box):
+    """
+    Model features for N frames: (N, 32, 2) eye contours in pixels and (N, 4)
+    face boxes (x, y, w, h) become (N, 34, 2) key points, with the eye contours
+    moved and scaled into the starting face box, followed by a scale row and
+    a head offset row.
+    """
+    eye_points = np.asarray(eye_points, dtype=float)
+    boxes = np.asarray(boxes, dtype=float)
+    head_offset = boxes[:, None, :2] - starting_box[:2]
+    scale = starting_box[2:] / boxes[:, None, 2:]
+
+    key_points = np.concatenate((eye_points, scale, head_offset), axis=1)
+    key_points = (key_points - head_offset) * scale
+    key_points[:, -1, :] = head_offset[:, 0]
+    return key_points
 
 def shape_to_np(shape, dtype="int"):
     """
@@ -0,0 +1,256 @@
+"""
+Gaze sample fan-out - one producer loop, any number of subscribers
+
+The producer pulls samples from a single source (EyeTracker.get_gaze) so the
+camera is read and the model run once per sample no matter how many
+consumers there are. Every subscriber gets its own bounded buffer with a
+delivery policy:
+
+    latest    - when full the oldest sample is dropped, consumers always see
+                recent gaze (overlays, UI)
+    lossless  - when full the producer waits for the consumer, nothing is
+                dropped (recorders); a slow lossless consumer slows everyone
+
+Subscribers consume with a callback (run on its own thread), blocking
+get()/iteration, or `async for`.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+
+LATEST_ONLY = "latest"
+LOSSLESS = "lossless"
+POLICIES = (LATEST_ONLY, LOSSLESS)
+
+
+class Subscription:
+    """Bounded per-subscriber buffer of gaze samples"""
+
+    def __init__(self, hub, maxsize=64, policy=LATEST_ONLY, callback=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}, expected one of {POLICIES}")
+        self.hub = hub
+        self.maxsize = max(int(maxsize), 1)
+        self.policy = policy
+        self.callback = callback
+
+        self.buffer = deque()
+        self.cond = threading.Condition()
+        self.closed = False
+        self.delivered = 0
+        self.dropped = 0
+        self._waiter = None  # (loop, asyncio.Event) of a pending async consumer
+
+        self.thread = None
+        if callback is not None:
+            self.thread = threading.Thread(target=self._dispatch, daemon=True)
+            self.thread.start()
+
+    def put(self, sample):
+        """Producer side: add a sample according to the policy"""
+        with self.cond:
+            if self.closed:
+                return
+            if len(self.buffer) >= self.maxsize:
+                if self.policy == LATEST_ONLY:
+                    self.buffer.popleft()
+                    self.dropped += 1
+                else:
+                    self.cond.wait_for(lambda: len(self.buffer) < self.maxsize or self.closed)
+                    if self.closed:
+                        return
+            self.buffer.append(sample)
+            self.cond.notify_all()
+            waiter, self._waiter = self._waiter, None
+        if waiter is not None:
+            loop, event = waiter
+            loop.call_soon_threadsafe(event.set)
+
+    def _pop(self):
+        sample = self.buffer.popleft()
+        self.delivered += 1
+        self.cond.notify_all()
+        return sample
+
+    def get(self, timeout=None):
+        """
+        Next sample, blocking up to timeout seconds
+
+        Returns:
+            the sample, or None once the subscription is closed and drained
+
+        Raises:
+            queue.Empty: when nothing arrived within timeout
+        """
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.buffer or self.closed, timeout):
+                raise queue.Empty
+            if self.buffer:
+                return self._pop()
+            return None
+
+    def get_nowait(self):
+        """Next buffered sample or None"""
+        with self.cond:
+            return self._pop() if self.buffer else None
+
+    def drain(self):
+        """All buffered samples, oldest first"""
+        with self.cond:
+            samples = list(self.buffer)
+            self.buffer.clear()
+            self.delivered += len(samples)
+            self.cond.notify_all()
+            return samples
+
+    def __iter__(self):
+        while True:
+            sample = self.get()
+            if sample is None:
+                return
+            yield sample
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            with self.cond:
+                if self.buffer:
+                    return self._pop()
+                if self.closed:
+                    raise StopAsyncIteration
+                event = self._wait_async()
+            await event.wait()
+
+    def _wait_async(self):
+        # called with cond held; the producer wakes the loop once, not per sample
+        event = asyncio.Event()
+        self._waiter = (asyncio.get_running_loop(), event)
+        return event
+
+    async def get_batch(self):
+        """
+        Every sample buffered so far, waiting for at least one
+
+        Returns:
+            list of samples, empty once the subscription is closed and drained
+        """
+        while True:
+            with self.cond:
+                if self.buffer or self.closed:
+                    samples = list(self.buffer)
+                    self.buffer.clear()
+                    self.delivered += len(samples)
+                    self.cond.notify_all()
+                    return samples
+                event = self._wait_async()
+            await event.wait()
+
+    def _dispatch(self):
+        for sample in self:
+            try:
+                self.callback(sample)
+            except Exception as e:
+                print(f"⚠️  Gaze subscriber callback error: {e}")
+
+    def close(self):
+        """Stop receiving samples; pending consumers see the end of the stream"""
+        with self.cond:
+            if self.closed:
+                return
+            self.closed = True
+            self.cond.notify_all()
+            waiter, self._waiter = self._waiter, None
+        if waiter is not None:
+            loop, event = waiter
+            loop.call_soon_threadsafe(event.set)
+        self.hub.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GazeHub:
+    """
+    Runs one producer loop over a sample source and fans samples out to subscribers
+
+    Args:
+        source: callable returning the next sample dict, or None when there is none
+        pace: callable run after every source call to keep the sample rate
+        stop_when_idle: stop the producer when the last subscriber leaves
+    """
+
+    def __init__(self, source, pace=None, stop_when_idle=True):
+        self.source = source
+        self.pace = pace
+        self.stop_when_idle = stop_when_idle
+
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+        self.published = 0
+
+    def subscribe(self, callback=None, maxsize=64, policy=LATEST_ONLY):
+        """Register a subscriber and start the producer if needed"""
+        subscription = Subscription(self, maxsize, policy, callback)
+        with self.lock:
+            self.subscribers.append(subscription)
+        self.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            if subscription in self.subscribers:
+                self.subscribers.remove(subscription)
+            idle = not self.subscribers
+        if not subscription.closed:
+            subscription.close()
+        if idle and self.stop_when_idle:
+            self.stop(wait=False)
+
+    def publish(self, sample):
+        """Hand one sample to every subscriber"""
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            subscription.put(sample)
+        self.published += 1
+
+    def start(self):
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+            self.thread = threading.Thread(target=self._run, name="gaze-producer", daemon=True)
+            self.thread.start()
+
+    def stop(self, wait=True, close_subscriptions=False):
+        with self.lock:
+            self.running = False
+            thread = self.thread
+            subscribers = list(self.subscribers) if close_subscriptions else []
+        for subscription in subscribers:
+            subscription.close()
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2.0)
+
+    def _run(self):
+        # a restarted hub gets a new thread, an old one still finishing its sample exits
+        while self.running and self.thread is threading.current_thread():
+            try:
+                sample = self.source()
+                if sample is not None:
+                    self.publish(sample)
+            except Exception as e:
+                print(f"⚠️  Gaze producer error: {e}")
+                time.sleep(0.1)
+            if self.pace is not None:
+                self.pace()
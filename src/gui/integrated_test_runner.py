@@ -8,24 +8,73 @@ and the existing browser/timer functionality.
 import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
-import sys
 import os
+from datetime import datetime
 
-# Add src to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
-from timer import BrowserTimer
-from browser import BrowserManager
+from ..timer import BrowserTimer
+from ..browser import BrowserManager
+from ..recording import SessionRecorder
 
 
 class IntegratedTestManager:
     """Integration class that bridges new UI with existing browser functionality."""
     
-    def __init__(self, test_data):
-        """Initialize with test configuration data."""
+    def __init__(self, test_data, eye_tracker=None, recording_path=None):
+        """
+        Initialize with test configuration data.
+        
+        Args:
+            test_data: Loaded test profile
+            eye_tracker: EyeTracker whose gaze is overlaid and recorded, if any
+            recording_path: Gaze session log to write, defaults to a
+                timestamped .gazelog next to the profile
+        """
         self.test_data = test_data
         self.timer_manager = BrowserTimer()
         self.browser_manager = BrowserManager()
+        self.eye_tracker = eye_tracker
+        self.recording_path = recording_path or self._default_recording_path()
+        self.recorder = None
+    
+    def _default_recording_path(self):
+        """<destination>/<filename>_<timestamp>.gazelog, or None without a destination."""
+        destination = self.test_data.get('destination')
+        if not destination or not os.path.isdir(destination):
+            return None
+        name = os.path.splitext(self.test_data.get('filename') or 'session')[0]
+        return os.path.join(destination, f"{name}_{datetime.now():%Y%m%d_%H%M%S}.gazelog")
+    
+    def start_recording(self):
+        """Start logging every gaze sample of the eye tracker to the session log."""
+        if self.eye_tracker is None or self.recording_path is None or self.recorder is not None:
+            return
+        try:
+            screen = None
+            if hasattr(self.eye_tracker, 'screen_width'):
+                screen = (self.eye_tracker.screen_width, self.eye_tracker.screen_height)
+            self.recorder = SessionRecorder(
+                self.recording_path,
+                profile=self.test_data,
+                screen=screen,
+                calibration_id=getattr(self.eye_tracker, 'calibration_id', None),
+            )
+            self.recorder.attach(self.eye_tracker, attribute=self.browser_manager.attribute)
+            # the time-limit report shows the attention measured in this session
+            recorder = self.recorder
+            self.timer_manager.report_manager.use_session(
+                self.recording_path, self.test_data, flush=lambda: recorder.flush(timeout=2.0))
+            print(f"💾 Recording gaze to: {self.recording_path}")
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Gaze recording unavailable: {e}")
+            self.recorder = None
+    
+    def stop_recording(self):
+        """Finish the session log; returns the number of samples recorded."""
+        if self.recorder is None:
+            return 0
+        self.recorder.close()
+        print(f"💾 Saved {self.recorder.written} gaze samples to: {self.recording_path}")
+        return self.recorder.written
         
     def start_test_with_browser(self, completion_callback=None):
         """Start the test using existing browser and timer functionality."""
@@ -49,6 +98,10 @@ class IntegratedTestManager:
             
             def start_timer_when_ready():
                 """Callback executed when browser is ready."""
+                if self.eye_tracker is not None:
+                    self.browser_manager.integrate_eye_tracker(
+                        self.eye_tracker, targets=self.test_data.get('ranks'))
+                    self.start_recording()
                 if duration > 0:
                     print(f"🕐 Starting {duration} minute timer...")
                     self.timer_manager.start_timer(duration, completion_callback)
@@ -69,8 +122,9 @@ class IntegratedTestManager:
                     else:
                         print(f"❌ Test failed: {result}")
                     
-                    # Stop timer when browser closes
+                    # Stop timer and recording when browser closes
                     self.timer_manager.stop_timer()
+                    self.stop_recording()
                     
                     # Call completion callback if provided
                     if completion_callback:
@@ -78,6 +132,7 @@ class IntegratedTestManager:
                         
                 except Exception as e:
                     print(f"Browser thread error: {e}")
+                    self.stop_recording()
                     if completion_callback:
                         completion_callback()
             
@@ -95,8 +150,8 @@ class IntegratedTestManager:
 class ModifiedMainWindow:
     """Modified version of the original main window that can be called from the new UI."""
     
-    def __init__(self, test_data=None):
-        """Initialize with optional test data."""
+    def __init__(self, test_data=None, eye_tracker=None):
+        """Initialize with optional test data and the calibrated EyeTracker to record with."""
         self.root = tk.Tk()
         self.root.title("Eye Tracking Test Runner")
         self.root.geometry("600x400")
@@ -107,6 +162,7 @@ class ModifiedMainWindow:
         
         # Store test data if provided
         self.test_data = test_data or {}
+        self.eye_tracker = eye_tracker
         
         self.setup_ui()
     
@@ -212,7 +268,7 @@ Description: {self.test_data.get('description', 'N/A')[:100]}..."""
             return
         
         # Create integrated test manager and start test
-        test_manager = IntegratedTestManager(self.test_data)
+        test_manager = IntegratedTestManager(self.test_data, eye_tracker=self.eye_tracker)
         
         def on_test_complete():
             """Called when test completes."""
@@ -309,9 +365,9 @@ Description: {self.test_data.get('description', 'N/A')[:100]}..."""
 
 
 # Example of how to integrate with the new UI system
-def launch_integrated_test(test_data):
+def launch_integrated_test(test_data, eye_tracker=None):
     """Launch the integrated test runner with specific test data."""
-    app = ModifiedMainWindow(test_data)
+    app = ModifiedMainWindow(test_data, eye_tracker=eye_tracker)
     app.run()
 
 
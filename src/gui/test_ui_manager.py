@@ -13,6 +13,7 @@ This module contains all UI screens for the test management system:
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
+import sys
 import platform
 
 
@@ -29,6 +30,9 @@ class TestUIManager:
         # Current test data (will be populated from forms)
         self.current_test_data = {}
         
+        # Created and calibrated when the first test starts, shared by later tests
+        self.eye_tracker = None
+        
         # Setup trackpad gesture support
         self.setup_trackpad_gestures()
         
@@ -1431,14 +1435,42 @@ Component Configuration:"""
         back_btn = ttk.Button(button_frame, text="Back", command=self.show_load_test_screen)
         back_btn.pack(side='right')
     
+    def get_eye_tracker(self):
+        """Return a calibrated EyeTracker, creating and calibrating it on first use (None if unavailable)."""
+        if self.eye_tracker is not None and self.eye_tracker.is_calibrated:
+            return self.eye_tracker
+        
+        try:
+            if self.eye_tracker is None:
+                sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'eye_tracking'))
+                from EyeTracker import EyeTracker
+                self.eye_tracker = EyeTracker()
+            
+            messagebox.showinfo("Calibration", "The eye tracker needs calibrating before the test.\n"
+                                "Look at each blue circle until it moves on.")
+            if self.eye_tracker.recalibrate():
+                return self.eye_tracker
+        except (Exception, SystemExit) as e:
+            # EyeTracker exits when eyeGestures cannot be imported
+            print(f"⚠️ Eye tracker unavailable: {e}")
+        return None
+    
     def start_actual_test(self):
         """Start the actual test with integration to existing browser system."""
         try:
             # Import the integrated test runner
             from .integrated_test_runner import IntegratedTestManager
             
+            eye_tracker = self.get_eye_tracker()
+            if eye_tracker is None and not messagebox.askyesno(
+                    "Eye Tracker Unavailable",
+                    "The eye tracker could not be calibrated, no gaze will be recorded.\n"
+                    "Start the test anyway?"):
+                return
+            
             # Create and start the integrated test
-            test_manager = IntegratedTestManager(self.current_test_data)
+            test_manager = IntegratedTestManager(self.current_test_data, eye_tracker=eye_tracker)
+            self.test_manager = test_manager
             
             def on_test_complete():
                 """Called when the test completes."""
@@ -1483,11 +1515,16 @@ Component Configuration:"""
         ).pack(pady=10)
         
         # Test summary
+        test_manager = getattr(self, 'test_manager', None)
+        if test_manager is not None and test_manager.recorder is not None:
+            recording_text = f"Eye tracking data has been saved and is ready for analysis:\n{test_manager.recording_path}"
+        else:
+            recording_text = "No eye tracking data was recorded for this session."
         summary_text = f"""Test: {self.current_test_data.get('usershown', 'N/A')}
 Duration: {self.current_test_data.get('duration', 'N/A')}
 Website: {self.current_test_data.get('url', 'N/A')}
 
-Eye tracking data has been saved and is ready for analysis."""
+{recording_text}"""
         
         ttk.Label(completion_frame, text=summary_text, justify='center').pack()
         
@@ -1553,6 +1590,9 @@ Eye tracking data has been saved and is ready for analysis."""
             pass  # Use default if clam not available
         
         self.root.mainloop()
+        
+        if self.eye_tracker is not None:
+            self.eye_tracker.cleanup()
 
 
 # Main execution
@@ -0,0 +1,29 @@
+"""
+Language model module.
+
+This module provides pluggable model clients (Gemini or an offline stub)
+a concurrent, rate-limited pipeline for the optimisation and summary
+prompts, a persistent response cache shared by both and a map-reduce
+summariser for runs too large for one prompt.
+"""
+
+from .client import ModelClient, GeminiClient, StubClient, make_client, EXPLANATION_SEPARATOR
+from .pipeline import LLMPipeline, TokenBucket
+from .cache import ResponseCache, CachedClient, cached_client, cache_key
+from .summarize import MapReduceSummarizer, chunk_texts
+
+__all__ = [
+    'ModelClient',
+    'GeminiClient',
+    'StubClient',
+    'make_client',
+    'EXPLANATION_SEPARATOR',
+    'LLMPipeline',
+    'TokenBucket',
+    'ResponseCache',
+    'CachedClient',
+    'cached_client',
+    'cache_key',
+    'MapReduceSummarizer',
+    'chunk_texts',
+]
@@ -0,0 +1,197 @@
+"""
+Persistent cache of model responses.
+
+Responses are stored under the SHA-256 of everything that determines them
+(client, model, system prompt, temperature and the prompt, which carries
+the HTML component and its attention scores), so re-running gemSuggest or
+endSummary on the same data answers from disk. The store is a SQLite file
+evicted least recently used first beyond max_bytes; entries older than ttl
+seconds are treated as missing.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .client import ModelClient
+
+DEFAULT_CACHE_PATH = "llm_cache.db"
+CACHE_MODES = ("on", "off", "refresh")   # refresh: skip lookups, still store answers
+
+
+def cache_key(client, model, system, prompt, temperature):
+    payload = json.dumps([client, model, system, prompt, temperature], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU store of model responses
+
+    Args:
+        path: SQLite file, ":memory:" for a throwaway cache
+        max_bytes: total response size kept, least recently used entries are evicted beyond it
+        ttl: seconds an entry stays valid, None for no expiry
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at);
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=64 * 1024 * 1024, ttl=30 * 24 * 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(self.SCHEMA)
+            self.size = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        """Cached response or None"""
+        now = time.time()
+        with self.lock, self.connection:
+            row = self.connection.execute(
+                "SELECT response, size, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[2] > self.ttl:
+                self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.size -= row[1]
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return row[0]
+
+    def put(self, key, response):
+        size = len(response.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self.lock, self.connection:
+            old = self.connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)", (key, response, size, now, now))
+            self.size += size - (old[0] if old else 0)
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # oldest accessed first until the cache fits again
+        freed = 0
+        victims = []
+        for key, size in self.connection.execute("SELECT key, size FROM responses ORDER BY accessed_at, rowid"):
+            if self.size - freed <= self.max_bytes:
+                break
+            victims.append((key,))
+            freed += size
+        self.connection.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self.size -= freed
+
+    def purge_expired(self):
+        """Delete expired entries, returns how many"""
+        if self.ttl is None:
+            return 0
+        with self.lock, self.connection:
+            cutoff = time.time() - self.ttl
+            freed, count = self.connection.execute(
+                "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM responses WHERE created_at < ?", (cutoff,)).fetchone()
+            self.connection.execute("DELETE FROM responses WHERE created_at < ?", (cutoff,))
+            self.size -= freed
+        return count
+
+    def clear(self):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM responses")
+            self.size = 0
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class CachedClient(ModelClient):
+    """
+    ModelClient answering repeated prompts from a ResponseCache
+
+    Args:
+        client: the ModelClient asked on a miss
+        cache: ResponseCache
+        read: look responses up (False to force fresh answers)
+        write: store fresh responses
+    """
+
+    def __init__(self, client, cache, read=True, write=True):
+        self.client = client
+        self.cache = cache
+        self.read = read
+        self.write = write
+        self.name = client.name
+        self.model = client.model
+
+    def key(self, prompt, system=None, temperature=0.3):
+        return cache_key(self.client.name, self.client.model, system, prompt, temperature)
+
+    def cached(self, prompt, system=None, temperature=0.3):
+        """Stored response without asking the model, None on a miss or when reads are off"""
+        if not self.read:
+            return None
+        return self.cache.get(self.key(prompt, system, temperature))
+
+    async def answer(self, prompt, system=None, temperature=0.3):
+        """Ask the model without a lookup and store its response"""
+        response = await self.client.generate(prompt, system=system, temperature=temperature)
+        if self.write:
+            await asyncio.to_thread(self.cache.put, self.key(prompt, system, temperature), response)
+        return response
+
+    async def generate(self, prompt, system=None, temperature=0.3):
+        # SQLite calls run off the event loop so a slow disk does not stall other prompts
+        response = await asyncio.to_thread(self.cached, prompt, system, temperature)
+        if response is not None:
+            return response
+        return await self.answer(prompt, system=system, temperature=temperature)
+
+    def close(self):
+        self.client.close()
+        self.cache.close()
+
+
+def cached_client(client, mode=None, path=None, **kwargs):
+    """
+    Wrap a client with the shared response cache
+
+    Args:
+        mode: "on", "off" (no cache) or "refresh" (ignore cached answers but
+            store new ones); LLM_CACHE or "on" by default
+        path: cache file, LLM_CACHE_PATH or llm_cache.db by default
+        kwargs: passed to ResponseCache
+    """
+    mode = mode or os.getenv("LLM_CACHE", "on")
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Unknown cache mode {mode!r}, choose from {', '.join(CACHE_MODES)}")
+    if mode == "off":
+        return client
+    cache = ResponseCache(path or os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH), **kwargs)
+    return CachedClient(client, cache, read=mode == "on")
@@ -0,0 +1,128 @@
+"""
+Pluggable language model clients.
+
+gemSuggest and endSummary talk to a ModelClient instead of the Gemini SDK
+directly, so the optimisation pipeline can run against the real model or,
+for tests and benchmarks, against an offline deterministic stub.
+"""
+
+import asyncio
+import hashlib
+import os
+
+try:
+    import google.generativeai as genai
+except ImportError:
+    genai = None
+
+DEFAULT_MODEL = "gemini-2.0-flash"
+EXPLANATION_SEPARATOR = "===EXPLANATION==="
+
+
+class ModelClient:
+    """
+    Interface of model backends.
+
+    `generate` is a coroutine returning the model's text for one prompt;
+    it raises on failure and the pipeline decides whether to retry.
+    """
+
+    name = "base"
+    model = None
+
+    async def generate(self, prompt, system=None, temperature=0.3):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class GeminiClient(ModelClient):
+    """
+    Google Gemini through google-generativeai
+
+    Args:
+        model: Gemini model name
+        api_key: API key, read from api_key_env when omitted
+    """
+
+    name = "gemini"
+
+    def __init__(self, model=DEFAULT_MODEL, api_key=None, api_key_env="GEMINI_API_KEY"):
+        if genai is None:
+            raise ImportError("The google-generativeai package is required for the Gemini client")
+        genai.configure(api_key=api_key or os.getenv(api_key_env))
+        self.model = model
+        self._model = genai.GenerativeModel(model)
+
+    async def generate(self, prompt, system=None, temperature=0.3):
+        contents = [system, prompt] if system else [prompt]
+        response = await self._model.generate_content_async(
+            contents, generation_config={"temperature": temperature})
+        return response.text.strip()
+
+
+class StubClient(ModelClient):
+    """
+    Offline deterministic model for tests and benchmarks
+
+    Answers depend only on the prompt: an optimisation prompt (one with an
+    "HTML Component:" section) gets its HTML back unchanged plus an
+    explanation, anything else a short summary line.
+
+    Args:
+        latency: seconds every call takes
+        jitter: relative spread of the latency, derived from the prompt hash
+        failures: number of calls that raise ConnectionError before the stub recovers
+        api_key: ignored, accepted so callers can swap clients freely
+    """
+
+    name = "stub"
+
+    def __init__(self, latency=0.05, jitter=0.0, failures=0, model="stub", api_key=None):
+        self.model = model
+        self.latency = latency
+        self.jitter = jitter
+        self.failures = failures
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0   # highest number of overlapping calls seen
+
+    async def generate(self, prompt, system=None, temperature=0.3):
+        digest = hashlib.sha256(f"{system}\0{prompt}\0{temperature}".encode('utf-8')).hexdigest()
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            spread = int(digest[:8], 16) / 0xffffffff * 2 - 1
+            await asyncio.sleep(self.latency * (1 + self.jitter * spread))
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("stub model unavailable")
+        finally:
+            self.active -= 1
+
+        if "HTML Component:" in prompt:
+            html = prompt.split("HTML Component:", 1)[1].strip()
+            return f"{html}\n{EXPLANATION_SEPARATOR}\nStub review {digest[:12]}: no changes needed."
+        return f"Stub summary {digest[:12]} of {len(prompt)} characters."
+
+
+CLIENTS = {
+    GeminiClient.name: GeminiClient,
+    StubClient.name: StubClient,
+}
+
+
+def make_client(backend=None, **kwargs):
+    """
+    Create a model client
+
+    Args:
+        backend: "gemini" or "stub", LLM_BACKEND or "gemini" by default
+        kwargs: passed to the client
+    """
+    backend = backend or os.getenv("LLM_BACKEND", GeminiClient.name)
+    if backend not in CLIENTS:
+        raise ValueError(f"Unknown model backend {backend!r}, choose from {', '.join(CLIENTS)}")
+    return CLIENTS[backend](**kwargs)
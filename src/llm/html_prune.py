@@ -0,0 +1,229 @@
+"""
+Shrinks HTML components before they are sent to the model.
+
+Components captured from real pages carry a lot the model cannot use to
+judge visual attention: inline scripts, SVG path data, tracking and event
+attributes, long data URIs. prune_html replaces them with short
+placeholders and keeps the originals in a mapping, and expand_html puts
+them back into the HTML the model returns:
+
+    {{gz:N}}        an attribute value, the inside of an <svg>, the tail of
+                    a long text or a removed <script>/<noscript>/<template>
+    data-gz="N"     the tracking and event attributes of one element
+
+Whitespace between tags is collapsed and comments are dropped; neither is
+restored. Token counts are estimated at 4 characters per token.
+"""
+
+import html
+import re
+from html.parser import HTMLParser
+
+REMOVED_TAGS = {'script', 'noscript', 'template'}
+COLLAPSED_TAGS = {'svg'}               # tag and attributes kept, children replaced
+VERBATIM_TAGS = {'pre', 'textarea'}    # whitespace is significant
+
+TRACKING_ATTRIBUTES = {'jsaction', 'jsname', 'jscontroller', 'jsmodel', 'jslog', 'ping', 'nonce',
+                       'integrity', 'referrerpolicy', 'crossorigin'}
+TRACKING_PREFIXES = ('data-', 'on')
+
+# (longest attribute value, longest text) kept at each pruning level
+LEVELS = ((64, None), (32, 400), (16, 160), (8, 64))
+
+PLACEHOLDER = re.compile(r'\{\{gz:(\d+)\}\}')
+ATTRIBUTE_NAMES = re.compile(r'\s([^\s=/>"\']+)(?:\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s>]+))?')
+ATTRIBUTE_PLACEHOLDER = re.compile(r'\s+data-gz="(\d+)"')
+
+
+def estimate_tokens(text):
+    """Rough token count of text for budgeting, about 4 characters per token"""
+    return (len(text) + 3) // 4
+
+
+def _is_tracking(name):
+    name = name.lower()
+    return name in TRACKING_ATTRIBUTES or (name.startswith(TRACKING_PREFIXES) and name != 'data-gz')
+
+
+def _attribute(name, value):
+    return f' {name}' if value is None else f' {name}="{html.escape(value, quote=True)}"'
+
+
+class _Pruner(HTMLParser):
+
+    def __init__(self, max_attribute, max_text):
+        super().__init__(convert_charrefs=False)
+        self.max_attribute = max_attribute
+        self.max_text = max_text
+        self.mapping = {}
+        self.out = []
+        self.capture = None     # (tag, depth, collapsed, buffer) while inside a removed/collapsed element
+        self.verbatim = 0
+
+    def _stash(self, original):
+        key = str(len(self.mapping))
+        self.mapping[key] = original
+        return key
+
+    def _emit(self, text):
+        if self.capture is not None:
+            self.capture[3].append(text)
+        else:
+            self.out.append(text)
+
+    def _start(self, tag, attrs, closed):
+        if self.capture is not None:
+            if tag == self.capture[0] and not closed:
+                self.capture[1] += 1
+            self._emit(self.get_starttag_text())
+            return
+
+        if tag in REMOVED_TAGS and not closed:
+            self.capture = [tag, 1, False, [self.get_starttag_text()]]
+            return
+
+        # the parser lowercases names, SVG needs e.g. viewBox as written
+        names = ATTRIBUTE_NAMES.findall(self.get_starttag_text()[len(tag) + 1:])
+        if len(names) == len(attrs) and all(n.lower() == name for n, (name, _) in zip(names, attrs)):
+            attrs = [(n, value) for n, (_, value) in zip(names, attrs)]
+
+        kept = []
+        tracking = []
+        for name, value in attrs:
+            if _is_tracking(name):
+                tracking.append(_attribute(name, value))
+            elif value is not None and len(value) > self.max_attribute:
+                kept.append(f' {name}="{{{{gz:{self._stash(html.escape(value, quote=True))}}}}}"')
+            else:
+                kept.append(_attribute(name, value))
+        if tracking:
+            kept.append(f' data-gz="{self._stash("".join(tracking))}"')
+        self._emit(f'<{tag}{"".join(kept)}{" /" if closed else ""}>')
+
+        if tag in COLLAPSED_TAGS and not closed:
+            self.capture = [tag, 1, True, []]
+        elif tag in VERBATIM_TAGS and not closed:
+            self.verbatim += 1
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs, False)
+
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag, attrs, True)
+
+    def handle_endtag(self, tag):
+        if self.capture is not None:
+            name, depth, collapsed, buffer = self.capture
+            if tag == name:
+                depth -= 1
+                self.capture[1] = depth
+            if tag != name or depth:
+                self._emit(f'</{tag}>')
+                return
+            self.capture = None
+            if collapsed:
+                inner = ''.join(buffer)
+                self.out.append(f'{{{{gz:{self._stash(inner)}}}}}' if inner.strip() else '')
+                self.out.append(f'</{tag}>')
+            else:
+                self.out.append(f'{{{{gz:{self._stash("".join(buffer) + f"</{tag}>")}}}}}')
+            return
+        if tag in VERBATIM_TAGS and self.verbatim:
+            self.verbatim -= 1
+        self.out.append(f'</{tag}>')
+
+    def handle_data(self, data):
+        if self.capture is not None or self.verbatim:
+            self._emit(data)
+            return
+        if not data.strip():
+            # indentation between tags goes, a space between inline elements stays
+            if '\n' not in data:
+                self.out.append(' ')
+            return
+        text = re.sub(r'\s+', ' ', data)
+        if self.max_text is not None and len(text) > self.max_text:
+            cut = text.rfind(' ', 0, self.max_text)
+            cut = cut if cut > self.max_text // 2 else self.max_text
+            text = f'{text[:cut]}{{{{gz:{self._stash(text[cut:])}}}}}'
+        self.out.append(text)
+
+    def handle_entityref(self, name):
+        self._emit(f'&{name};')
+
+    def handle_charref(self, name):
+        self._emit(f'&#{name};')
+
+    def handle_comment(self, data):
+        if self.capture is not None:
+            self._emit(f'<!--{data}-->')
+
+    def handle_decl(self, decl):
+        self._emit(f'<!{decl}>')
+
+    def unknown_decl(self, data):
+        self._emit(f'<![{data}]>')
+
+    def handle_pi(self, data):
+        self._emit(f'<?{data}>')
+
+    def result(self):
+        self.close()
+        if self.capture is not None:
+            # unterminated element: keep whatever was captured
+            self.out.append(''.join(self.capture[3]))
+            self.capture = None
+        return ''.join(self.out).strip(), self.mapping
+
+
+def prune_html(component, token_budget=None):
+    """
+    Shrink an HTML component for the model
+
+    Args:
+        component: HTML source
+        token_budget: estimated tokens to aim for; attribute values and then
+            long texts are cut harder until the component fits or the
+            strictest level is reached
+
+    Returns:
+        (pruned html, mapping) with mapping {placeholder id: original text}
+    """
+    for max_attribute, max_text in LEVELS:
+        parser = _Pruner(max_attribute, max_text)
+        parser.feed(component)
+        pruned, mapping = parser.result()
+        if token_budget is None or estimate_tokens(pruned) <= token_budget:
+            break
+    return pruned, mapping
+
+
+def expand_html(pruned, mapping, restore_removed=True):
+    """
+    Put the originals of prune_html back into (possibly modified) HTML
+
+    Args:
+        restore_removed: append removed <script>/<noscript>/<template>
+            blocks the model dropped, so page behaviour is not lost
+
+    Returns:
+        html with every placeholder still present replaced by its original
+    """
+    used = set()
+
+    def attributes(match):
+        used.add(match.group(1))
+        return mapping.get(match.group(1), '')
+
+    def value(match):
+        used.add(match.group(1))
+        return mapping.get(match.group(1), match.group(0))
+
+    expanded = PLACEHOLDER.sub(value, ATTRIBUTE_PLACEHOLDER.sub(attributes, pruned))
+
+    if restore_removed:
+        dropped = [mapping[key] for key in mapping
+                   if key not in used and re.match(r'<(script|noscript|template)\b', mapping[key], re.I)]
+        if dropped:
+            expanded += '\n' + '\n'.join(dropped)
+    return expanded
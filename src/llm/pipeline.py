@@ -0,0 +1,137 @@
+"""
+Concurrent, rate-limited model calls.
+
+LLMPipeline runs many prompts against a ModelClient at once: a semaphore
+bounds the calls in flight, an optional token bucket bounds the request
+rate, each attempt has a timeout, failed attempts are retried with
+exponential backoff and full jitter, and results come back in the order of
+the prompts regardless of completion order. Clients with a response cache
+(CachedClient) are looked up first, so cached prompts take neither a slot
+nor a rate token.
+"""
+
+import asyncio
+import random
+import time
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average, bursts of up to `capacity`
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return
+            await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+
+def _request(request):
+    if isinstance(request, str):
+        return {'prompt': request}
+    if 'prompt' not in request:
+        raise ValueError("Pipeline requests need a 'prompt'")
+    return request
+
+
+class LLMPipeline:
+    """
+    Runs prompts concurrently against a model client
+
+    Args:
+        client: ModelClient
+        concurrency: calls in flight at most
+        rate: requests per second at most, None for no limit
+        burst: requests allowed at once before the rate applies, default max(1, rate)
+        timeout: seconds per attempt
+        retries: extra attempts after a failure or timeout
+        backoff: delay before the first retry, doubled per retry and
+            randomised between 0 and that value
+        max_backoff: cap of the retry delay
+        temperature: default sampling temperature
+    """
+
+    def __init__(self, client, concurrency=4, rate=None, burst=None, timeout=60.0, retries=3,
+                 backoff=1.0, max_backoff=20.0, temperature=0.3):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.client = client
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.temperature = temperature
+
+    async def run(self, requests):
+        """
+        Args:
+            requests: prompts, or dicts with 'prompt' and optional 'system'
+                and 'temperature'
+
+        Returns:
+            one dict per request, in request order: 'text' (None on failure),
+            'error' (the last exception or None), 'attempts' (0 when answered
+            from the cache), 'latency' (seconds from first attempt to result)
+        """
+        requests = [_request(request) for request in requests]
+        semaphore = asyncio.Semaphore(self.concurrency)
+        bucket = TokenBucket(self.rate, self.burst) if self.rate else None
+        results = [None] * len(requests)
+        cached = getattr(self.client, 'cached', None)
+        generate = getattr(self.client, 'answer', self.client.generate)
+
+        async def call(index, request):
+            start = time.monotonic()
+            prompt, system = request['prompt'], request.get('system')
+            temperature = request.get('temperature', self.temperature)
+            if cached is not None:
+                text = await asyncio.to_thread(cached, prompt, system, temperature)
+                if text is not None:
+                    results[index] = {'text': text, 'error': None, 'attempts': 0,
+                                      'latency': time.monotonic() - start}
+                    return
+            error = None
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+                    await asyncio.sleep(random.uniform(0, delay))
+                # the slot is held per attempt, so backoff waits do not block other prompts
+                async with semaphore:
+                    if bucket is not None:
+                        await bucket.acquire()
+                    try:
+                        text = await asyncio.wait_for(
+                            generate(prompt, system=system, temperature=temperature), self.timeout)
+                        results[index] = {'text': text, 'error': None, 'attempts': attempt + 1,
+                                          'latency': time.monotonic() - start}
+                        return
+                    except asyncio.TimeoutError:
+                        error = TimeoutError(f"Model call timed out after {self.timeout}s")
+                    except Exception as e:
+                        error = e
+                print(f"⚠️ Model call {index + 1} failed (attempt {attempt + 1}/{self.retries + 1}): {error}")
+            results[index] = {'text': None, 'error': error, 'attempts': self.retries + 1,
+                              'latency': time.monotonic() - start}
+
+        await asyncio.gather(*(call(index, request) for index, request in enumerate(requests)))
+        return results
+
+    def run_sync(self, requests):
+        """run() for callers without an event loop"""
+        return asyncio.run(self.run(requests))
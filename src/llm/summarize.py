@@ -0,0 +1,116 @@
+"""
+Map-reduce summarisation of many texts.
+
+Summarising every explanation of a large run in one prompt overflows the
+model's context and makes one long call. MapReduceSummarizer instead packs
+the texts into chunks under a token budget, condenses the chunks
+concurrently (map), merges the condensed notes level by level (reduce)
+and writes the final summary from what is left, so the number of
+sequential calls grows with log(texts).
+
+Chunk boundaries depend on the texts themselves, not only on their
+position: a chunk also ends after any text whose hash hits 1 in
+`average_chunk` (content-defined chunking). Changing one explanation then
+changes one chunk, and with a CachedClient every other partial summary is
+answered from the cache on a rerun.
+"""
+
+import asyncio
+import hashlib
+
+from .html_prune import estimate_tokens
+
+
+def _boundary(text, average):
+    return int(hashlib.sha1(text.encode('utf-8')).hexdigest()[:8], 16) % average == 0
+
+
+def chunk_texts(texts, token_budget, average=8, separator="\n\n"):
+    """
+    Pack texts into chunks of at most token_budget estimated tokens
+
+    A text larger than the budget becomes a chunk of its own.
+
+    Args:
+        average: a chunk also ends after a text whose hash is 0 mod average,
+            so edits only move nearby boundaries; 1 puts every text on its own
+    """
+    chunks = []
+    current = []
+    size = 0
+    for text in texts:
+        tokens = estimate_tokens(text + separator)
+        if current and size + tokens > token_budget:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += tokens
+        if _boundary(text, average):
+            chunks.append(current)
+            current, size = [], 0
+    if current:
+        chunks.append(current)
+    return [separator.join(chunk) for chunk in chunks]
+
+
+class MapReduceSummarizer:
+    """
+    Hierarchical summariser on top of an LLMPipeline
+
+    Args:
+        pipeline: LLMPipeline the map and reduce calls run through, its
+            concurrency bounds the parallel calls
+        final_prompt: template with a {texts} field producing the summary
+        map_prompt: template with a {texts} field condensing one chunk
+        reduce_prompt: template with a {texts} field merging condensed notes,
+            map_prompt when omitted
+        chunk_tokens: estimated tokens of texts per prompt
+        average_chunk: texts per chunk the content-defined boundaries aim for
+        system: optional system prompt of every call
+    """
+
+    def __init__(self, pipeline, final_prompt, map_prompt, reduce_prompt=None, chunk_tokens=8000,
+                 average_chunk=8, system=None):
+        self.pipeline = pipeline
+        self.final_prompt = final_prompt
+        self.map_prompt = map_prompt
+        self.reduce_prompt = reduce_prompt or map_prompt
+        self.chunk_tokens = chunk_tokens
+        self.average_chunk = average_chunk
+        self.system = system
+        self.levels = 0     # map/reduce levels of the last summary
+        self.calls = 0      # model calls of the last summary
+
+    async def _run(self, template, texts):
+        results = await self.pipeline.run([{'prompt': template.format(texts=text), 'system': self.system}
+                                           for text in texts])
+        self.calls += len(results)
+        failed = [r['error'] for r in results if r['error'] is not None]
+        if failed:
+            # a missing partial would silently drop components from the summary
+            raise RuntimeError(f"{len(failed)} of {len(results)} summary calls failed: {failed[0]}")
+        return [r['text'].strip() for r in results]
+
+    async def summarize(self, texts):
+        """Summary of texts (e.g. explanations in component order)"""
+        self.levels = self.calls = 0
+        texts = [text for text in texts if text and text.strip()]
+        if not texts:
+            raise ValueError("Nothing to summarise")
+
+        chunks = chunk_texts(texts, self.chunk_tokens, self.average_chunk)
+        template = self.map_prompt
+        while len(chunks) > 1:
+            self.levels += 1
+            partials = await self._run(template, chunks)
+            template = self.reduce_prompt
+            merged = chunk_texts(partials, self.chunk_tokens, self.average_chunk)
+            if len(merged) >= len(chunks):
+                # notes did not shrink enough to pack more per prompt: force pairs together
+                merged = ["\n\n".join(partials[i:i + 2]) for i in range(0, len(partials), 2)]
+            chunks = merged
+        return (await self._run(self.final_prompt, chunks))[0]
+
+    def summarize_sync(self, texts):
+        """summarize() for callers without an event loop"""
+        return asyncio.run(self.summarize(texts))
@@ -0,0 +1,36 @@
+"""
+Gaze recording module.
+
+This module persists the gaze samples of test sessions to disk, as
+per-session logs and as compressed archives of many sessions.
+"""
+
+from .session_log import (
+    SessionRecorder,
+    read_session,
+    recover,
+    RECORD_DTYPE,
+    NO_ELEMENT,
+    FLAG_BLINK,
+    FLAG_SACCADES,
+    FLAG_ESTIMATED,
+)
+from .archive import (
+    ArchiveWriter,
+    GazeArchive,
+    archive_sessions,
+)
+
+__all__ = [
+    'SessionRecorder',
+    'read_session',
+    'recover',
+    'RECORD_DTYPE',
+    'NO_ELEMENT',
+    'FLAG_BLINK',
+    'FLAG_SACCADES',
+    'FLAG_ESTIMATED',
+    'ArchiveWriter',
+    'GazeArchive',
+    'archive_sessions',
+]
@@ -0,0 +1,342 @@
+"""
+Chunked, compressed columnar archive for long-term gaze storage.
+
+File layout:
+    magic    ARCHIVE_MAGIC
+    chunks   per chunk, one compressed blob per column
+    footer   JSON (metadata, columns and their codecs, sessions), then the
+             chunk index (CHUNK_DTYPE rows) and the blob index (BLOB_DTYPE,
+             one row per chunk and column)
+    trailer  TRAILER_STRUCT: footer offset, JSON length, chunk count, magic
+
+Chunks cover fixed durations of gaze time. The chunk index is sorted by time,
+so a reader finds the chunks of any time window with a binary search over a
+memory-mapped array and decompresses only the columns it was asked for.
+
+Column codecs:
+    "shuffle"  byte shuffle (all first bytes, then all second bytes...) + zlib
+    "delta"    difference of consecutive values' integer bit patterns, then
+               shuffle + zlib; lossless, and small for sorted timestamps
+"""
+
+import json
+import mmap
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from .session_log import RECORD_DTYPE, read_session
+
+ARCHIVE_MAGIC = b'GAZEARC1'
+# footer offset, footer JSON length, chunk count, magic
+TRAILER_STRUCT = struct.Struct('<QII8s')
+
+CHUNK_DTYPE = np.dtype([
+    ('t_start', '<f8'),   # first timestamp in the chunk
+    ('t_end', '<f8'),     # last timestamp in the chunk
+    ('rows', '<u8'),
+])
+BLOB_DTYPE = np.dtype([
+    ('offset', '<u8'),
+    ('length', '<u8'),
+])
+
+CODECS = ("shuffle", "delta")
+DEFAULT_CODECS = {'timestamp': "delta", 'element': "delta"}
+
+_INT_VIEWS = {1: np.uint8, 2: np.int16, 4: np.int32, 8: np.int64}
+
+
+def _shuffle(values):
+    raw = np.ascontiguousarray(values).view(np.uint8).reshape(len(values), values.dtype.itemsize)
+    return np.ascontiguousarray(raw.T).tobytes()
+
+
+def _unshuffle(data, dtype, rows):
+    raw = np.frombuffer(data, dtype=np.uint8).reshape(dtype.itemsize, rows)
+    return np.ascontiguousarray(raw.T).view(dtype).reshape(rows)
+
+
+def encode_column(values, codec="shuffle", level=6):
+    """Compress one column of a chunk"""
+    values = np.ascontiguousarray(values)
+    if codec == "delta":
+        ints = values.view(_INT_VIEWS[values.dtype.itemsize])
+        values = np.diff(ints, prepend=ints.dtype.type(0))   # wraps on overflow, undone by cumsum
+    elif codec != "shuffle":
+        raise ValueError(f"Unknown column codec {codec!r}")
+    return zlib.compress(_shuffle(values), level)
+
+
+def decode_column(data, dtype, rows, codec="shuffle"):
+    """Inverse of encode_column"""
+    dtype = np.dtype(dtype)
+    if codec == "delta":
+        ints = _unshuffle(zlib.decompress(data), np.dtype(_INT_VIEWS[dtype.itemsize]), rows)
+        return np.cumsum(ints, dtype=ints.dtype).view(dtype)
+    return _unshuffle(zlib.decompress(data), dtype, rows)
+
+
+class ArchiveWriter:
+    """
+    Writes gaze records into a chunked columnar archive
+
+    Records must arrive in timestamp order, across calls and sessions.
+
+    Args:
+        path: archive file to create
+        dtype: structured dtype of the records, RECORD_DTYPE by default
+        chunk_seconds: gaze time covered by one chunk
+        codecs: {column: codec}, columns not listed use "shuffle"
+        metadata: JSON-serialisable description stored in the footer
+        level: zlib compression level
+    """
+
+    def __init__(self, path, dtype=RECORD_DTYPE, chunk_seconds=60.0, codecs=None, metadata=None, level=6):
+        if chunk_seconds <= 0:
+            raise ValueError("chunk_seconds must be positive")
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        if 'timestamp' not in self.dtype.names:
+            raise ValueError("Archived records need a timestamp column")
+        self.chunk_seconds = float(chunk_seconds)
+        self.codecs = {name: (codecs or DEFAULT_CODECS).get(name, "shuffle") for name in self.dtype.names}
+        for codec in self.codecs.values():
+            if codec not in CODECS:
+                raise ValueError(f"Unknown column codec {codec!r}")
+        self.metadata = metadata or {}
+        self.level = level
+        self.sessions = []
+
+        self.file = open(path, 'wb')
+        self.file.write(ARCHIVE_MAGIC)
+        self.chunks = []
+        self.blobs = []
+        self.pending = []         # record arrays of the open chunk
+        self.chunk_id = None      # fixed-duration slot of the open chunk
+        self.origin = None        # timestamp of the first record
+        self.last_time = -np.inf
+        self.closed = False
+
+    def write(self, records):
+        """Append a record array"""
+        records = np.asarray(records)
+        if records.dtype != self.dtype:
+            records = records.astype(self.dtype)
+        if not len(records):
+            return
+        timestamps = records['timestamp']
+        if timestamps[0] < self.last_time or np.any(np.diff(timestamps) < 0):
+            raise ValueError("Archive records must be appended in timestamp order")
+        self.last_time = timestamps[-1]
+        if self.origin is None:
+            self.origin = float(timestamps[0])
+
+        # split at chunk boundaries
+        slots = np.floor((timestamps - self.origin) / self.chunk_seconds).astype(np.int64)
+        cuts = np.flatnonzero(np.diff(slots)) + 1
+        for start, stop in zip(np.concatenate(([0], cuts)), np.concatenate((cuts, [len(records)]))):
+            if self.chunk_id is not None and slots[start] != self.chunk_id:
+                self._write_chunk()
+            self.chunk_id = slots[start]
+            self.pending.append(records[start:stop])
+
+    def add_session(self, log_path):
+        """Append a session log written by SessionRecorder, keeping its metadata"""
+        metadata, records = read_session(log_path)
+        if len(records):
+            self.sessions.append({
+                'source': os.path.basename(log_path),
+                't_start': float(records['timestamp'][0]),
+                't_end': float(records['timestamp'][-1]),
+                'rows': len(records),
+                'metadata': metadata,
+            })
+        self.write(records)
+        return len(records)
+
+    def _write_chunk(self):
+        if not self.pending:
+            return
+        records = np.concatenate(self.pending)
+        self.pending = []
+        for name in self.dtype.names:
+            blob = encode_column(records[name], self.codecs[name], self.level)
+            self.blobs.append((self.file.tell(), len(blob)))
+            self.file.write(blob)
+        self.chunks.append((records['timestamp'][0], records['timestamp'][-1], len(records)))
+
+    def close(self):
+        """Write the last chunk, the footer and the trailer"""
+        if self.closed:
+            return
+        self._write_chunk()
+        self.closed = True
+        footer = json.dumps({
+            'metadata': self.metadata,
+            'chunk_seconds': self.chunk_seconds,
+            'columns': [{'name': name, 'dtype': self.dtype[name].str, 'codec': self.codecs[name]}
+                        for name in self.dtype.names],
+            'sessions': self.sessions,
+        }).encode('utf-8')
+        offset = self.file.tell()
+        self.file.write(footer)
+        self.file.write(np.array(self.chunks, dtype=CHUNK_DTYPE).tobytes())
+        self.file.write(np.array(self.blobs, dtype=BLOB_DTYPE).tobytes())
+        self.file.write(TRAILER_STRUCT.pack(offset, len(footer), len(self.chunks), ARCHIVE_MAGIC))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GazeArchive:
+    """
+    Memory-mapped reader of an archive written by ArchiveWriter
+
+    Only the footer is parsed on open; chunk data is decompressed on demand.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.map = self.index = self.blobs = None
+        self.file = open(path, 'rb')
+        try:
+            self._open()
+        except BaseException:
+            self.close()
+            raise
+
+    def _open(self):
+        # mmap refuses empty files, so check the size before mapping
+        if os.fstat(self.file.fileno()).st_size < len(ARCHIVE_MAGIC) + TRAILER_STRUCT.size:
+            raise ValueError("Not a gaze archive")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+            raise ValueError("Not a gaze archive")
+        offset, length, n_chunks, magic = TRAILER_STRUCT.unpack_from(self.map, len(self.map) - TRAILER_STRUCT.size)
+        if magic != ARCHIVE_MAGIC:
+            raise ValueError("Gaze archive has no footer, it was not closed")
+
+        footer = json.loads(self.map[offset:offset + length].decode('utf-8'))
+        self.metadata = footer['metadata']
+        self.sessions = footer['sessions']
+        self.chunk_seconds = footer['chunk_seconds']
+        self.columns = [column['name'] for column in footer['columns']]
+        self.codecs = {column['name']: column['codec'] for column in footer['columns']}
+        self.dtype = np.dtype([(column['name'], column['dtype']) for column in footer['columns']])
+
+        position = offset + length
+        self.index = np.frombuffer(self.map, dtype=CHUNK_DTYPE, count=n_chunks, offset=position)
+        position += n_chunks * CHUNK_DTYPE.itemsize
+        self.blobs = np.frombuffer(self.map, dtype=BLOB_DTYPE, count=n_chunks * len(self.columns),
+                                   offset=position).reshape(n_chunks, len(self.columns))
+
+    def __len__(self):
+        return int(self.index['rows'].sum())
+
+    @property
+    def time_range(self):
+        """(first, last) timestamp, None when empty"""
+        if not len(self.index):
+            return None
+        return float(self.index['t_start'][0]), float(self.index['t_end'][-1])
+
+    def chunks_for(self, start=None, end=None):
+        """Range of chunk numbers overlapping [start, end], by binary search"""
+        first = 0 if start is None else int(np.searchsorted(self.index['t_end'], start, side='left'))
+        last = len(self.index) if end is None else int(np.searchsorted(self.index['t_start'], end, side='right'))
+        return range(first, max(first, last))
+
+    def _empty(self, columns, rows=0):
+        return np.empty(rows, dtype=[(name, self.dtype[name]) for name in columns])
+
+    def read_chunk(self, chunk, columns=None):
+        """Decode the given columns (all by default) of one chunk"""
+        columns = self._columns(columns)
+        rows = int(self.index['rows'][chunk])
+        out = self._empty(columns, rows)
+        for name in columns:
+            offset, length = self.blobs[chunk, self.columns.index(name)]
+            out[name] = decode_column(self.map[offset:offset + length], self.dtype[name], rows, self.codecs[name])
+        return out
+
+    def read(self, start=None, end=None, columns=None):
+        """
+        Records with start <= timestamp <= end
+
+        Args:
+            columns: names to decode, all by default; the timestamp column is
+                decoded anyway to trim the window but only returned if asked for
+        """
+        columns = self._columns(columns)
+        decode = columns if 'timestamp' in columns or (start is None and end is None) \
+            else ['timestamp'] + columns
+        parts = [self.read_chunk(chunk, decode) for chunk in self.chunks_for(start, end)]
+        if not parts:
+            return self._empty(columns)
+        records = np.concatenate(parts)
+        if start is not None or end is not None:
+            timestamps = records['timestamp']
+            keep = np.ones(len(records), bool)
+            if start is not None:
+                keep &= timestamps >= start
+            if end is not None:
+                keep &= timestamps <= end
+            records = records[keep]
+        if decode is not columns:
+            out = self._empty(columns, len(records))
+            for name in columns:
+                out[name] = records[name]
+            records = out
+        return records
+
+    def _columns(self, columns):
+        if columns is None:
+            return list(self.columns)
+        if isinstance(columns, str):
+            columns = [columns]
+        unknown = [name for name in columns if name not in self.columns]
+        if unknown:
+            raise KeyError(f"Unknown archive columns: {', '.join(unknown)}")
+        return list(columns)
+
+    def close(self):
+        # drop views into the map first, mmap refuses to close while exported
+        self.index = self.blobs = None
+        if getattr(self, 'map', None) is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def archive_sessions(log_paths, archive_path, chunk_seconds=60.0, metadata=None):
+    """
+    Pack session logs into one archive, in order of their first sample
+
+    Sessions must not overlap in time.
+
+    Returns:
+        number of records archived
+    """
+    firsts = []
+    for path in log_paths:
+        # the raw first record of a crashed, preallocated log can be zero fill
+        _, records = read_session(path)
+        firsts.append(records['timestamp'][0] if len(records) else np.inf)
+    total = 0
+    with ArchiveWriter(archive_path, chunk_seconds=chunk_seconds, metadata=metadata) as writer:
+        for _, path in sorted(zip(firsts, log_paths)):
+            total += writer.add_session(path)
+    return total
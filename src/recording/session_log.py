@@ -0,0 +1,347 @@
+"""
+Append-only binary gaze session log.
+
+File layout:
+    header   HEADER_SIZE bytes: magic, version, record size, record count and
+             clean-close flag, then JSON metadata (profile, screen geometry,
+             calibration model id, element table), zero padded
+    records  RECORD_DTYPE rows, appended in chunks to a preallocated region
+
+Samples are buffered in memory and handed to a writer thread as a chunk when
+the chunk is full or its oldest sample has waited flush_interval seconds, so
+the frame loop only fills a row of a NumPy array. Every record carries a
+checksum byte that is never zero, which lets recover() find where a crash
+tore the log (preallocated space is zero filled) and truncate there.
+"""
+
+import json
+import os
+import queue
+import struct
+import threading
+import time
+
+import numpy as np
+
+MAGIC = b'GAZELOG1'
+VERSION = 1
+HEADER_SIZE = 4096
+# magic, version, record size, record count, clean, metadata length
+HEADER_STRUCT = struct.Struct('<8sHHQ?I')
+
+FLAG_BLINK = 1
+FLAG_SACCADES = 2
+FLAG_ESTIMATED = 4
+NO_ELEMENT = -1
+
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('x', '<f4'),
+    ('y', '<f4'),
+    ('fixation', '<f4'),
+    ('flags', 'u1'),
+    ('element', '<i2'),    # index into the header's element table, -1 for none
+    ('check', 'u1'),       # 1 + byte sum of the other fields mod 255
+])
+
+FSYNC_ALWAYS = "always"   # after every chunk
+FSYNC_NEVER = "never"     # leave it to the OS, fsync only on close
+FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_NEVER)
+
+
+def checksums(records):
+    """Check byte of each record, computed from its first RECORD_DTYPE.itemsize - 1 bytes"""
+    raw = records.view(np.uint8).reshape(len(records), RECORD_DTYPE.itemsize)
+    return (raw[:, :-1].sum(axis=1, dtype=np.uint32) % 255 + 1).astype(np.uint8)
+
+
+def read_header(f):
+    """(metadata dict, record count, clean) of an open log file"""
+    f.seek(0)
+    raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_STRUCT.size:
+        raise ValueError("Not a gaze session log: file too short")
+    magic, version, record_size, count, clean, length = HEADER_STRUCT.unpack_from(raw)
+    if magic != MAGIC:
+        raise ValueError("Not a gaze session log")
+    if version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"Unsupported gaze session log version {version}")
+    metadata = json.loads(raw[HEADER_STRUCT.size:HEADER_STRUCT.size + length].decode('utf-8'))
+    return metadata, count, clean
+
+
+def _write_header(fd, metadata, count=0, clean=False):
+    payload = json.dumps(metadata).encode('utf-8')
+    if HEADER_STRUCT.size + len(payload) > HEADER_SIZE:
+        raise ValueError("Session metadata does not fit in the log header")
+    header = HEADER_STRUCT.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize, count, clean, len(payload)) + payload
+    os.pwrite(fd, header.ljust(HEADER_SIZE, b'\0'), 0)
+
+
+def _valid_prefix(records):
+    """Number of leading records whose checksum matches"""
+    bad = np.flatnonzero(records['check'] != checksums(records))
+    return int(bad[0]) if len(bad) else len(records)
+
+
+def recover(path):
+    """
+    Make a log left by a crash readable: drop the torn tail and the unused
+    preallocated space, then mark the file cleanly closed
+
+    Returns:
+        number of intact records
+    """
+    with open(path, 'r+b') as f:
+        metadata, count, clean = read_header(f)
+        size = os.fstat(f.fileno()).st_size
+        n = (size - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        records = np.memmap(f, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(n,)) if n > 0 \
+            else np.zeros(0, dtype=RECORD_DTYPE)
+        valid = _valid_prefix(records)
+        del records
+        f.truncate(HEADER_SIZE + valid * RECORD_DTYPE.itemsize)
+        _write_header(f.fileno(), metadata, valid, True)
+        os.fsync(f.fileno())
+    return valid
+
+
+def read_session(path):
+    """
+    Read a session log
+
+    Returns:
+        (metadata, records) with records a RECORD_DTYPE array; a log that was
+        not closed cleanly is read up to its first torn record
+    """
+    with open(path, 'rb') as f:
+        metadata, count, clean = read_header(f)
+        f.seek(HEADER_SIZE)
+        data = np.fromfile(f, dtype=RECORD_DTYPE)
+    if clean:
+        return metadata, data[:count]
+    return metadata, data[:_valid_prefix(data)]
+
+
+class SessionRecorder:
+    """
+    Records gaze samples of one test session to an append-only binary log
+
+    Args:
+        path: log file to create
+        profile: test profile dict (ranks become the element table) or any
+            JSON-serialisable description
+        screen: (width, height) of the screen gaze coordinates refer to
+        calibration_id: identifier of the calibration model in use
+        chunk_records: records buffered before a chunk is handed to the writer
+        flush_interval: seconds the oldest buffered record may wait before a
+            partial chunk is handed to the writer, bounding what a crash loses
+        preallocate_records: file space reserved ahead of the writer at a time
+        fsync: "always" (every chunk), "never" (on close only) or seconds
+            between fsyncs
+    """
+
+    def __init__(self, path, profile=None, screen=None, calibration_id=None,
+                 chunk_records=4096, preallocate_records=65536, fsync=1.0, flush_interval=1.0):
+        if fsync not in FSYNC_POLICIES and not isinstance(fsync, (int, float)):
+            raise ValueError(f"Unknown fsync policy {fsync!r}")
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be positive")
+        self.path = path
+        self.chunk_records = int(chunk_records)
+        self.flush_interval = flush_interval
+        self.preallocate_records = int(preallocate_records)
+        self.fsync = fsync
+
+        self.elements = []
+        if isinstance(profile, dict) and isinstance(profile.get('ranks'), dict):
+            for rank in sorted(profile['ranks'], key=int):
+                for component in profile['ranks'][rank]:
+                    if component['selector'] not in self.elements:
+                        self.elements.append(component['selector'])
+        self.element_ids = {selector: i for i, selector in enumerate(self.elements)}
+        self.metadata = {
+            'created_at': time.time(),
+            'profile': profile,
+            'screen': list(screen) if screen is not None else None,
+            'calibration_id': calibration_id,
+            'elements': self.elements,
+        }
+
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        _write_header(self.fd, self.metadata)
+        self.allocated = 0
+        self._reserve(self.preallocate_records)
+
+        self.buffer = np.zeros(self.chunk_records, dtype=RECORD_DTYPE)
+        self.size = 0
+        self.oldest = None      # monotonic time the first buffered record arrived
+        self.lock = threading.Lock()   # buffer is filled by the subscription, drained by the writer
+        self.count = 0          # records handed to the writer
+        self.written = 0        # records on disk
+        self.synced = 0         # records on disk at the last fsync
+        self.last_fsync = time.monotonic()
+        self.closed = False
+        self.error = None
+        self.subscription = None
+        self.progress = threading.Condition()
+
+        self.spare = queue.SimpleQueue()   # recycled chunk buffers
+        self.pending = queue.Queue()
+        self.writer = threading.Thread(target=self._write_loop, name="gaze-recorder", daemon=True)
+        self.writer.start()
+
+    def _reserve(self, records):
+        size = HEADER_SIZE + (self.allocated + records) * RECORD_DTYPE.itemsize
+        if hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(self.fd, 0, size)
+            except OSError:
+                os.ftruncate(self.fd, size)
+        else:
+            os.ftruncate(self.fd, size)
+        self.allocated += records
+
+    def element_id(self, selector):
+        """Element table index of a selector, NO_ELEMENT when it is not in the profile"""
+        if selector is None:
+            return NO_ELEMENT
+        return self.element_ids.get(selector, NO_ELEMENT)
+
+    def append(self, sample, element=None):
+        """
+        Record one gaze sample (EyeTracker.get_gaze output)
+
+        Args:
+            element: selector or element table index the sample is attributed to
+        """
+        position = sample.get('position')
+        if position is None:
+            return
+        if not isinstance(element, (int, np.integer)):
+            element = self.element_id(element)
+        flags = (FLAG_BLINK if sample.get('blink') else 0) | \
+                (FLAG_SACCADES if sample.get('saccades') else 0) | \
+                (FLAG_ESTIMATED if sample.get('estimated') else 0)
+        timestamp = sample.get('timestamp')
+        row = (time.time() if timestamp is None else timestamp, position[0], position[1],
+               float(sample.get('fixation') or 0.0), flags, element, 0)
+        with self.lock:
+            if self.closed:
+                return
+            now = time.monotonic()
+            if not self.size:
+                self.oldest = now
+            self.buffer[self.size] = row
+            self.size += 1
+            if self.size == self.chunk_records or now - self.oldest >= self.flush_interval:
+                self._hand_off()
+
+    def _hand_off(self):
+        # called with lock held
+        if not self.size:
+            return
+        self.pending.put((self.count, self.buffer, self.size))
+        self.count += self.size
+        try:
+            self.buffer = self.spare.get_nowait()
+        except queue.Empty:
+            self.buffer = np.zeros(self.chunk_records, dtype=RECORD_DTYPE)
+        self.size = 0
+
+    def _write_loop(self):
+        while True:
+            try:
+                item = self.pending.get(timeout=self.flush_interval)
+            except queue.Empty:
+                # the stream stalled: hand over what is buffered and sync it
+                with self.lock:
+                    if self.size and time.monotonic() - self.oldest >= self.flush_interval:
+                        self._hand_off()
+                if self.pending.empty():
+                    self._maybe_fsync()
+                continue
+            if item is None:
+                return
+            start, buffer, n = item
+            chunk = buffer[:n]
+            try:
+                chunk['check'] = checksums(chunk)
+                if start + len(chunk) > self.allocated:
+                    self._reserve(max(self.preallocate_records, start + len(chunk) - self.allocated))
+                os.pwrite(self.fd, chunk.tobytes(), HEADER_SIZE + start * RECORD_DTYPE.itemsize)
+            except OSError as e:
+                self.error = e
+                print(f"⚠️ Gaze recording error: {e}")
+            with self.progress:
+                self.written = start + n
+                self.progress.notify_all()
+            self.spare.put(buffer)
+            try:
+                self._maybe_fsync()
+            except OSError as e:
+                self.error = e
+                print(f"⚠️ Gaze recording error: {e}")
+
+    def _maybe_fsync(self):
+        # writer thread only; written records not yet synced are what a crash can lose
+        if self.fsync == FSYNC_NEVER or self.synced == self.written:
+            return
+        now = time.monotonic()
+        if self.fsync == FSYNC_ALWAYS or now - self.last_fsync >= self.fsync:
+            written = self.written
+            os.fsync(self.fd)
+            self.synced = written
+            self.last_fsync = now
+
+    def flush(self, timeout=None):
+        """Hand buffered samples to the writer and wait until they are written"""
+        with self.lock:
+            self._hand_off()
+            target = self.count
+        with self.progress:
+            return self.progress.wait_for(lambda: self.written >= target, timeout)
+
+    def close(self):
+        """Write remaining samples, trim the preallocated space and mark the log clean"""
+        if self.closed:
+            return
+        if self.subscription is not None:
+            # the dispatch thread still records what the subscription buffered
+            self.subscription.close()
+            if self.subscription.thread is not None:
+                self.subscription.thread.join(timeout=2.0)
+        with self.lock:
+            self._hand_off()
+            self.closed = True
+        self.pending.put(None)
+        self.writer.join()
+        os.ftruncate(self.fd, HEADER_SIZE + self.written * RECORD_DTYPE.itemsize)
+        _write_header(self.fd, self.metadata, self.written, True)
+        os.fsync(self.fd)
+        os.close(self.fd)
+
+    def attach(self, tracker, attribute=None):
+        """
+        Record every sample of an EyeTracker through a lossless subscription
+
+        Args:
+            attribute: optional callable (x, y) -> selector for the element column
+
+        Returns:
+            the subscription, close it (or the recorder) to stop recording
+        """
+        def record(sample):
+            element = None
+            if attribute is not None and sample.get('position') is not None:
+                element = attribute(*sample['position'])
+            self.append(sample, element)
+
+        self.subscription = tracker.subscribe(callback=record, maxsize=1024, policy="lossless")
+        return self.subscription
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
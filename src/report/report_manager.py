@@ -5,11 +5,14 @@ This module creates detailed reports showing component interaction data,
 importance rankings, and time spent analysis.
 """
 
+import os
 import tkinter as tk
 from tkinter import ttk
 import threading
 import random
 
+from ..analysis import DwellAggregator
+
 
 class ReportManager:
     """Manages analysis reports for browser component interactions."""
@@ -18,14 +21,49 @@ class ReportManager:
         """Initialize the report manager."""
         self.report_window = None
         self.report_active = False
+        self.session_log = None
+        self.profile = None
+        self.flush = None
+
+    def use_session(self, log_path, profile=None, flush=None):
+        """
+        Report the measured attention of a recorded session.
+
+        Args:
+            log_path: SessionRecorder log of the running test
+            profile: test profile with the ranks, defaults to the one in the log
+            flush: called before the log is read, e.g. SessionRecorder.flush
+        """
+        self.session_log = log_path
+        self.profile = profile
+        self.flush = flush
+
+    def _session_data(self):
+        """Report rows of the recorded session, None when there is no recording."""
+        if not self.session_log or not os.path.exists(self.session_log):
+            return None
+        try:
+            if self.flush is not None:
+                self.flush()
+            return DwellAggregator.from_session(self.session_log, self.profile).report_rows()
+        except Exception as e:
+            print(f"⚠️ Could not read gaze recording {self.session_log}: {e}")
+            return None
     
-    def show_component_analysis_report(self):
-        """Show the component analysis report when timer expires."""
+    def show_component_analysis_report(self, component_data=None):
+        """
+        Show the component analysis report when timer expires.
+        
+        Args:
+            component_data: Rows of {'name', 'importance', 'time_spent', 'score'},
+                e.g. DwellAggregator.report_rows(); read from the session set
+                with use_session when omitted, mock data without one
+        """
         try:
             print("📊 Generating component analysis report...")
             
             # Create report in a separate thread to avoid blocking
-            report_thread = threading.Thread(target=self._create_report_window, daemon=True)
+            report_thread = threading.Thread(target=self._create_report_window, args=(component_data,), daemon=True)
             report_thread.start()
             
             print("✅ Component analysis report initiated")
@@ -69,7 +107,7 @@ class ReportManager:
         component_data.sort(key=lambda x: x['importance'], reverse=True)
         return component_data
     
-    def _create_report_window(self):
+    def _create_report_window(self, component_data=None):
         """Create and display the analysis report window."""
         try:
             # Create a new root window for the report
@@ -117,8 +155,13 @@ class ReportManager:
             )
             subtitle_label.pack(pady=(3, 0))
             
-            # Generate mock data
-            component_data = self._generate_mock_data()
+            # Measured attention when available, mock data otherwise
+            if not component_data:
+                component_data = self._session_data()
+            if component_data:
+                component_data = sorted(component_data, key=lambda x: x['importance'], reverse=True)
+            else:
+                component_data = self._generate_mock_data()
             
             # Create table frame
             table_frame = tk.Frame(main_frame, bg='#ffffff', relief='solid', bd=1)
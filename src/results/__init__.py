@@ -0,0 +1,24 @@
+"""
+Results storage module.
+
+This module stores the LLM explanations and summaries of analysis runs,
+locally in SQLite or in Supabase, optionally through a write-behind queue.
+"""
+
+from .store import (
+    ResultsStore,
+    SQLiteStore,
+    SupabaseStore,
+    open_store,
+    EXPLANATION_FIELDS,
+)
+from .write_behind import WriteBehindQueue
+
+__all__ = [
+    'ResultsStore',
+    'SQLiteStore',
+    'SupabaseStore',
+    'open_store',
+    'EXPLANATION_FIELDS',
+    'WriteBehindQueue',
+]
@@ -0,0 +1,241 @@
+"""
+Storage of the LLM explanations and summaries of a run.
+
+gemSuggest.py writes one explanation per optimised component and
+endSummary.py reads them back by run id to write the run's summary. Both go
+through a ResultsStore so the same pipeline runs against a local SQLite file
+or the Supabase gemini_explanations / gemini_summary tables.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    from supabase import create_client
+except ImportError:
+    create_client = None
+
+EXPLANATION_FIELDS = ('run_id', 'component', 'desired_attention', 'actual_attention',
+                      'ranking_score', 'explanation')
+
+DEFAULT_DB_PATH = "results.db"
+
+
+class ResultsStore:
+    """
+    Interface of results backends.
+
+    Explanation rows are dicts with the EXPLANATION_FIELDS keys; missing keys
+    are stored as NULL. Rows come back in insertion order.
+    """
+
+    name = "base"
+
+    def add_explanations(self, rows):
+        """Insert many explanation rows at once, returns the number inserted"""
+        raise NotImplementedError
+
+    def add_explanation(self, run_id, component, desired_attention=None, actual_attention=None,
+                        ranking_score=None, explanation=None):
+        return self.add_explanations([{
+            'run_id': run_id,
+            'component': component,
+            'desired_attention': desired_attention,
+            'actual_attention': actual_attention,
+            'ranking_score': ranking_score,
+            'explanation': explanation,
+        }])
+
+    def explanations(self, run_id, component=None):
+        """Explanation rows of a run, optionally of one component only"""
+        raise NotImplementedError
+
+    def add_summary(self, run_id, summary):
+        raise NotImplementedError
+
+    def summaries(self, run_id):
+        """Summary texts of a run, oldest first"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _explanation_row(row):
+    unknown = set(row) - set(EXPLANATION_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown explanation fields: {', '.join(sorted(unknown))}")
+    if not row.get('run_id'):
+        raise ValueError("Explanation rows need a run_id")
+    return tuple(row.get(field) for field in EXPLANATION_FIELDS)
+
+
+class SQLiteStore(ResultsStore):
+    """
+    Results in a local SQLite database
+
+    WAL journaling lets endSummary read while gemSuggest is still writing,
+    batches are inserted in one transaction, and run_id / component are
+    indexed so a run's rows are found without scanning older runs.
+
+    Args:
+        path: database file, ":memory:" for a throwaway store
+    """
+
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS gemini_explanations (
+            id INTEGER PRIMARY KEY,
+            run_id TEXT NOT NULL,
+            component TEXT,
+            desired_attention REAL,
+            actual_attention REAL,
+            ranking_score REAL,
+            explanation TEXT,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_explanations_run_id ON gemini_explanations (run_id);
+        CREATE INDEX IF NOT EXISTS idx_explanations_component ON gemini_explanations (component);
+        CREATE TABLE IF NOT EXISTS gemini_summary (
+            id INTEGER PRIMARY KEY,
+            run_id TEXT NOT NULL,
+            summary TEXT,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_summary_run_id ON gemini_summary (run_id);
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        # one connection shared by the pipeline's threads, serialised by a lock
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.executescript(self.SCHEMA)
+
+    def add_explanations(self, rows):
+        now = time.time()
+        values = [_explanation_row(row) + (now,) for row in rows]
+        if not values:
+            return 0
+        with self.lock, self.connection:
+            self.connection.executemany(
+                f"INSERT INTO gemini_explanations ({', '.join(EXPLANATION_FIELDS)}, created_at) "
+                f"VALUES ({', '.join('?' * (len(EXPLANATION_FIELDS) + 1))})",
+                values)
+        return len(values)
+
+    def explanations(self, run_id, component=None):
+        query = f"SELECT {', '.join(EXPLANATION_FIELDS)} FROM gemini_explanations WHERE run_id = ?"
+        params = [run_id]
+        if component is not None:
+            query += " AND component = ?"
+            params.append(component)
+        with self.lock:
+            rows = self.connection.execute(query + " ORDER BY id", params).fetchall()
+        return [dict(row) for row in rows]
+
+    def add_summary(self, run_id, summary):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO gemini_summary (run_id, summary, created_at) VALUES (?, ?, ?)",
+                (run_id, summary, time.time()))
+
+    def summaries(self, run_id):
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT summary FROM gemini_summary WHERE run_id = ? ORDER BY id", (run_id,)).fetchall()
+        return [row['summary'] for row in rows]
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class SupabaseStore(ResultsStore):
+    """
+    Results in the Supabase gemini_explanations / gemini_summary tables
+
+    Args:
+        url, key: project url and service role key, SUPABASE_URL and
+            SUPABASE_SERVICE_ROLE_KEY by default
+        client: an existing supabase client, used instead of creating one
+    """
+
+    name = "supabase"
+
+    def __init__(self, url=None, key=None, client=None):
+        if client is None:
+            if create_client is None:
+                raise ImportError("The supabase package is required for the Supabase results store")
+            url = url or os.getenv("SUPABASE_URL")
+            key = key or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+            if not url or not key:
+                raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set")
+            client = create_client(url, key)
+        self.client = client
+
+    def add_explanations(self, rows):
+        rows = [dict(zip(EXPLANATION_FIELDS, _explanation_row(row))) for row in rows]
+        if not rows:
+            return 0
+        response = self.client.table("gemini_explanations").insert(rows).execute()
+        if not response.data:
+            raise RuntimeError(f"Supabase insert failed: {response}")
+        return len(rows)
+
+    def explanations(self, run_id, component=None):
+        query = self.client.table("gemini_explanations").select(", ".join(EXPLANATION_FIELDS)).eq("run_id", run_id)
+        if component is not None:
+            query = query.eq("component", component)
+        return query.order("id").execute().data or []
+
+    def add_summary(self, run_id, summary):
+        response = self.client.table("gemini_summary").insert({"summary": summary, "run_id": run_id}).execute()
+        if not response.data:
+            raise RuntimeError(f"Supabase insert failed: {response}")
+
+    def summaries(self, run_id):
+        response = self.client.table("gemini_summary").select("summary").eq("run_id", run_id).order("id").execute()
+        return [row['summary'] for row in response.data or []]
+
+
+BACKENDS = {
+    SQLiteStore.name: SQLiteStore,
+    SupabaseStore.name: SupabaseStore,
+}
+
+
+def open_store(backend=None, **kwargs):
+    """
+    Open the configured results store
+
+    Args:
+        backend: "sqlite" or "supabase"; defaults to RESULTS_BACKEND, else
+            Supabase when its credentials are set and the package is
+            installed, else SQLite at RESULTS_DB (results.db)
+        kwargs: passed to the backend
+    """
+    backend = backend or os.getenv("RESULTS_BACKEND")
+    if backend is None:
+        configured = os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+        backend = SupabaseStore.name if configured and create_client is not None else SQLiteStore.name
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown results backend {backend!r}, choose from {', '.join(BACKENDS)}")
+    if backend == SQLiteStore.name and 'path' not in kwargs:
+        kwargs['path'] = os.getenv("RESULTS_DB", DEFAULT_DB_PATH)
+    store = BACKENDS[backend](**kwargs)
+    print(f"💾 Results store: {store.name}")
+    return store
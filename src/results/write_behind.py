@@ -0,0 +1,264 @@
+"""
+Write-behind queue in front of a ResultsStore.
+
+Callers enqueue rows and return immediately; a background thread writes
+them as bulk inserts once batch_size rows are pending or flush_interval
+seconds have passed. Failed batches are retried with exponential backoff.
+Rows that cannot be written (the store stays down, or more than
+max_pending rows pile up) go to a JSON lines spool file and are replayed
+the next time a queue starts on the same spool. A spool being replayed is
+kept (renamed to <spool>.replay.<n>) until each of its rows has been
+written or spooled again, so a crash during replay loses nothing.
+"""
+
+import atexit
+import glob
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+
+EXPLANATION = "explanation"
+SUMMARY = "summary"
+DEFAULT_SPOOL_PATH = "results_spool.jsonl"
+
+
+class WriteBehindQueue:
+    """
+    Buffers explanation and summary rows and writes them in batches
+
+    Args:
+        store: ResultsStore the rows end up in
+        batch_size: rows per bulk insert, a full batch is written right away
+        flush_interval: longest time in seconds a row waits for its batch
+        max_pending: rows buffered in memory before new rows are spooled
+        retries: attempts per batch before it is spooled
+        backoff: first retry delay in seconds, doubled per attempt with jitter
+        max_backoff: cap of the retry delay
+        spool_path: JSON lines file for rows that could not be written, None
+            to drop them instead
+        flush_on_exit: register close() to run at interpreter exit
+    """
+
+    def __init__(self, store, batch_size=50, flush_interval=2.0, max_pending=10000, retries=5,
+                 backoff=0.5, max_backoff=30.0, spool_path=DEFAULT_SPOOL_PATH, flush_on_exit=True):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.spool_path = spool_path
+
+        self.pending = deque()          # (kind, row)
+        self.oldest = None              # when the oldest pending row was enqueued
+        self.in_flight = 0
+        self.rows_taken = 0             # rows ever taken from pending
+        self.rows_done = 0              # of those, rows written or spooled
+        self.replays = []               # (rows_done once replayed, replay files)
+        self.condition = threading.Condition()
+        self.flush_requested = False
+        self.closed = False
+        self.stopping = threading.Event()   # cuts retry waits short on close
+        self.spool_lock = threading.Lock()
+
+        self.round_trips = 0
+        self.rows_written = 0
+        self.rows_spooled = 0
+        self.errors = 0
+
+        self.replay_spool()
+        self.worker = threading.Thread(target=self._run, name="results-writer", daemon=True)
+        self.worker.start()
+        if flush_on_exit:
+            atexit.register(self.close)
+
+    def put_explanation(self, row):
+        """Enqueue an explanation row (see results.EXPLANATION_FIELDS), never blocks on the store"""
+        self._put(EXPLANATION, dict(row))
+
+    def put_summary(self, run_id, summary):
+        self._put(SUMMARY, {'run_id': run_id, 'summary': summary})
+
+    def _put(self, kind, row):
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("Write-behind queue is closed")
+            if len(self.pending) >= self.max_pending:
+                overflow = True
+            else:
+                overflow = False
+                if not self.pending:
+                    self.oldest = time.monotonic()
+                    self.condition.notify_all()
+                self.pending.append((kind, row))
+                if len(self.pending) >= self.batch_size:
+                    self.condition.notify_all()
+        if overflow:
+            self._spool([(kind, row)])
+
+    def __len__(self):
+        with self.condition:
+            return len(self.pending) + self.in_flight
+
+    def flush(self, timeout=None):
+        """Write (or spool) everything enqueued so far, returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            self.flush_requested = True
+            self.condition.notify_all()
+            while self.pending or self.in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+            return True
+
+    def close(self, timeout=30.0):
+        """Flush, stop the writer and spool whatever could not be written in time"""
+        with self.condition:
+            if self.closed:
+                return
+        flushed = self.flush(timeout)
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.stopping.set()
+        self.worker.join(timeout)
+        if not flushed:
+            with self.condition:
+                rows = list(self.pending)
+                self.pending.clear()
+                self.rows_taken += len(rows)
+            self._spool(rows)
+            self._done(len(rows))
+        atexit.unregister(self.close)
+
+    def stats(self):
+        return {
+            'pending': len(self),
+            'round_trips': self.round_trips,
+            'rows_written': self.rows_written,
+            'rows_spooled': self.rows_spooled,
+            'errors': self.errors,
+        }
+
+    def _ready(self):
+        # a batch is due when full, asked for, or its oldest row waited long enough
+        return len(self.pending) >= self.batch_size or self.flush_requested or self.closed \
+            or time.monotonic() - self.oldest >= self.flush_interval
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not (self.pending and self._ready()):
+                    if not self.pending:
+                        if self.flush_requested:
+                            self.flush_requested = False
+                            self.condition.notify_all()
+                        if self.closed:
+                            return
+                        self.condition.wait()
+                    else:
+                        self.condition.wait(self.oldest + self.flush_interval - time.monotonic())
+                batch = [self.pending.popleft() for _ in range(min(self.batch_size, len(self.pending)))]
+                self.oldest = time.monotonic()
+                self.in_flight = len(batch)
+                self.rows_taken += len(batch)
+
+            self._write(batch)
+            self._done(len(batch))
+            with self.condition:
+                self.in_flight = 0
+                if not self.pending:
+                    self.flush_requested = False
+                self.condition.notify_all()
+
+    def _write(self, batch):
+        explanations = [row for kind, row in batch if kind == EXPLANATION]
+        summaries = [row for kind, row in batch if kind == SUMMARY]
+        if explanations and not self._attempt(lambda: self.store.add_explanations(explanations), len(explanations)):
+            self._spool([(EXPLANATION, row) for row in explanations])
+        for row in summaries:
+            if not self._attempt(lambda: self.store.add_summary(row['run_id'], row['summary']), 1):
+                self._spool([(SUMMARY, row)])
+
+    def _attempt(self, insert, rows):
+        delay = self.backoff
+        for attempt in range(self.retries):
+            try:
+                insert()
+                self.round_trips += 1
+                self.rows_written += rows
+                return True
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ Results write failed (attempt {attempt + 1}/{self.retries}): {e}")
+                if attempt + 1 == self.retries or self.stopping.wait(random.uniform(0.5, 1.0) * delay):
+                    break
+                delay = min(delay * 2, self.max_backoff)
+        return False
+
+    def _spool(self, rows):
+        if not rows:
+            return
+        if self.spool_path is None:
+            print(f"❌ Dropped {len(rows)} result rows")
+            return
+        with self.spool_lock, open(self.spool_path, 'a', encoding='utf-8') as f:
+            for kind, row in rows:
+                f.write(json.dumps({'kind': kind, 'row': row}) + '\n')
+        self.rows_spooled += len(rows)
+        print(f"💾 Spooled {len(rows)} result rows to {self.spool_path}")
+
+    def _done(self, rows):
+        """Count rows written or spooled, removing replay files all of whose rows are"""
+        with self.condition:
+            self.rows_done += rows
+            finished = [paths for end, paths in self.replays if end <= self.rows_done]
+            self.replays = [(end, paths) for end, paths in self.replays if end > self.rows_done]
+        for paths in finished:
+            for path in paths:
+                os.remove(path)
+
+    def replay_spool(self):
+        """Enqueue the rows of an earlier spool file and of interrupted replays, returns how many"""
+        if self.spool_path is None:
+            return 0
+        with self.spool_lock:
+            if os.path.exists(self.spool_path):
+                # a unique name, an earlier replay left behind by a crash is not overwritten
+                os.replace(self.spool_path, f"{self.spool_path}.replay.{time.time_ns()}")
+            with self.condition:
+                claimed = {path for _, paths in self.replays for path in paths}
+            paths = [path for path in sorted(glob.glob(glob.escape(self.spool_path) + ".replay*"))
+                     if path not in claimed]
+        if not paths:
+            return 0
+
+        rows = []
+        for path in paths:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        rows.append((entry['kind'], entry['row']))
+                    except (ValueError, KeyError):
+                        continue   # torn last line of a crashed run
+        with self.condition:
+            if rows and not self.pending:
+                self.oldest = time.monotonic()
+            self.pending.extend(rows)
+            # pending is first in, first out: the files are done once every row up to these is
+            self.replays.append((self.rows_taken + len(self.pending), paths))
+            self.condition.notify_all()
+        if rows:
+            print(f"📤 Replaying {len(rows)} spooled result rows")
+        else:
+            self._done(0)
+        return len(rows)
@@ -0,0 +1,93 @@
+"""
+Test script for cross-participant attention aggregation
+"""
+
+import sys
+import os
+import numpy as np
+
+# Add source path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from analysis import CohortTable, DwellAggregator, group_median
+
+RANKS = {'#hero': 1, '.cta': 2, 'nav': 3, 'footer': 4}
+
+
+def random_sessions(n, seed=0):
+    rng = np.random.default_rng(seed)
+    base = np.array([20.0, 12.0, 6.0, 2.0])
+    return {f"p{i}": dict(zip(RANKS, np.maximum(base + rng.normal(0, 3, 4), 0))) for i in range(n)}
+
+
+def test_group_median():
+    """Vectorised group median ignores NaN and leaves empty groups NaN"""
+    groups = np.array([0, 0, 0, 1, 1, 2, 2])
+    values = np.array([3.0, 1.0, 2.0, 4.0, 6.0, np.nan, np.nan])
+    assert np.allclose(group_median(groups, values, 4), [2, 5, np.nan, np.nan], equal_nan=True)
+    print("✅ Group medians")
+
+
+def test_summary_matches_numpy():
+    """Means, medians, std and CIs equal a direct per-component computation"""
+    sessions = random_sessions(200)
+    table = CohortTable(RANKS)
+    table.add_sessions(sessions)
+    summary = table.summary()
+
+    matrix = np.array([[s[k] for k in RANKS] for s in sessions.values()])
+    for i, selector in enumerate(RANKS):
+        row = summary[selector]
+        assert row['participants'] == 200
+        assert np.isclose(row['mean'], matrix[:, i].mean())
+        assert np.isclose(row['median'], np.median(matrix[:, i]))
+        assert np.isclose(row['std'], matrix[:, i].std(ddof=1))
+        assert row['ci_low'] < row['mean'] < row['ci_high']
+    assert [summary[s]['consensus_rank'] for s in RANKS] == [1, 2, 3, 4]
+    print("✅ 200 participants aggregated")
+
+
+def test_incremental_add_and_replace():
+    """Adding or replacing one participant updates the aggregates without a rebuild"""
+    sessions = random_sessions(50, seed=1)
+    table = CohortTable(RANKS)
+    table.add_sessions(sessions)
+    table.add_session('p0', {'#hero': 0.0, '.cta': 0.0, 'nav': 0.0, 'footer': 30.0})
+    table.add_session('late', sessions['p1'])
+
+    sessions['p0'] = {'#hero': 0.0, '.cta': 0.0, 'nav': 0.0, 'footer': 30.0}
+    sessions['late'] = sessions['p1']
+    fresh = CohortTable(RANKS)
+    fresh.add_sessions(sessions)
+
+    assert len(table) == len(fresh) == 51
+    for selector in RANKS:
+        for key in ('mean', 'median', 'std', 'mean_rank'):
+            assert np.isclose(table.summary()[selector][key], fresh.summary()[selector][key]), key
+    assert np.isclose(table.consensus()['mean_score'], fresh.consensus()['mean_score'])
+    print("✅ Incremental updates match a full recomputation")
+
+
+def test_consensus_and_session_metrics():
+    """Identical participants agree fully and unranked components are kept apart"""
+    table = CohortTable(RANKS)
+    for i in range(5):
+        aggregator = DwellAggregator(RANKS)
+        aggregator.add_samples([(t * 0.05, '#hero' if t < 20 else '.cta', 0) for t in range(31)])
+        summary = table.add_session(i, aggregator)
+    table.add_session('extra', {'#hero': 3.0, '#ad': 9.0})
+
+    consensus = table.consensus()
+    assert summary['score'] > 90
+    assert consensus['ranking'][:2] == ['#hero', '.cta']
+    assert np.isclose(consensus['kendall_w'], 1.0)
+    assert table.summary()['#ad']['rank'] is None
+    print("✅ Rank consensus and per-session scores")
+
+
+if __name__ == "__main__":
+    test_group_median()
+    test_summary_matches_numpy()
+    test_incremental_add_and_replace()
+    test_consensus_and_session_metrics()
+    print("\n🎉 All cohort tests passed")
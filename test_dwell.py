@@ -0,0 +1,140 @@
+"""
+Test script for the streaming dwell-time aggregation engine
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+# Add source path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from analysis import DwellAggregator, load_ranks
+from recording import SessionRecorder
+
+PROFILE = {
+    "url": "https://example.com",
+    "duration": "1",
+    "ranks": {
+        "1": [{"selector": "#hero", "tag": "div"}],
+        "2": [{"selector": ".cta", "tag": "a"}, {"selector": "#hero", "tag": "div"}],
+        "3": [{"selector": "footer", "tag": "footer"}],
+    },
+}
+
+
+def run(samples, **kwargs):
+    aggregator = DwellAggregator(PROFILE, **kwargs)
+    aggregator.add_samples(samples)
+    return aggregator
+
+
+def test_profile_ranks():
+    """Profiles load from disk into {selector: rank}, best rank wins"""
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(PROFILE, f)
+    try:
+        assert load_ranks(f.name) == {'#hero': 1, '.cta': 2, 'footer': 3}
+    finally:
+        os.remove(f.name)
+    assert load_ranks({'#a': 2}) == {'#a': 2}
+    print("✅ Profile ranks loaded")
+
+
+def test_dwell_visits_and_fixations():
+    """Dwell, visits, revisits, fixation counts and TTFF from a scripted scan path"""
+    samples = []
+    t = 10.0
+    # hero 0.5 s (fixating from the 3rd sample), cta 0.3 s, hero again 0.2 s
+    for selector, n, fixate_from in (('#hero', 10, 2), ('.cta', 6, 99), ('#hero', 4, 0)):
+        for i in range(n):
+            samples.append((t, selector, 0.04 if i >= fixate_from else 0.0))
+            t += 0.05
+    samples.append((t, None, 0.0))
+
+    stats = run(samples).stats()
+    hero, cta, footer = stats['#hero'], stats['.cta'], stats['footer']
+    assert abs(hero['dwell'] - 0.7) < 1e-9 and abs(cta['dwell'] - 0.3) < 1e-9
+    assert (hero['visits'], hero['revisits'], cta['visits']) == (2, 1, 1)
+    assert (hero['fixations'], cta['fixations']) == (2, 0)
+    assert abs(hero['time_to_first_fixation'] - 0.1) < 1e-9
+    assert cta['time_to_first_fixation'] is None
+    assert footer['dwell'] == 0 and footer['visits'] == 0
+    print("✅ Dwell, visits, fixations and TTFF tracked per component")
+
+
+def test_gaps_capped_and_blinks_not_revisits():
+    """Tracking dropouts are capped and a short blink is not a revisit"""
+    samples = [(0.0, '#hero', 0), (0.05, None, 0), (0.1, '#hero', 0), (5.0, '#hero', 0)]
+    aggregator = run(samples, max_gap=0.1)
+    hero = aggregator.stats()['#hero']
+    assert hero['visits'] == 1
+    assert abs(hero['dwell'] - 0.15) < 1e-9
+    assert abs(aggregator.off_target - 0.05) < 1e-9
+    print("✅ Dropouts capped at max_gap, blinks ignored for revisits")
+
+
+def test_fixation_events():
+    """Fixation events from an external detector aggregate the same way"""
+    aggregator = DwellAggregator(PROFILE, start_time=0.0)
+    aggregator.add_fixation(0.2, 0.5, '.cta')
+    aggregator.add_fixation(0.6, 1.0, '#hero')
+    aggregator.add_fixation(1.1, 1.3, '.cta')
+    cta = aggregator.stats()['.cta']
+    assert (cta['fixations'], cta['visits']) == (2, 2)
+    assert abs(cta['dwell'] - 0.5) < 1e-9
+    assert abs(cta['time_to_first_fixation'] - 0.2) < 1e-9
+    print("✅ Fixation events aggregated")
+
+
+def test_attention_data_records():
+    """attention_data matches the records gemSuggest consumes"""
+    samples = [(i * 0.05, '.cta' if i < 30 else '#hero', 0) for i in range(41)]
+    records = run(samples, html_components={'.cta': '<a class="cta">Buy</a>'}).attention_data()
+
+    assert [r['desiredAttention'] for r in records] == [1, 2, 3]
+    assert set(records[0]) == {'desiredAttention', 'actualAttention', 'rankingScore',
+                               'alignmentScore', 'html_component'}
+    assert records[1]['actualAttention'] == 1.5 and records[1]['rankingScore'] == -1
+    assert records[0]['rankingScore'] == 1
+    assert records[2]['alignmentScore'] == 100 and records[0]['alignmentScore'] < 100
+    assert records[1]['html_component'] == '<a class="cta">Buy</a>'
+    assert records[2]['html_component'] == "<div class='footer'>footer</div>"
+    print("✅ attention_data records built from real gaze")
+
+
+def test_from_session_log():
+    """A recorded session log aggregates like the live samples it holds"""
+    samples = []
+    t = 100.0
+    for selector, n, fixation in (('#hero', 8, 0.5), (None, 2, 0.0), ('.cta', 5, 0.0),
+                                  ('#missing', 2, 0.0), ('#hero', 3, 0.5)):
+        for _ in range(n):
+            samples.append((t, selector, fixation))
+            t += 0.05
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'session.gazelog')
+        with SessionRecorder(path, profile=PROFILE) as recorder:
+            for timestamp, selector, fixation in samples:
+                recorder.append({'position': (1.0, 2.0), 'timestamp': timestamp, 'fixation': fixation},
+                                selector)
+        replayed = DwellAggregator.from_session(path)
+        other_ranks = DwellAggregator.from_session(path, {'.cta': 1, '#hero': 2})
+
+    expected = run([(t, s if s != '#missing' else None, f) for t, s, f in samples])
+    assert replayed.stats() == expected.stats()
+    assert replayed.attention_data() == expected.attention_data()
+    assert other_ranks.stats()['.cta']['rank'] == 1 and 'footer' not in other_ranks.stats()
+    print("✅ Session logs replayed into dwell statistics")
+
+
+if __name__ == "__main__":
+    test_profile_ranks()
+    test_dwell_visits_and_fixations()
+    test_gaps_capped_and_blinks_not_revisits()
+    test_fixation_events()
+    test_attention_data_records()
+    test_from_session_log()
+    print("\n🎉 All dwell aggregation tests passed")
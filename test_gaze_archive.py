@@ -0,0 +1,132 @@
+"""
+Test script for the chunked columnar gaze archive
+"""
+
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Add source paths
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from recording import ArchiveWriter, GazeArchive, SessionRecorder, archive_sessions, RECORD_DTYPE
+from recording.archive import encode_column, decode_column
+
+
+def make_records(n, start=1000.0, rate=60.0, seed=0):
+    rng = np.random.default_rng(seed)
+    records = np.zeros(n, dtype=RECORD_DTYPE)
+    records['timestamp'] = start + np.arange(n) / rate + rng.uniform(0, 1e-3, n)
+    records['x'] = np.cumsum(rng.normal(0, 3, n)) + 960
+    records['y'] = np.cumsum(rng.normal(0, 3, n)) + 540
+    records['fixation'] = rng.uniform(0, 1, n)
+    records['flags'] = rng.integers(0, 8, n)
+    records['element'] = np.repeat(rng.integers(-1, 12, n // 50 + 1), 50)[:n]
+    records['check'] = 1
+    return records
+
+
+def test_codecs_lossless():
+    """Both codecs reproduce every column bit for bit"""
+    records = make_records(5000)
+    for name in RECORD_DTYPE.names:
+        for codec in ("shuffle", "delta"):
+            blob = encode_column(records[name], codec)
+            decoded = decode_column(blob, RECORD_DTYPE[name], len(records), codec)
+            assert decoded.tobytes() == np.ascontiguousarray(records[name]).tobytes(), (name, codec)
+    delta = len(encode_column(records['timestamp'], "delta"))
+    shuffle = len(encode_column(records['timestamp'], "shuffle"))
+    assert delta < shuffle
+    print("✅ Column codecs are lossless, delta shrinks timestamps further")
+
+
+def test_time_window_reads():
+    """Windows decode only overlapping chunks and match a brute force filter"""
+    records = make_records(60 * 60 * 5)   # five minutes at 60 Hz
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'gaze.gazearc')
+        with ArchiveWriter(path, chunk_seconds=10, metadata={'study': 'demo'}) as writer:
+            for part in np.array_split(records, 7):
+                writer.write(part)
+        assert os.path.getsize(path) < records.nbytes
+
+        with GazeArchive(path) as archive:
+            assert len(archive) == len(records)
+            assert archive.metadata == {'study': 'demo'}
+            assert len(archive.index) == 30
+            assert np.all(np.diff(archive.index['t_start']) > 0)
+            assert archive.read().tobytes() == records.tobytes()
+
+            start, end = 1042.5, 1071.25
+            expected = records[(records['timestamp'] >= start) & (records['timestamp'] <= end)]
+            chunks = archive.chunks_for(start, end)
+            assert len(chunks) == 4
+            window = archive.read(start, end, columns=['x', 'y'])
+            assert window.dtype.names == ('x', 'y')
+            assert np.array_equal(window['x'], expected['x'])
+            assert np.array_equal(archive.read(start, end)['timestamp'], expected['timestamp'])
+
+            assert len(archive.read(0, 10)) == 0
+            assert len(archive.read(start=records['timestamp'][-1])) == 1
+            try:
+                archive.read(columns=['pupil'])
+                assert False, "expected KeyError"
+            except KeyError:
+                pass
+    print("✅ Time windows are found by binary search and decode selected columns only")
+
+
+def test_archive_sessions():
+    """Session logs are archived in time order with their metadata"""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i, start in enumerate((2000.0, 1000.0)):
+            path = os.path.join(tmp, f'session{i}.gazelog')
+            with SessionRecorder(path, calibration_id=f'cal-{i}') as recorder:
+                for j in range(300):
+                    recorder.append({'position': (j, j), 'timestamp': start + j / 60.0})
+            paths.append(path)
+
+        # a log left by a crash before its first write: header and zero-filled preallocation
+        crashed = os.path.join(tmp, 'crashed.gazelog')
+        recorder = SessionRecorder(os.path.join(tmp, 'live.gazelog'), calibration_id='cal-crashed')
+        with open(recorder.path, 'rb') as src, open(crashed, 'wb') as dst:
+            dst.write(src.read())
+        recorder.close()
+        paths.append(crashed)
+
+        archive_path = os.path.join(tmp, 'all.gazearc')
+        assert archive_sessions(paths, archive_path, chunk_seconds=1.0) == 600
+        with GazeArchive(archive_path) as archive:
+            assert [s['metadata']['calibration_id'] for s in archive.sessions] == ['cal-1', 'cal-0']
+            assert archive.time_range[0] == 1000.0
+            assert len(archive.read(1999.0, 3000.0)) == 300
+
+        writer = ArchiveWriter(os.path.join(tmp, 'bad.gazearc'))
+        writer.write(make_records(10, start=50.0))
+        try:
+            writer.write(make_records(10, start=10.0))
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+        writer.close()
+
+        for name, content in (('empty.gazearc', b''), ('short.gazearc', b'GAZEARC1')):
+            path = os.path.join(tmp, name)
+            with open(path, 'wb') as f:
+                f.write(content)
+            try:
+                GazeArchive(path)
+                assert False, "expected ValueError"
+            except ValueError as e:
+                assert "Not a gaze archive" in str(e)
+    print("✅ Sessions are archived in order and out-of-order records are refused")
+
+
+if __name__ == "__main__":
+    test_codecs_lossless()
+    test_time_window_reads()
+    test_archive_sessions()
+    print("\n🎉 All gaze archive tests passed")
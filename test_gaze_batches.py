@@ -0,0 +1,124 @@
+"""
+Test script for batched gaze delivery through WebDriver (gaze socket fallback)
+"""
+
+import sys
+import os
+import base64
+import json
+import shutil
+import subprocess
+import time
+
+# Add source paths
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src', 'eye_tracking'))
+
+from browser import BrowserManager, gaze_scripts
+from browser.gaze_socket import pack_samples, unpack_samples
+from test_gaze_socket import FakeTracker
+
+
+class RecordingDriver:
+    """WebDriver stand-in recording execute_script calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append((script, args))
+
+    def quit(self):
+        pass
+
+
+def test_batches_replace_per_sample_calls():
+    """Samples reach the page in one execute_script per interval, none lost"""
+    manager = BrowserManager(gaze_batch_interval=0.1)
+    driver = manager.driver = RecordingDriver()
+    tracker = FakeTracker(delay=0.002)
+
+    manager.integrate_eye_tracker(tracker, targets=["#hero"], use_socket=False)
+    time.sleep(1.0)
+    manager.close_browser()
+    manager.tracking_thread.join(timeout=1.0)
+
+    pushes = [args[0] for script, args in driver.calls if args]
+    samples = [s for payload in pushes for s in unpack_samples(base64.b64decode(payload))]
+    timestamps = [s['timestamp'] for s in samples]
+
+    assert 7 <= len(pushes) <= 12
+    assert len(samples) > 5 * len(pushes)
+    assert timestamps == [timestamps[0] + i for i in range(len(timestamps))]
+    assert not tracker.hub.subscribers
+    print(f"✅ {len(samples)} samples delivered in {len(pushes)} WebDriver calls")
+
+
+def test_player_injected_with_delay():
+    """The in-page player replays batches behind real time"""
+    manager = BrowserManager(gaze_batch_interval=0.2)
+    driver = manager.driver = RecordingDriver()
+    manager.integrate_eye_tracker(FakeTracker(), use_socket=False)
+    manager.close_browser()
+
+    scripts = [script for script, _ in driver.calls]
+    assert any('window.gazePlayer.delay = 0.30' in script for script in scripts)
+    print("✅ Player is injected with a delay of 1.5 batch intervals")
+
+
+def test_rejects_bad_interval():
+    """Non-positive batch intervals are refused"""
+    try:
+        BrowserManager(gaze_batch_interval=0)
+    except ValueError:
+        print("✅ Invalid batch interval rejected")
+        return
+    raise AssertionError("expected ValueError")
+
+
+PLAYER_RUN = """
+let clock = 0;
+Date.now = () => clock * 1000;
+global.window = {gazeAttention: {add() {}}, gazeOverlay: {update(x, y) { drawn.push([x, y]); }}};
+global.requestAnimationFrame = () => {};
+const drawn = [];
+__PLAYER__
+window.gazePlayer.push(__PAYLOAD__);
+for (const t of __TIMES__) {
+    clock = t + window.gazePlayer.delay;
+    window.gazePlayer.frame();
+}
+console.log(JSON.stringify(drawn));
+"""
+
+
+def test_player_handles_shared_timestamps():
+    """Samples sharing a timestamp replay as finite points, not NaN"""
+    node = shutil.which('node')
+    if node is None:
+        print("⚠️ node not installed, gaze player replay not exercised")
+        return
+
+    samples = [{'position': (10.0, 20.0), 'timestamp': 100.0},
+               {'position': (50.0, 60.0), 'timestamp': 100.0},
+               {'position': (90.0, 100.0), 'timestamp': 100.5}]
+    payload = base64.b64encode(pack_samples(samples)).decode('ascii')
+    script = (PLAYER_RUN.replace('__PLAYER__', gaze_scripts.player_script(delay=0.3))
+                        .replace('__PAYLOAD__', json.dumps(payload))
+                        .replace('__TIMES__', json.dumps([99.9, 100.0, 100.25, 100.5])))
+    result = subprocess.run([node, '-e', script], capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+
+    # JSON.stringify writes NaN as null
+    drawn = json.loads(result.stdout)
+    assert drawn == [[10, 20], [50, 60], [70, 80], [90, 100]]
+    print("✅ Player interpolates without NaN on shared timestamps")
+
+
+if __name__ == "__main__":
+    test_batches_replace_per_sample_calls()
+    test_player_injected_with_delay()
+    test_rejects_bad_interval()
+    test_player_handles_shared_timestamps()
+    print("\n🎉 All gaze batch tests passed")
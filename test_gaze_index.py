@@ -0,0 +1,199 @@
+"""
+Test script for the ranked component targets fed to the in-page spatial index
+"""
+
+import sys
+import os
+import json
+import shutil
+import subprocess
+
+# Add source path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from browser import gaze_scripts
+
+
+RANKS = {
+    "2": [{"selector": ".card", "tag": "div"}, {"selector": "#hero", "tag": "div"}],
+    "10": [{"selector": "footer", "tag": "footer"}],
+    "1": [{"selector": "#hero", "tag": "div"}],
+}
+
+
+def test_profile_ranks_ordered():
+    """A profile's ranks become targets ordered by rank, numeric not lexical"""
+    targets = gaze_scripts.rank_targets(RANKS)
+    assert targets == [
+        {'selector': '#hero', 'rank': 1},
+        {'selector': '.card', 'rank': 2},
+        {'selector': 'footer', 'rank': 10},
+    ]
+    print("✅ Ranks dict converted to ordered targets")
+
+
+def test_duplicates_keep_best_rank():
+    """A selector listed under several ranks keeps the most important one"""
+    targets = gaze_scripts.rank_targets(["#a", ".b", "#a"])
+    assert targets == [{'selector': '#a', 'rank': 1}, {'selector': '.b', 'rank': 2}]
+    print("✅ Duplicate selectors removed")
+
+
+def test_index_injected_with_attention():
+    """The attention collector ships with the index and hands it the targets"""
+    script = gaze_scripts.attention_script(RANKS)
+    assert script.index('window.gazeIndex = index') < script.index('window.gazeAttention = attention')
+    assert 'MutationObserver' in script and 'ResizeObserver' in script
+    assert script.rstrip().endswith('"rank": 10}]);')
+    assert 'gazeAttention.setTargets(' not in gaze_scripts.attention_script()
+    print("✅ Attention script carries the spatial index and ranked targets")
+
+
+# Minimal DOM for running the index under node: selector -> element rects in
+# viewport coordinates at scroll (0, 0)
+PAGE = {
+    'header': [{'left': 0, 'top': 0, 'width': 1000, 'height': 60, 'fixed': True}],
+    '#hero': [{'left': 0, 'top': 100, 'width': 800, 'height': 400}],
+    '.card': [{'left': 50, 'top': 150, 'width': 200, 'height': 100},
+              {'left': 0, 'top': 0, 'width': 0, 'height': 0}],
+    '.twin-a': [{'left': 900, 'top': 100, 'width': 100, 'height': 100}],
+    '.twin-b': [{'left': 900, 'top': 100, 'width': 100, 'height': 100}],
+    'footer': [{'left': 0, 'top': 1000, 'width': 800, 'height': 200}],
+}
+
+TARGETS = ['.card', '.twin-b', '#hero', '.twin-a', 'header', 'footer', '!!invalid']
+
+DOM_STUB = """
+const PAGE = __PAGE__;
+global.window = {scrollX: 0, scrollY: 0, addEventListener() {}};
+const ELEMENTS = {};   // like the DOM, a selector keeps returning the same elements
+global.document = {
+    body: {},
+    documentElement: {},
+    getElementById: () => null,
+    addEventListener() {},
+    querySelectorAll(selector) {
+        if (selector.startsWith('!!')) throw new SyntaxError(selector);
+        ELEMENTS[selector] = ELEMENTS[selector] || (PAGE[selector] || []).map(r => ({
+            fixed: !!r.fixed,
+            parentElement: document.body,
+            getBoundingClientRect: () => ({
+                left: r.left - (r.fixed ? 0 : window.scrollX), top: r.top - (r.fixed ? 0 : window.scrollY),
+                right: r.left + r.width - (r.fixed ? 0 : window.scrollX),
+                bottom: r.top + r.height - (r.fixed ? 0 : window.scrollY),
+                width: r.width, height: r.height
+            })
+        }));
+        return ELEMENTS[selector];
+    }
+};
+global.getComputedStyle = (el) => ({position: el.fixed ? 'fixed' : 'static'});
+let clock = 0;
+global.performance = {now: () => clock};
+global.MutationObserver = class { observe() {} };
+// like the browser, every newly observed element is reported once right away
+const observers = [];
+global.ResizeObserver = window.ResizeObserver = class {
+    constructor(callback) { this.callback = callback; this.targets = []; observers.push(this); }
+    observe(target) {
+        this.targets.push(target);
+        queueMicrotask(() => this.callback([{target}]));
+    }
+    disconnect() { this.targets = []; }
+};
+const resizeAll = () => observers.forEach(o => o.callback(o.targets.map(target => ({target}))));
+const settle = () => new Promise(resolve => setTimeout(resolve, 0));
+"""
+
+LOOKUPS = """
+const points = __POINTS__;
+const lookup = () => points.map(([x, y]) => window.gazeIndex.lookup(x, y));
+window.gazeIndex.setTargets(__TARGETS__);
+const top = lookup();
+const snapshotTop = (function () { __SNAPSHOT__ })();
+window.scrollY = 900;
+const scrolled = lookup();
+const snapshotScrolled = (function () { __SNAPSHOT__ })();
+console.log(JSON.stringify({top, scrolled, snapshotTop, snapshotScrolled, builds: window.gazeIndex.builds}));
+"""
+
+REBUILDS = """
+(async function () {
+    window.gazeIndex.setTargets(__TARGETS__);
+    window.gazeIndex.lookup(100, 200);
+    await settle();                      // initial ResizeObserver notifications
+    clock += 1000;
+    window.gazeIndex.lookup(100, 200);
+    const idle = window.gazeIndex.builds;
+    (function () { __SNAPSHOT__ })();
+    const snapshot = window.gazeIndex.builds;
+    resizeAll();
+    clock += 1000;
+    window.gazeIndex.lookup(100, 200);
+    await settle();
+    clock += 1000;
+    window.gazeIndex.lookup(100, 200);
+    console.log(JSON.stringify({idle, snapshot, resized: window.gazeIndex.builds}));
+})();
+"""
+
+POINTS = [
+    (100, 200),   # .card inside #hero: innermost wins
+    (600, 300),   # #hero only
+    (950, 150),   # identical twins: better rank wins
+    (900, 400),   # nothing
+    (10, 10),     # fixed header
+]
+
+
+def test_index_lookup_in_page():
+    """The grid index returns hits, misses and overlap winners like the page would"""
+    node = shutil.which('node')
+    if node is None:
+        print("⚠️ node not installed, in-page index lookup not exercised")
+        return
+
+    script = (DOM_STUB.replace('__PAGE__', json.dumps(PAGE)) + gaze_scripts.INDEX_SCRIPT +
+              LOOKUPS.replace('__POINTS__', json.dumps(POINTS))
+                     .replace('__TARGETS__', json.dumps(gaze_scripts.rank_targets(TARGETS)))
+                     .replace('__SNAPSHOT__', gaze_scripts.index_snapshot_script()))
+    result = subprocess.run([node, '-e', script], capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    out = json.loads(result.stdout)
+
+    assert out['top'] == ['.card', '#hero', '.twin-b', None, 'header']
+    # window scrolling moves page content under the gaze but not fixed components
+    assert out['scrolled'] == ['footer', 'footer', None, None, 'header']
+    assert out['builds'] == 1
+
+    # the Python copy used to label recorded samples agrees with the page
+    for snapshot, expected in ((out['snapshotTop'], out['top']), (out['snapshotScrolled'], out['scrolled'])):
+        assert [gaze_scripts.index_lookup(snapshot, x, y) for x, y in POINTS] == expected
+    print("✅ In-page index resolves hits, misses, overlaps and scrolling")
+
+
+def test_index_not_rebuilt_while_page_is_still():
+    """Initial ResizeObserver reports do not invalidate the index, real resizes do"""
+    node = shutil.which('node')
+    if node is None:
+        print("⚠️ node not installed, in-page index rebuilds not exercised")
+        return
+
+    script = (DOM_STUB.replace('__PAGE__', json.dumps(PAGE)) + gaze_scripts.INDEX_SCRIPT +
+              REBUILDS.replace('__TARGETS__', json.dumps(gaze_scripts.rank_targets(TARGETS)))
+                      .replace('__SNAPSHOT__', gaze_scripts.index_snapshot_script()))
+    result = subprocess.run([node, '-e', script], capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    out = json.loads(result.stdout)
+
+    assert out == {'idle': 1, 'snapshot': 1, 'resized': 2}
+    print("✅ The index is rebuilt only after a real resize")
+
+
+if __name__ == "__main__":
+    test_profile_ranks_ordered()
+    test_duplicates_keep_best_rank()
+    test_index_injected_with_attention()
+    test_index_lookup_in_page()
+    test_index_not_rebuilt_while_page_is_still()
+    print("\n🎉 All gaze index tests passed")
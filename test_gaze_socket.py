@@ -0,0 +1,167 @@
+"""
+Test script for the local WebSocket gaze broadcaster
+"""
+
+import sys
+import os
+import asyncio
+import itertools
+import json
+import time
+
+# Add source paths
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src', 'eye_tracking'))
+
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+
+from browser.gaze_socket import GazeBroadcaster, pack_samples, unpack_samples, HEADER, SAMPLE
+from browser import gaze_scripts
+from gaze_stream import GazeHub
+
+
+class FakeTracker:
+    """Tracker stand-in streaming numbered samples through a GazeHub"""
+
+    def __init__(self, delay=0.002, positions=True):
+        counter = itertools.count()
+
+        def source():
+            time.sleep(delay)
+            i = next(counter)
+            return {'position': (i, 2 * i) if positions else None, 'fixation': 1.0 if i % 2 else 0.0,
+                    'saccades': i % 3 == 0, 'estimated': False, 'timestamp': 100.0 + i}
+        self.hub = GazeHub(source)
+
+    def subscribe(self, callback=None, maxsize=64, policy="latest"):
+        return self.hub.subscribe(callback, maxsize, policy)
+
+    async def stream(self, maxsize=64, policy="latest", batched=False):
+        subscription = self.hub.subscribe(maxsize=maxsize, policy=policy)
+        try:
+            while True:
+                samples = await subscription.get_batch()
+                if not samples:
+                    return
+                yield samples
+        finally:
+            subscription.close()
+
+
+def test_pack_roundtrip():
+    """Samples survive packing and frames have the documented size"""
+    samples = [
+        {'position': (10.5, 20.25), 'fixation': 0.5, 'saccades': True, 'estimated': False, 'timestamp': 1.25},
+        {'position': None, 'fixation': 0.0, 'saccades': False, 'timestamp': 1.5},
+        {'position': (30, 40), 'fixation': 1.0, 'saccades': False, 'estimated': True, 'timestamp': 1.75},
+    ]
+    frame = pack_samples(samples)
+    assert len(frame) == HEADER.size + 2 * SAMPLE.size
+
+    unpacked = unpack_samples(frame)
+    assert [s['position'] for s in unpacked] == [(10.5, 20.25), (30.0, 40.0)]
+    assert [s['saccades'] for s in unpacked] == [True, False]
+    assert [s['estimated'] for s in unpacked] == [False, True]
+    assert [s['timestamp'] for s in unpacked] == [1.25, 1.75]
+    print("✅ Sample batches pack to 21 bytes per sample and unpack losslessly")
+
+
+def test_broadcast_and_attention():
+    """Clients receive binary batches and can report attention back"""
+    tracker = FakeTracker()
+    broadcaster = GazeBroadcaster(tracker)
+    assert broadcaster.start()
+
+    async def client():
+        received = []
+        async with connect(broadcaster.url) as ws:
+            while len(received) < 30:
+                received.extend(unpack_samples(await ws.recv()))
+            await ws.send(json.dumps({'type': 'attention', 'attention': {'#hero': 1.5}}))
+            await asyncio.sleep(0.1)
+        return received
+
+    try:
+        received = asyncio.run(client())
+        timestamps = [s['timestamp'] for s in received]
+        assert timestamps == sorted(timestamps)
+        assert all(s['position'][1] == 2 * s['position'][0] for s in received)
+        assert broadcaster.attention == {'#hero': 1.5}
+        assert broadcaster.wait_for_client(0)
+        assert broadcaster.stats()['frames_sent'] > 0
+    finally:
+        broadcaster.stop()
+    assert not tracker.hub.subscribers
+    print("✅ Broadcaster streams batches and stores reported attention")
+
+
+def test_rejects_wrong_token():
+    """Connections without the broadcaster's token are closed"""
+    broadcaster = GazeBroadcaster(FakeTracker())
+    assert broadcaster.start()
+
+    async def intruder():
+        url = f"ws://{broadcaster.host}:{broadcaster.port}/gaze/guess"
+        async with connect(url) as ws:
+            try:
+                await asyncio.wait_for(ws.recv(), timeout=2.0)
+            except ConnectionClosed as e:
+                return e.rcvd.code
+        return None
+
+    try:
+        assert asyncio.run(intruder()) == 1008
+        assert not broadcaster.wait_for_client(0)
+    finally:
+        broadcaster.stop()
+    print("✅ Pages without the token are refused")
+
+
+def test_malformed_messages_and_skipped_samples():
+    """Non-object messages are ignored and only samples actually sent are counted"""
+    broadcaster = GazeBroadcaster(FakeTracker(positions=False))
+    for message in ('[1, 2]', '3', '"attention"', 'null', '{"type": "attention", "attention": 5}'):
+        broadcaster._receive(message)
+    assert broadcaster.attention == {}
+    assert broadcaster.start()
+
+    async def client():
+        async with connect(broadcaster.url) as ws:
+            await ws.send('[{"type": "attention"}]')
+            await ws.send(json.dumps({'type': 'attention', 'attention': {'#hero': 2.0}}))
+            await asyncio.sleep(0.3)
+            # the handler survived the list message and no empty frames arrived
+            try:
+                await asyncio.wait_for(ws.recv(), timeout=0.1)
+                return False
+            except asyncio.TimeoutError:
+                return True
+
+    try:
+        assert asyncio.run(client())
+        assert broadcaster.attention == {'#hero': 2.0}
+        stats = broadcaster.stats()
+        assert stats['frames_sent'] == 0 and stats['samples_sent'] == 0
+    finally:
+        broadcaster.stop()
+    print("✅ Malformed messages are ignored and skipped samples are not counted")
+
+
+def test_client_script():
+    """The injected client embeds the socket url and the binary layout"""
+    script = gaze_scripts.socket_client_script("ws://127.0.0.1:1234/gaze/abc")
+    assert '"ws://127.0.0.1:1234/gaze/abc"' in script
+    assert f"HEADER_SIZE: {HEADER.size}" in script
+    assert f"SAMPLE_SIZE: {SAMPLE.size}" in script
+    assert '"selector": ".b", "rank": 2' in gaze_scripts.attention_script(["#a", ".b"])
+    print("✅ Client script matches the frame layout")
+
+
+if __name__ == "__main__":
+    test_pack_roundtrip()
+    test_broadcast_and_attention()
+    test_rejects_wrong_token()
+    test_malformed_messages_and_skipped_samples()
+    test_client_script()
+    print("\n🎉 All gaze socket tests passed")
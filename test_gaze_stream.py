@@ -0,0 +1,163 @@
+"""
+Test script for the gaze subscription hub - one producer, many consumers
+"""
+
+import sys
+import os
+import asyncio
+import itertools
+import threading
+import time
+
+# Add eye tracking path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src', 'eye_tracking'))
+
+from gaze_stream import GazeHub, LATEST_ONLY, LOSSLESS
+
+
+def counting_source(limit=None, delay=0.0):
+    """Source producing numbered samples, None after limit"""
+    counter = itertools.count()
+    calls = {'n': 0}
+
+    def source():
+        calls['n'] += 1
+        time.sleep(delay)
+        i = next(counter)
+        if limit is not None and i >= limit:
+            return None
+        return {'position': (i, i), 'index': i}
+    return source, calls
+
+
+def test_fan_out_shares_one_source():
+    """Two subscribers see the same samples from a single source call each"""
+    source, calls = counting_source(limit=50)
+    hub = GazeHub(source, stop_when_idle=False)
+    a = hub.subscribe(maxsize=100, policy=LOSSLESS)
+    b = hub.subscribe(maxsize=100, policy=LOSSLESS)
+
+    first_a = [a.get(timeout=1)['index'] for _ in range(50)]
+    first_b = [b.get(timeout=1)['index'] for _ in range(50)]
+    hub.stop()
+
+    assert first_a == first_b
+    assert sorted(first_a) == first_a
+    assert hub.published == 50
+    print("✅ Fan-out delivers every sample to every subscriber")
+
+
+def test_latest_only_drops_oldest():
+    """A slow latest-only subscriber keeps only the newest samples"""
+    source, _ = counting_source(limit=200)
+    hub = GazeHub(source, stop_when_idle=False)
+    slow = hub.subscribe(maxsize=2, policy=LATEST_ONLY)
+    lossless = hub.subscribe(maxsize=1000, policy=LOSSLESS)
+
+    while hub.published < 200:
+        time.sleep(0.01)
+    hub.stop()
+
+    assert [s['index'] for s in slow.drain()] == [198, 199]
+    assert slow.dropped == 198
+    assert len(lossless.drain()) == 200
+    print("✅ Latest-only keeps the newest samples, lossless keeps all")
+
+
+def test_lossless_applies_backpressure():
+    """The producer waits for a full lossless subscriber instead of dropping"""
+    source, calls = counting_source()
+    hub = GazeHub(source, stop_when_idle=False)
+    sub = hub.subscribe(maxsize=3, policy=LOSSLESS)
+
+    time.sleep(0.1)
+    assert calls['n'] <= 4
+    received = [sub.get(timeout=1)['index'] for _ in range(10)]
+    sub.close()
+    hub.stop()
+
+    assert received == list(range(10))
+    assert sub.dropped == 0
+    print("✅ Lossless subscriber throttles the producer")
+
+
+def test_callback_and_idle_stop():
+    """Callbacks run off the producer thread and the loop stops with the last subscriber"""
+    source, _ = counting_source(delay=0.001)
+    hub = GazeHub(source)
+    seen = []
+    done = threading.Event()
+
+    def callback(sample):
+        seen.append(sample['index'])
+        if len(seen) == 5:
+            done.set()
+
+    sub = hub.subscribe(callback=callback, maxsize=10, policy=LOSSLESS)
+    assert done.wait(timeout=2)
+    sub.close()
+    hub.thread.join(timeout=2)
+
+    assert seen[:5] == [0, 1, 2, 3, 4]
+    assert not hub.running and not hub.thread.is_alive()
+    print("✅ Callback subscriber works and the producer stops when idle")
+
+
+def test_async_for():
+    """Subscriptions can be consumed with async for"""
+    source, _ = counting_source(delay=0.001)
+    hub = GazeHub(source)
+
+    async def consume():
+        received = []
+        sub = hub.subscribe(maxsize=100, policy=LOSSLESS)
+        async for sample in sub:
+            received.append(sample['index'])
+            if len(received) == 20:
+                sub.close()
+        return received
+
+    received = asyncio.run(consume())
+    assert received == list(range(20))
+    print("✅ async for receives samples in order and ends on close")
+
+
+def test_tracker_stream():
+    """EyeTracker.stream yields samples and batches from the shared producer"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    from EyeTracker import EyeTracker
+
+    source, _ = counting_source(delay=0.001)
+    tracker = EyeTracker.__new__(EyeTracker)
+    tracker.is_calibrated = True
+    tracker.gaze_hub = GazeHub(source)
+
+    async def consume():
+        singles = []
+        async for sample in tracker.stream(policy=LOSSLESS):
+            singles.append(sample['index'])
+            if len(singles) == 5:
+                break
+        batches = []
+        async for batch in tracker.stream(policy=LOSSLESS, batched=True):
+            batches.append([s['index'] for s in batch])
+            if sum(map(len, batches)) >= 10:
+                break
+        return singles, batches
+
+    singles, batches = asyncio.run(consume())
+    flat = [i for batch in batches for i in batch]
+    assert singles == [0, 1, 2, 3, 4]
+    assert flat == list(range(flat[0], flat[0] + len(flat)))
+    assert not tracker.gaze_hub.subscribers
+    print("✅ tracker.stream() delivers single samples and batches")
+
+
+if __name__ == "__main__":
+    test_fan_out_shares_one_source()
+    test_latest_only_drops_oldest()
+    test_lossless_applies_backpressure()
+    test_callback_and_idle_stop()
+    test_async_for()
+    test_tracker_stream()
+    print("\n🎉 All gaze stream tests passed")
@@ -0,0 +1,79 @@
+"""
+Test script for HTML pruning before model submission
+"""
+
+import sys
+import os
+
+# Add source paths
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from llm.html_prune import prune_html, expand_html, estimate_tokens
+
+COMPONENT = """
+<section class="hero" data-analytics-id="hero-42" onclick="track('hero')" jsaction="click:cOuCgd">
+    <!-- experiment B -->
+    <img src="data:image/png;base64,""" + "iVBORw0KGgo" * 60 + """" alt="Product shot" width="640">
+    <svg class="icon" viewBox="0 0 24 24"><path d="M12 2C6.48 2 2 6.48 2 12s4.48 10 10 10 10-4.48 10-10S17.52 2 12 2z"/></svg>
+    <h1>Focus   better,
+        every day</h1>
+    <p>Start <b>now</b> <i>free</i> &amp; cancel anytime.</p>
+    <pre>  two  spaces</pre>
+    <script>window.dataLayer = window.dataLayer || []; dataLayer.push({"event": "hero_view"});</script>
+    <noscript><img src="https://tracker.example/pixel.gif"></noscript>
+    <a href="/signup" class="cta" aria-label="Sign up">Sign up</a>
+</section>
+"""
+
+
+def test_prune_strips_non_visual_content():
+    """Scripts, SVG paths, tracking attributes and data URIs become placeholders"""
+    pruned, mapping = prune_html(COMPONENT)
+    for gone in ('dataLayer', 'data:image', 'M12 2C', 'onclick', 'data-analytics-id', 'jsaction',
+                 'experiment B', 'pixel.gif'):
+        assert gone not in pruned, gone
+    for kept in ('class="hero"', 'alt="Product shot"', 'viewBox="0 0 24 24"', '<h1>Focus better, every day</h1>',
+                 '<b>now</b> <i>free</i> &amp; cancel', '<pre>  two  spaces</pre>', 'aria-label="Sign up"'):
+        assert kept in pruned, kept
+    assert estimate_tokens(pruned) < estimate_tokens(COMPONENT) / 3
+    assert len(mapping) == 5
+    print(f"✅ Component pruned from ~{estimate_tokens(COMPONENT)} to ~{estimate_tokens(pruned)} tokens")
+
+
+def test_expand_restores_originals():
+    """Expanding the untouched or edited output brings every original back"""
+    pruned, mapping = prune_html(COMPONENT)
+    expanded = expand_html(pruned, mapping)
+    for original in ('data-analytics-id="hero-42"', "onclick=\"track(&#x27;hero&#x27;)\"", 'iVBORw0KGgo' * 60,
+                     '<path d="M12 2C6.48', 'dataLayer.push', '<noscript><img src="https://tracker.example/pixel.gif">'):
+        assert original in expanded, original
+    assert '{{gz:' not in expanded and 'data-gz' not in expanded
+    # pruning is stable: the expansion prunes to the same text
+    assert prune_html(expanded)[0] == pruned
+
+    # the model restyled the heading and dropped the scripts
+    edited = pruned.replace('<h1>', '<h1 style="font-size:3rem">')
+    edited = edited.replace('{{gz:3}}', '').replace('{{gz:4}}', '')
+    restored = expand_html(edited, mapping)
+    assert '<h1 style="font-size:3rem">' in restored
+    assert restored.rstrip().endswith('</noscript>') and 'dataLayer.push' in restored
+    assert 'dataLayer.push' not in expand_html(edited, mapping, restore_removed=False)
+    print("✅ Placeholders expand back, dropped scripts are restored")
+
+
+def test_token_budget():
+    """Long texts and attribute values are cut harder until the budget is met"""
+    long_component = COMPONENT + "<p>" + "Very long marketing copy. " * 200 + "</p>"
+    relaxed, _ = prune_html(long_component)
+    pruned, mapping = prune_html(long_component, token_budget=300)
+    assert estimate_tokens(pruned) <= 300 < estimate_tokens(relaxed)
+    assert "Very long marketing copy." in pruned
+    assert expand_html(pruned, mapping) == expand_html(relaxed, prune_html(long_component)[1])
+    print(f"✅ Budget of 300 tokens met (~{estimate_tokens(pruned)}), text tails restored on expansion")
+
+
+if __name__ == "__main__":
+    test_prune_strips_non_visual_content()
+    test_expand_restores_originals()
+    test_token_budget()
+    print("\n🎉 All HTML pruning tests passed")
@@ -0,0 +1,92 @@
+"""
+Test script for the concurrent model pipeline and the offline stub client
+"""
+
+import sys
+import os
+import asyncio
+import time
+
+# Add source paths
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from llm import LLMPipeline, StubClient, TokenBucket, make_client, EXPLANATION_SEPARATOR
+
+
+def prompts(n):
+    return [{'system': 'optimise', 'prompt': f"Ranking Score:\n{i}\n\nHTML Component:\n<div id='c{i}'></div>"}
+            for i in range(n)]
+
+
+def test_stub_is_deterministic():
+    """The stub echoes the component and answers identically for identical prompts"""
+    client = StubClient(latency=0)
+    first = asyncio.run(client.generate(prompts(1)[0]['prompt'], system='optimise'))
+    second = asyncio.run(client.generate(prompts(1)[0]['prompt'], system='optimise'))
+    assert first == second
+    html, explanation = first.split(EXPLANATION_SEPARATOR)
+    assert html.strip() == "<div id='c0'></div>"
+    assert explanation.strip()
+    assert isinstance(make_client("stub"), StubClient)
+    print("✅ Stub client is deterministic and offline")
+
+
+def test_concurrency_and_order():
+    """Calls overlap up to the bound and results keep the request order"""
+    client = StubClient(latency=0.05, jitter=0.8)
+    pipeline = LLMPipeline(client, concurrency=8)
+    start = time.perf_counter()
+    results = pipeline.run_sync(prompts(32))
+    elapsed = time.perf_counter() - start
+    assert client.max_active == 8
+    assert [r['text'].split(EXPLANATION_SEPARATOR)[0].strip() for r in results] == \
+        [f"<div id='c{i}'></div>" for i in range(32)]
+    assert all(r['error'] is None and r['attempts'] == 1 for r in results)
+    # 4 waves of at most 90 ms instead of 32 serial calls of about 50 ms
+    assert elapsed < 0.8, elapsed
+    print(f"✅ 32 calls in {elapsed:.2f}s with at most 8 in flight, results in order")
+
+
+def test_retry_and_timeout():
+    """Failures are retried with backoff, calls that hang time out"""
+    client = StubClient(latency=0, failures=2)
+    results = LLMPipeline(client, concurrency=1, retries=3, backoff=0.01).run_sync(prompts(1))
+    assert results[0]['error'] is None and results[0]['attempts'] == 3
+
+    client = StubClient(latency=0, failures=10)
+    results = LLMPipeline(client, retries=1, backoff=0.01).run_sync(prompts(1))
+    assert results[0]['text'] is None and isinstance(results[0]['error'], ConnectionError)
+
+    slow = StubClient(latency=1.0)
+    start = time.perf_counter()
+    results = LLMPipeline(slow, timeout=0.05, retries=1, backoff=0.01).run_sync(prompts(2))
+    assert all(isinstance(r['error'], TimeoutError) for r in results)
+    assert time.perf_counter() - start < 0.5
+    print("✅ Failed calls are retried and hung calls time out")
+
+
+def test_rate_limit():
+    """The token bucket spaces requests once the burst is spent"""
+    client = StubClient(latency=0)
+    start = time.perf_counter()
+    LLMPipeline(client, concurrency=16, rate=50, burst=5).run_sync(prompts(15))
+    elapsed = time.perf_counter() - start
+    # 5 immediately, 10 more at 50/s
+    assert 0.18 < elapsed < 0.5, elapsed
+
+    async def drain():
+        bucket = TokenBucket(rate=100, capacity=1)
+        for _ in range(11):
+            await bucket.acquire()
+    start = time.perf_counter()
+    asyncio.run(drain())
+    assert time.perf_counter() - start >= 0.09
+    print(f"✅ Rate limit holds 15 requests to {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    test_stub_is_deterministic()
+    test_concurrency_and_order()
+    test_retry_and_timeout()
+    test_rate_limit()
+    print("\n🎉 All LLM pipeline tests passed")
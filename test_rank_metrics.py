@@ -0,0 +1,76 @@
+"""
+Test script for the vectorised rank agreement metrics
+"""
+
+import sys
+import os
+import numpy as np
+
+# Add source path
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from analysis.metrics import average_ranks, rank_metrics, score_session
+import data
+
+
+def test_average_ranks_ties_and_missing():
+    """Ties share the average rank and NaN stays unranked"""
+    ranks = average_ranks([3.0, 1.0, 3.0, np.nan, 2.0])
+    assert np.allclose(ranks, [3.5, 1, 3.5, np.nan, 2], equal_nan=True)
+    assert np.allclose(average_ranks([5, 7, 7], descending=True), [3, 1.5, 1.5])
+    print("✅ Average ranks with ties and missing values")
+
+
+def test_perfect_and_reversed():
+    """Matching order scores 100, reversed order scores 1 with rho = tau = -1"""
+    expected = [1, 2, 3, 4]
+    perfect = rank_metrics(expected, [40, 30, 20, 10])
+    reverse = rank_metrics(expected, [10, 20, 30, 40])
+    assert perfect['score'] == 100 and perfect['spearman'] == 1 and perfect['kendall'] == 1
+    assert reverse['score'] == 1 and np.isclose(reverse['spearman'], -1) and np.isclose(reverse['kendall'], -1)
+    assert list(reverse['delta']) == [3, 1, -1, -3]
+    print("✅ Perfect and reversed attention scored at the extremes")
+
+
+def test_known_values():
+    """Spearman and Kendall tau-b match reference values with ties on both sides"""
+    m = rank_metrics([1, 2, 2, 3, 4], [9, 7, 8, 8, 1])
+    # reference: scipy.stats.spearmanr / kendalltau of the same ranks
+    assert np.isclose(m["spearman"], 0.7631578947368421)
+    assert np.isclose(m["kendall"], 0.6666666666666666)
+    print("✅ Tie-corrected rho and tau match reference values")
+
+
+def test_batch_matches_single():
+    """Scoring S sessions at once equals scoring each one alone"""
+    rng = np.random.default_rng(1)
+    expected = rng.integers(1, 6, (500, 12)).astype(float)
+    actual = rng.random((500, 12)) * 30
+    actual[rng.random(actual.shape) < 0.1] = np.nan
+    batch = rank_metrics(expected, actual)
+    for i in (0, 137, 499):
+        single = rank_metrics(expected[i], actual[i])
+        for key in single:
+            assert np.allclose(single[key], batch[key][i], equal_nan=True), key
+    print("✅ 500 sessions scored in one call")
+
+
+def test_dict_session_and_data_compat():
+    """Unranked and unseen selectors are skipped instead of raising"""
+    result = score_session({'#a': 1, '#b': 2, '#gone': 3}, {'#a': 1.0, '#b': 5.0, '#extra': 9.0})
+    assert set(result['components']) == {'#a', '#b'}
+    assert result['components']['#a']['delta'] == 1 and result['count'] == 2
+
+    scores = data.calculate_ranking_score(data.expected_priorities, data.actual_times)
+    assert set(scores.values()) == {0}
+    print("✅ Missing selectors handled, data.calculate_ranking_score unchanged for the sample data")
+
+
+if __name__ == "__main__":
+    test_average_ranks_ties_and_missing()
+    test_perfect_and_reversed()
+    test_known_values()
+    test_batch_matches_single()
+    test_dict_session_and_data_compat()
+    print("\n🎉 All rank metric tests passed")
@@ -0,0 +1,109 @@
+"""
+Test script for the persistent model response cache
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+import time
+
+# Add source paths
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from llm import ResponseCache, CachedClient, StubClient, LLMPipeline, cached_client, cache_key
+
+
+def ask(client, prompt, system="optimise", temperature=0.3):
+    return asyncio.run(client.generate(prompt, system=system, temperature=temperature))
+
+
+def test_hits_and_key():
+    """Identical requests are served from the cache, any input change misses"""
+    stub = StubClient(latency=0)
+    client = CachedClient(stub, ResponseCache(":memory:"))
+    first = ask(client, "HTML Component:\n<div></div>")
+    assert ask(client, "HTML Component:\n<div></div>") == first
+    assert stub.calls == 1 and client.cache.hits == 1
+
+    ask(client, "HTML Component:\n<div></div>", system="summarise")
+    ask(client, "HTML Component:\n<div></div>", temperature=0.7)
+    ask(client, "HTML Component:\n<span></span>")
+    assert stub.calls == 4
+
+    other_model = CachedClient(StubClient(latency=0, model="other"), client.cache)
+    ask(other_model, "HTML Component:\n<div></div>")
+    assert other_model.client.calls == 1
+    assert cache_key("a", "m", None, "p", 0.3) != cache_key("b", "m", None, "p", 0.3)
+    print("✅ Cache keys cover client, model, system prompt, temperature and prompt")
+
+
+def test_persistence_and_pipeline():
+    """A rerun of the same page is answered from disk without model calls"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.db')
+        requests = [f"HTML Component:\n<p id='c{i}'></p>" for i in range(20)]
+
+        stub = StubClient(latency=0.02)
+        client = cached_client(stub, mode="on", path=path)
+        first = LLMPipeline(client, concurrency=4).run_sync(requests)
+        client.close()
+
+        stub = StubClient(latency=0.02)
+        client = cached_client(stub, mode="on", path=path)
+        start = time.perf_counter()
+        second = LLMPipeline(client, concurrency=4).run_sync(requests)
+        elapsed = time.perf_counter() - start
+        assert stub.calls == 0
+        assert [r['text'] for r in first] == [r['text'] for r in second]
+        assert all(r['attempts'] == 0 for r in second)
+        assert elapsed < 0.1
+
+        # hits skip the rate limit: 20 cached prompts at 1 request/s return at once
+        start = time.perf_counter()
+        limited = LLMPipeline(client, concurrency=1, rate=1).run_sync(requests + ["HTML Component:\n<b></b>"])
+        assert time.perf_counter() - start < 0.5
+        assert stub.calls == 1 and limited[-1]['attempts'] == 1
+        client.close()
+
+        refresh = StubClient(latency=0)
+        client = cached_client(refresh, mode="refresh", path=path)
+        LLMPipeline(client).run_sync(requests[:3])
+        assert refresh.calls == 3
+        client.close()
+
+        off = StubClient(latency=0)
+        assert cached_client(off, mode="off", path=path) is off
+    print(f"✅ Rerun served from disk in {elapsed * 1000:.1f} ms, refresh and off bypass the cache")
+
+
+def test_lru_and_ttl():
+    """Least recently used entries go first, expired entries miss"""
+    cache = ResponseCache(":memory:", max_bytes=300)
+    for i in range(3):
+        cache.put(f"k{i}", "x" * 100)
+        time.sleep(0.01)
+    assert cache.get("k0") is not None     # k1 is now the least recently used
+    cache.put("k3", "y" * 100)
+    assert cache.get("k1") is None
+    assert all(cache.get(k) is not None for k in ("k0", "k2", "k3"))
+    assert cache.size == 300 and len(cache) == 3
+    cache.put("huge", "z" * 1000)
+    assert cache.get("huge") is None
+
+    cache = ResponseCache(":memory:", ttl=0.05)
+    cache.put("old", "value")
+    assert cache.get("old") == "value"
+    time.sleep(0.1)
+    assert cache.get("old") is None
+    cache.put("older", "value")
+    time.sleep(0.1)
+    assert cache.purge_expired() == 1 and cache.size == 0
+    print("✅ LRU eviction keeps the cache under max_bytes, TTL expires entries")
+
+
+if __name__ == "__main__":
+    test_hits_and_key()
+    test_persistence_and_pipeline()
+    test_lru_and_ttl()
+    print("\n🎉 All response cache tests passed")
@@ -0,0 +1,148 @@
+"""
+Test script for the results stores behind gemSuggest and endSummary
+"""
+
+import sys
+import os
+import tempfile
+import threading
+
+# Add source paths
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from results import SQLiteStore, SupabaseStore, open_store
+
+
+def explanation(run_id, i):
+    return {'run_id': run_id, 'component': f'<div id="c{i % 3}"></div>', 'desired_attention': i,
+            'actual_attention': 1.5 * i, 'ranking_score': i - 1, 'explanation': f'change {i}'}
+
+
+class FakeQuery:
+    """Records the supabase query builder calls against in-memory tables"""
+
+    def __init__(self, tables, name):
+        self.tables, self.name = tables, name
+        self.filters, self.rows = [], None
+
+    def insert(self, rows):
+        self.rows = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def select(self, columns):
+        self.columns = [c.strip() for c in columns.split(',')]
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    def order(self, column):
+        return self
+
+    def execute(self):
+        table = self.tables.setdefault(self.name, [])
+        if self.rows is not None:
+            table.extend(self.rows)
+            return type('Response', (), {'data': self.rows})()
+        rows = [r for r in table if all(r.get(c) == v for c, v in self.filters)]
+        return type('Response', (), {'data': [{c: r.get(c) for c in self.columns} for r in rows]})()
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.tables = {}
+
+    def table(self, name):
+        return FakeQuery(self.tables, name)
+
+
+def check_store(store):
+    assert store.add_explanations([explanation('run-a', i) for i in range(50)]) == 50
+    store.add_explanation('run-b', '<p></p>', 1, 2.0, 0, 'other run')
+    rows = store.explanations('run-a')
+    assert [r['explanation'] for r in rows] == [f'change {i}' for i in range(50)]
+    assert rows[3]['ranking_score'] == 2
+    assert len(store.explanations('run-a', component='<div id="c1"></div>')) == 17
+    assert [r['explanation'] for r in store.explanations('run-b')] == ['other run']
+    assert store.explanations('run-missing') == []
+
+    store.add_summary('run-a', 'first')
+    store.add_summary('run-a', 'second')
+    assert store.summaries('run-a') == ['first', 'second']
+    assert store.summaries('run-b') == []
+
+    try:
+        store.add_explanations([{'component': 'x'}])
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_sqlite_store():
+    """SQLite store keeps runs apart, in WAL mode with run_id/component indexes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        with SQLiteStore(os.path.join(tmp, 'results.db')) as store:
+            check_store(store)
+            assert store.connection.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+            indexes = {row[1] for row in store.connection.execute("PRAGMA index_list(gemini_explanations)")}
+            assert {'idx_explanations_run_id', 'idx_explanations_component'} <= indexes
+            plan = store.connection.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM gemini_explanations WHERE run_id = 'run-a'").fetchall()
+            assert 'idx_explanations_run_id' in str([tuple(row) for row in plan])
+        # reopening sees the committed rows
+        with SQLiteStore(os.path.join(tmp, 'results.db')) as store:
+            assert len(store.explanations('run-a')) == 50
+    print("✅ SQLite store round trips explanations and summaries")
+
+
+def test_sqlite_threads():
+    """Batches from several threads all land in the shared connection"""
+    store = SQLiteStore(":memory:")
+    threads = [threading.Thread(target=lambda t=t: [store.add_explanations([explanation(f'run-{t}', i)])
+                                                   for i in range(25)]) for t in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(len(store.explanations(f'run-{t}')) == 25 for t in range(4))
+    store.close()
+    print("✅ SQLite store is safe to share between threads")
+
+
+def test_supabase_store():
+    """Supabase store speaks the same interface through the client"""
+    client = FakeSupabase()
+    check_store(SupabaseStore(client=client))
+    assert len(client.tables['gemini_explanations']) == 51
+    print("✅ Supabase store implements the same interface")
+
+
+def test_open_store():
+    """Backend selection falls back to SQLite without Supabase credentials"""
+    saved = {k: os.environ.pop(k, None) for k in ('RESULTS_BACKEND', 'RESULTS_DB', 'SUPABASE_URL')}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ['RESULTS_DB'] = os.path.join(tmp, 'env.db')
+            with open_store() as store:
+                assert isinstance(store, SQLiteStore)
+                assert store.path == os.environ['RESULTS_DB']
+        try:
+            open_store("mongodb")
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+    finally:
+        for key, value in saved.items():
+            os.environ.pop(key, None)
+            if value is not None:
+                os.environ[key] = value
+    print("✅ open_store picks the configured backend")
+
+
+if __name__ == "__main__":
+    test_sqlite_store()
+    test_sqlite_threads()
+    test_supabase_store()
+    test_open_store()
+    print("\n🎉 All results store tests passed")
@@ -0,0 +1,238 @@
+"""
+Test script for the append-only gaze session log
+"""
+
+import sys
+import os
+import glob
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+# Add source paths
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src', 'eye_tracking'))
+
+from recording import SessionRecorder, read_session, recover, RECORD_DTYPE, NO_ELEMENT, FLAG_BLINK, FLAG_SACCADES
+from recording.session_log import HEADER_SIZE, read_header
+from gaze_stream import GazeHub
+
+PROFILE = {
+    'url': 'https://example.com',
+    'ranks': {
+        '1': [{'selector': '#hero', 'tag': 'section'}],
+        '2': [{'selector': '.cta', 'tag': 'button'}, {'selector': 'nav', 'tag': 'nav'}],
+    },
+}
+
+
+def sample(i):
+    return {'position': (float(i), 2.0 * i), 'fixation': 0.5, 'saccades': i % 2 == 0,
+            'estimated': False, 'timestamp': 1000.0 + i * 0.01}
+
+
+def test_roundtrip():
+    """Samples and header metadata read back exactly"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'session.gazelog')
+        with SessionRecorder(path, profile=PROFILE, screen=(1920, 1080), calibration_id='cal-1',
+                             chunk_records=64, preallocate_records=100) as recorder:
+            for i in range(1000):
+                recorder.append(sample(i), ['#hero', '.cta', 'nav', None][i % 4])
+            recorder.append({'position': None, 'timestamp': 5.0})
+
+        metadata, records = read_session(path)
+        assert metadata['elements'] == ['#hero', '.cta', 'nav']
+        assert metadata['screen'] == [1920, 1080]
+        assert metadata['calibration_id'] == 'cal-1'
+        assert metadata['profile']['url'] == 'https://example.com'
+        assert len(records) == 1000
+        assert np.allclose(records['x'], np.arange(1000))
+        assert np.allclose(records['timestamp'], 1000.0 + np.arange(1000) * 0.01)
+        assert list(records['element'][:4]) == [0, 1, 2, NO_ELEMENT]
+        assert (records['flags'][::2] & FLAG_SACCADES).all()
+        assert os.path.getsize(path) == HEADER_SIZE + 1000 * RECORD_DTYPE.itemsize
+    print("✅ Session log round trips samples and metadata")
+
+
+def test_recover_after_crash():
+    """A log that was never closed is truncated at its first torn record"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'crash.gazelog')
+        recorder = SessionRecorder(path, profile=PROFILE, chunk_records=100, fsync="never")
+        for i in range(550):
+            recorder.append(sample(i))
+        assert recorder.flush(timeout=5)
+        # simulate a crash: tear the last record, never write the clean header
+        os.pwrite(recorder.fd, b'\xff' * 7, HEADER_SIZE + 549 * RECORD_DTYPE.itemsize)
+        os.close(recorder.fd)
+
+        with open(path, 'rb') as f:
+            _, count, clean = read_header(f)
+        assert not clean and count == 0
+        assert os.path.getsize(path) > HEADER_SIZE + 550 * RECORD_DTYPE.itemsize   # preallocated
+
+        _, records = read_session(path)
+        assert len(records) == 549
+        assert recover(path) == 549
+        with open(path, 'rb') as f:
+            _, count, clean = read_header(f)
+        assert clean and count == 549
+        assert os.path.getsize(path) == HEADER_SIZE + 549 * RECORD_DTYPE.itemsize
+        assert np.allclose(read_session(path)[1]['x'], np.arange(549))
+    print("✅ Recovery keeps every intact record and drops the torn tail")
+
+
+def test_fsync_policies():
+    """Every fsync policy produces the same log, unknown policies are refused"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for policy in ("always", "never", 0.5):
+            path = os.path.join(tmp, f'{policy}.gazelog')
+            with SessionRecorder(path, chunk_records=32, fsync=policy) as recorder:
+                for i in range(100):
+                    recorder.append(sample(i))
+            assert len(read_session(path)[1]) == 100
+        try:
+            SessionRecorder(os.path.join(tmp, 'bad.gazelog'), fsync="sometimes")
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+    print("✅ fsync policies are honoured")
+
+
+def test_attach_and_overhead():
+    """A lossless subscription records every sample and append stays cheap"""
+    counter = iter(range(10 ** 9))
+    hub = GazeHub(lambda: (time.sleep(0.001), sample(next(counter)))[1])
+
+    class Tracker:
+        def subscribe(self, callback=None, maxsize=64, policy="latest"):
+            return hub.subscribe(callback, maxsize, policy)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'live.gazelog')
+        recorder = SessionRecorder(path, profile=PROFILE, chunk_records=16)
+        recorder.attach(Tracker(), attribute=lambda x, y: '#hero')
+        time.sleep(0.3)
+        recorder.close()
+        assert not hub.subscribers
+        records = read_session(path)[1]
+        assert len(records) > 20
+        assert np.all(np.diff(records['x']) == 1)
+        assert (records['element'] == 0).all()
+
+        path = os.path.join(tmp, 'bench.gazelog')
+        with SessionRecorder(path) as recorder:
+            start = time.perf_counter()
+            for i in range(20000):
+                recorder.append(sample(i))
+            per_sample = (time.perf_counter() - start) / 20000
+        assert per_sample < 1e-4, per_sample
+    print(f"✅ Attached recorder is lossless, append takes {per_sample * 1e6:.1f} µs")
+
+
+def test_time_based_hand_off():
+    """A slow stream reaches the disk within flush_interval, not when a chunk fills"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'slow.gazelog')
+        recorder = SessionRecorder(path, chunk_records=4096, fsync=0.1, flush_interval=0.1)
+        for i in range(5):
+            recorder.append(sample(i))
+            time.sleep(0.03)
+        # nothing more arrives: the writer hands off and syncs the partial chunk itself
+        deadline = time.monotonic() + 2.0
+        while recorder.synced < 5 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert recorder.written == 5 and recorder.synced == 5
+        assert len(read_session(path)[1]) == 5   # readable as a crashed log
+        recorder.close()
+    print("✅ Partial chunks are written and synced after flush_interval")
+
+
+class ScriptedGestures:
+    """EyeGestures_v3 stand-in: gaze alternates between #hero and empty page, every 5th event blinks"""
+
+    debug = 0
+    finder = None
+
+    def __init__(self):
+        self.steps = 0
+
+    def uploadCalibrationMap(self, points, context="main"):
+        pass
+
+    def setFixation(self, fixation):
+        pass
+
+    def whichAlgorithm(self, context="main"):
+        return "Ridge"
+
+    def step(self, frame, calibration, width, height, context="main", timestamp=None):
+        from eyeGestures.gevent import Gevent
+        self.steps += 1
+        point = np.array([100.0, 100.0]) if self.steps % 2 else np.array([900.0, 700.0])
+        return Gevent(point, self.steps % 5 == 0, 0.5, saccades=False), None
+
+
+def test_integrated_session():
+    """A test run through IntegratedTestManager records the tracker's gaze end to end"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    from EyeTracker import EyeTracker
+    from src.gui.integrated_test_runner import IntegratedTestManager
+
+    class Capture:
+        def read(self):
+            return True, np.zeros((48, 64, 3), dtype=np.uint8)
+
+    tracker = EyeTracker(capture=Capture(), screen_size=(1280, 800), target_rate=100.0, motion_gate=False)
+    tracker.gestures = ScriptedGestures()
+    tracker._run_calibration_window = lambda: True
+    assert tracker.recalibrate(12)
+
+    # page index as window.gazeIndex would report it: #hero covers the top left corner
+    snapshot = {'scrollX': 0, 'scrollY': 0,
+                'entries': [['#hero', 1, 0, 0, 400, 300, 120000, False]]}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        profile = dict(PROFILE, destination=tmp, filename='study.json', duration='0')
+        manager = IntegratedTestManager(profile, eye_tracker=tracker)
+        browser = manager.browser_manager
+        browser.integrate_eye_tracker = lambda eye_tracker, targets=None: None
+        browser.inject_javascript = lambda script, *args: snapshot
+
+        def launch_browser(url, main_window=None, on_ready_callback=None):
+            on_ready_callback()
+            time.sleep(0.5)   # participant browsing
+            return True, "closed"
+        browser.launch_browser = launch_browser
+
+        done = threading.Event()
+        assert manager.start_test_with_browser(completion_callback=done.set)
+        assert done.wait(timeout=5)
+        tracker.cleanup()
+
+        paths = glob.glob(os.path.join(tmp, 'study_*.gazelog'))
+        assert paths == [manager.recording_path]
+        metadata, records = read_session(paths[0])
+        report = {row['name']: row for row in manager.timer_manager.report_manager._session_data()}
+
+    assert metadata['calibration_id'] == tracker.calibration_id is not None
+    assert metadata['screen'] == [1280, 800]
+    assert len(records) > 10
+    assert set(records['element']) == {0, NO_ELEMENT}
+    assert (records['element'][records['x'] < 400] == 0).all()
+    assert (records['flags'] & FLAG_BLINK).any()
+    assert report['#hero']['time_spent'] > 0 and report['.cta']['time_spent'] == 0
+    print(f"✅ Integrated test session recorded {len(records)} attributed samples")
+
+
+if __name__ == "__main__":
+    test_roundtrip()
+    test_recover_after_crash()
+    test_fsync_policies()
+    test_attach_and_overhead()
+    test_time_based_hand_off()
+    test_integrated_session()
+    print("\n🎉 All session log tests passed")
@@ -0,0 +1,108 @@
+"""
+Test script for map-reduce summarisation of large runs
+"""
+
+import sys
+import os
+import math
+
+# Add source paths
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from llm import MapReduceSummarizer, chunk_texts, StubClient, CachedClient, ResponseCache, LLMPipeline
+
+FINAL = "Summarise:\n{texts}"
+MAP = "Condense:\n{texts}"
+REDUCE = "Merge:\n{texts}"
+
+
+def explanations(count, changed=()):
+    return [f"Component {i}: {'enlarged' if i in changed else 'muted'} the call to action and "
+            f"reduced visual noise around it. " * 4 for i in range(count)]
+
+
+def summarizer(client, concurrency=8):
+    return MapReduceSummarizer(LLMPipeline(client, concurrency=concurrency, retries=0), FINAL, MAP, REDUCE,
+                               chunk_tokens=500)
+
+
+def test_chunking():
+    """Chunks stay under the budget and an edit only changes the chunk it is in"""
+    texts = explanations(200)
+    chunks = chunk_texts(texts, 500)
+    assert "\n\n".join(chunks) == "\n\n".join(texts)
+    assert all(len(chunk) // 4 <= 500 for chunk in chunks)
+    assert len(chunk_texts(texts[:3], 10_000, average=1)) == 3
+    assert chunk_texts(["x" * 4000], 500) == ["x" * 4000]
+
+    edited = chunk_texts(explanations(200, changed={57}), 500)
+    assert len(edited) == len(chunks)
+    assert sum(a != b for a, b in zip(chunks, edited)) == 1
+    print(f"✅ 200 explanations packed into {len(chunks)} chunks, one edit changes one chunk")
+
+
+def test_single_chunk():
+    """A small run is summarised with the final prompt alone"""
+    stub = StubClient(latency=0)
+    mr = summarizer(stub)
+    summary = mr.summarize_sync(explanations(3))
+    assert summary.startswith("Stub summary") and stub.calls == 1 and mr.levels == 0
+    print("✅ Small run summarised in one call")
+
+
+def test_map_reduce_levels():
+    """Large runs are mapped concurrently and reduced in logarithmically many levels"""
+    stub = StubClient(latency=0.01)
+    mr = summarizer(stub, concurrency=4)
+    mr.summarize_sync(explanations(400))
+    chunks = len(chunk_texts(explanations(400), 500))
+    assert 1 <= mr.levels <= math.log2(chunks) and mr.calls == stub.calls
+    assert chunks < stub.calls < 2 * chunks + 1
+    assert stub.max_active == 4
+    print(f"✅ {chunks} chunks summarised in {mr.levels} level(s), {stub.calls} calls, "
+          f"{stub.max_active} at a time")
+
+
+def test_partials_reused():
+    """A rerun with a few edited explanations only recomputes the affected chunks"""
+    cache = ResponseCache(":memory:")
+    first = StubClient(latency=0)
+    mr = summarizer(CachedClient(first, cache))
+    before = mr.summarize_sync(explanations(200))
+
+    second = StubClient(latency=0)
+    mr = summarizer(CachedClient(second, cache))
+    assert mr.summarize_sync(explanations(200)) == before and second.calls == 0
+
+    changed = StubClient(latency=0)
+    mr = summarizer(CachedClient(changed, cache))
+    assert mr.summarize_sync(explanations(200, changed={57})) != before
+    assert 0 < changed.calls <= mr.levels + 1 < first.calls
+    print(f"✅ Edited run made {changed.calls} of {first.calls} calls, other partials came from the cache")
+
+
+def test_failures():
+    """A failed chunk fails the summary instead of silently dropping components"""
+    mr = summarizer(StubClient(latency=0, failures=1))
+    try:
+        mr.summarize_sync(explanations(200))
+    except RuntimeError as e:
+        assert "failed" in str(e)
+    else:
+        raise AssertionError("missing partial was not reported")
+    try:
+        summarizer(StubClient(latency=0)).summarize_sync(["", "  "])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("empty run was not rejected")
+    print("✅ Failed chunks and empty runs raise")
+
+
+if __name__ == "__main__":
+    test_chunking()
+    test_single_chunk()
+    test_map_reduce_levels()
+    test_partials_reused()
+    test_failures()
+    print("\n🎉 All summarisation tests passed")
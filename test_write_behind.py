@@ -0,0 +1,165 @@
+"""
+Test script for the write-behind results queue
+"""
+
+import sys
+import os
+import glob
+import json
+import tempfile
+import threading
+import time
+
+# Add source paths
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from results import SQLiteStore, WriteBehindQueue
+
+
+class SlowStore(SQLiteStore):
+    """SQLite store with a network-like round trip and optional failures"""
+
+    def __init__(self, latency=0.02, failures=0):
+        super().__init__(":memory:")
+        self.latency = latency
+        self.failures = failures
+        self.calls = 0
+
+    def add_explanations(self, rows):
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("store unavailable")
+        return super().add_explanations(rows)
+
+
+def row(i, run_id='run'):
+    return {'run_id': run_id, 'component': f'<div id="c{i}"></div>', 'explanation': f'change {i}'}
+
+
+def test_batches_by_size():
+    """200 components need a handful of round trips and enqueueing never waits"""
+    store = SlowStore()
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = WriteBehindQueue(store, batch_size=50, flush_interval=10.0,
+                                 spool_path=os.path.join(tmp, 'spool.jsonl'), flush_on_exit=False)
+        start = time.perf_counter()
+        for i in range(200):
+            queue.put_explanation(row(i))
+        enqueue_time = time.perf_counter() - start
+        assert queue.flush(timeout=5)
+        queue.close()
+    assert enqueue_time < 200 * store.latency / 10
+    assert store.calls == 4
+    assert [r['explanation'] for r in store.explanations('run')] == [f'change {i}' for i in range(200)]
+    assert queue.stats()['rows_written'] == 200
+    print(f"✅ 200 rows written in {store.calls} round trips, enqueueing took {enqueue_time * 1000:.1f} ms")
+
+
+def test_flush_by_time():
+    """A partial batch is written once it has waited flush_interval"""
+    store = SlowStore(latency=0)
+    queue = WriteBehindQueue(store, batch_size=100, flush_interval=0.1, spool_path=None, flush_on_exit=False)
+    queue.put_explanation(row(1))
+    queue.put_summary('run', 'summary text')
+    time.sleep(0.5)
+    assert len(store.explanations('run')) == 1
+    assert store.summaries('run') == ['summary text']
+    assert len(queue) == 0
+    queue.close()
+    print("✅ Partial batches are written after the flush interval")
+
+
+def test_retry_then_spool_and_replay():
+    """Transient errors are retried, a dead store spools rows for the next run"""
+    with tempfile.TemporaryDirectory() as tmp:
+        spool = os.path.join(tmp, 'spool.jsonl')
+
+        store = SlowStore(latency=0, failures=2)
+        queue = WriteBehindQueue(store, batch_size=10, backoff=0.01, spool_path=spool, flush_on_exit=False)
+        for i in range(10):
+            queue.put_explanation(row(i))
+        assert queue.flush(timeout=5)
+        queue.close()
+        assert store.calls == 3 and len(store.explanations('run')) == 10
+        assert not os.path.exists(spool)
+
+        dead = SlowStore(latency=0, failures=10 ** 6)
+        queue = WriteBehindQueue(dead, batch_size=5, retries=3, backoff=0.01, max_pending=8,
+                                 spool_path=spool, flush_on_exit=False)
+        for i in range(12):
+            queue.put_explanation(row(i, 'lost'))
+        queue.close(timeout=5)
+        with open(spool) as f:
+            assert len(f.readlines()) == 12
+        assert queue.stats()['rows_spooled'] == 12
+
+        revived = SlowStore(latency=0)
+        queue = WriteBehindQueue(revived, spool_path=spool, flush_on_exit=False)
+        assert queue.flush(timeout=5)
+        queue.close()
+        assert sorted(r['explanation'] for r in revived.explanations('lost')) == sorted(f'change {i}' for i in range(12))
+        assert not os.path.exists(spool)
+    print("✅ Failed batches are retried, spooled and replayed")
+
+
+def test_replay_kept_until_written():
+    """Replayed spool files survive until their rows are written, leftovers of a crashed replay included"""
+    class BlockedStore(SlowStore):
+        def __init__(self):
+            super().__init__(latency=0)
+            self.release = threading.Event()
+
+        def add_explanations(self, rows):
+            self.release.wait(5)
+            super().add_explanations(rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        spool = os.path.join(tmp, 'spool.jsonl')
+        # a replay that crashed before its rows were written, and a newer spool
+        with open(spool + '.replay', 'w') as f:
+            for i in range(3):
+                f.write(json.dumps({'kind': 'explanation', 'row': row(i, 'old')}) + '\n')
+        with open(spool, 'w') as f:
+            for i in range(2):
+                f.write(json.dumps({'kind': 'explanation', 'row': row(i, 'new')}) + '\n')
+
+        store = BlockedStore()
+        queue = WriteBehindQueue(store, batch_size=100, flush_interval=0.01, spool_path=spool,
+                                 flush_on_exit=False)
+        time.sleep(0.1)
+        # rows are in memory and being written: a crash now must not lose them
+        assert not os.path.exists(spool)
+        replays = glob.glob(spool + '.replay*')
+        assert len(replays) == 2 and spool + '.replay' in replays
+
+        store.release.set()
+        assert queue.flush(timeout=5)
+        queue.close()
+        assert len(store.explanations('old')) == 3 and len(store.explanations('new')) == 2
+        assert not glob.glob(spool + '*')
+    print("✅ Replayed spools are removed only after their rows are written")
+
+
+def test_close_is_final():
+    """Rows cannot be enqueued after close, closing twice is harmless"""
+    queue = WriteBehindQueue(SlowStore(latency=0), spool_path=None, flush_on_exit=False)
+    queue.close()
+    queue.close()
+    try:
+        queue.put_explanation(row(0))
+        assert False, "expected RuntimeError"
+    except RuntimeError:
+        pass
+    assert not queue.worker.is_alive()
+    print("✅ Closed queues refuse new rows")
+
+
+if __name__ == "__main__":
+    test_batches_by_size()
+    test_flush_by_time()
+    test_retry_then_spool_and_replay()
+    test_replay_kept_until_written()
+    test_close_is_final()
+    print("\n🎉 All write-behind tests passed")